@@ -11,11 +11,21 @@ from starlette.responses import HTMLResponse
 from sqlalchemy.exc import StatementError, IntegrityError
 
 from apps.settings import settings
+from apps.api.parking.partitions import (
+    top_up_partitions,
+    start_partition_maintainer,
+    stop_partition_maintainer,
+)
+from apps.api.vehicle.search_log import close_search_log_buffer
+from apps.api.vehicle.search_rollups import start_search_log_compactor, stop_search_log_compactor
 from avcfastapi.core.fastapi.app import create_app
 
 
 async def on_startup():
     print("Application Starting Up ...")
+    await top_up_partitions()
+    start_partition_maintainer()
+    start_search_log_compactor()
 
 
 # @asynccontextmanager
@@ -25,6 +35,10 @@ async def on_startup():
 #     print("application closing")
 
 app = create_app(apps_dir="apps", on_startup=on_startup)
+# Writes search logs still queued by the write-behind buffer
+app.add_event_handler("shutdown", close_search_log_buffer)
+app.add_event_handler("shutdown", stop_search_log_compactor)
+app.add_event_handler("shutdown", stop_partition_maintainer)
 
 
 @app.get("/api/ping", summary="Ping the API", tags=["Health Check"])
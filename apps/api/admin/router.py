@@ -1,8 +1,12 @@
 from datetime import datetime
+from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Request, Query
+from fastapi import APIRouter, Request, Query, Response
 
 from apps.api.admin.schema import (
+    SearchGeoBucketSchema,
+    SearchLogSummarySchema,
+    TopSearchedPlateSchema,
     UserWithCountsSchema,
     VehicleReportSchema,
     VehicleSearchLogResponse,
@@ -11,11 +15,13 @@ from apps.api.admin.schema import (
 from apps.api.admin.service import AdminDashboardServiceDependency
 from apps.api.auth.dependency import AdminUserDependency
 from apps.api.vehicle.models import SearchTermStatus
+from apps.api.vehicle.search_log import search_log_buffer
 from avcfastapi.core.fastapi.response.pagination import (
     PaginatedResponse,
     PaginationParams,
     paginated_response,
 )
+from apps.pagination import CursorParams, CountParam, CountStrategy, set_total_header
 
 router = APIRouter(prefix="/admin")
 
@@ -31,27 +37,7 @@ async def get_statistics(
         None, description="Filter to this datetime (inclusive, timezone-aware)"
     ),
 ):
-    total_users = await admin_dashboard_service.get_users_count(from_date, to_date)
-    total_vehicles = await admin_dashboard_service.get_vehicles_count(
-        from_date, to_date
-    )
-    total_reports = await admin_dashboard_service.get_reports_count(from_date, to_date)
-    success_total_search_terms = await admin_dashboard_service.count_search_logs(
-        from_date=from_date, to_date=to_date, status=SearchTermStatus.SUCCESS
-    )
-    not_found_total_search_terms = await admin_dashboard_service.count_search_logs(
-        from_date=from_date, to_date=to_date, status=SearchTermStatus.NOT_FOUND
-    )
-
-    return {
-        "total_users": total_users,
-        "total_vehicles": total_vehicles,
-        "total_reports": total_reports,
-        "total_search_terms": {
-            "success": success_total_search_terms,
-            "not_found": not_found_total_search_terms,
-        },
-    }
+    return await admin_dashboard_service.get_statistics(from_date, to_date)
 
 
 @router.get("/users", description="List users")
@@ -60,16 +46,26 @@ async def list_users(
     request: Request,
     admin_dashboard_service: AdminDashboardServiceDependency,
     params: PaginationParams,
+    cursor: CursorParams,
+    response: Response,
     from_date: datetime | None = Query(
         None, description="Filter from this datetime (inclusive, timezone-aware)"
     ),
     to_date: datetime | None = Query(
         None, description="Filter to this datetime (inclusive, timezone-aware)"
     ),
+    count: CountParam = CountStrategy.NONE,
 ) -> PaginatedResponse[UserWithCountsSchema]:
-    users = await admin_dashboard_service.list_users(
-        offset=params.offset, limit=params.limit, from_date=from_date, to_date=to_date
+    users, total = await admin_dashboard_service.list_users(
+        offset=params.offset,
+        limit=params.limit,
+        from_date=from_date,
+        to_date=to_date,
+        cursor=cursor,
+        count_strategy=count,
     )
+    cursor.set_header(response)
+    set_total_header(response, total)
     return paginated_response(
         result=users, request=request, schema=UserWithCountsSchema
     )
@@ -81,6 +77,7 @@ async def list_vehicles(
     request: Request,
     admin_dashboard_service: AdminDashboardServiceDependency,
     params: PaginationParams,
+    response: Response,
     user_id: str | None = None,
     from_date: datetime | None = Query(
         None, description="Filter from this datetime (inclusive, timezone-aware)"
@@ -88,14 +85,17 @@ async def list_vehicles(
     to_date: datetime | None = Query(
         None, description="Filter to this datetime (inclusive, timezone-aware)"
     ),
+    count: CountParam = CountStrategy.NONE,
 ) -> PaginatedResponse[VehicleWithCountsSchema]:
-    vehicles = await admin_dashboard_service.list_vehicles(
+    vehicles, total = await admin_dashboard_service.list_vehicles(
         user_id=user_id,
         offset=params.offset,
         limit=params.limit,
         from_date=from_date,
         to_date=to_date,
+        count_strategy=count,
     )
+    set_total_header(response, total)
     return paginated_response(
         result=vehicles, request=request, schema=VehicleWithCountsSchema
     )
@@ -107,6 +107,8 @@ async def list_reports(
     request: Request,
     admin_dashboard_service: AdminDashboardServiceDependency,
     params: PaginationParams,
+    cursor: CursorParams,
+    response: Response,
     vehicle_id: str | None = None,
     user_id: str | None = None,
     from_date: datetime | None = Query(
@@ -115,15 +117,20 @@ async def list_reports(
     to_date: datetime | None = Query(
         None, description="Filter to this datetime (inclusive, timezone-aware)"
     ),
+    count: CountParam = CountStrategy.NONE,
 ) -> PaginatedResponse[VehicleReportSchema]:
-    reports = await admin_dashboard_service.list_reports(
+    reports, total = await admin_dashboard_service.list_reports(
         vehicle_id=vehicle_id,
         user_id=user_id,
         offset=params.offset,
         limit=params.limit,
         from_date=from_date,
         to_date=to_date,
+        cursor=cursor,
+        count_strategy=count,
     )
+    cursor.set_header(response)
+    set_total_header(response, total)
     return paginated_response(
         result=reports, request=request, schema=VehicleReportSchema
     )
@@ -135,6 +142,8 @@ async def list_search_logs(
     request: Request,
     admin_dashboard_service: AdminDashboardServiceDependency,
     params: PaginationParams,
+    cursor: CursorParams,
+    response: Response,
     status: SearchTermStatus | None = Query(None, description="Filter by status"),
     user_id: UUID | None = Query(None, description="Filter by user ID"),
     from_date: datetime | None = Query(
@@ -143,15 +152,83 @@ async def list_search_logs(
     to_date: datetime | None = Query(
         None, description="Filter to this datetime (inclusive, timezone-aware)"
     ),
+    count: CountParam = CountStrategy.NONE,
 ) -> PaginatedResponse[VehicleSearchLogResponse]:
-    search_logs = await admin_dashboard_service.get_search_logs(
+    search_logs, total = await admin_dashboard_service.get_search_logs(
         status=status,
         user_id=user_id,
         limit=params.limit,
         offset=params.offset,
         from_date=from_date,
         to_date=to_date,
+        cursor=cursor,
+        count_strategy=count,
     )
+    cursor.set_header(response)
+    set_total_header(response, total)
     return paginated_response(
         result=search_logs, request=request, schema=VehicleSearchLogResponse
     )
+
+
+@router.get("/search-logs/summary", description="Search volume and not-found rate")
+async def get_search_log_summary(
+    user: AdminUserDependency,
+    admin_dashboard_service: AdminDashboardServiceDependency,
+    from_date: datetime | None = Query(
+        None, description="Filter from this datetime (rounded down to the UTC hour)"
+    ),
+    to_date: datetime | None = Query(
+        None, description="Filter to this datetime (inclusive, timezone-aware)"
+    ),
+) -> SearchLogSummarySchema:
+    """Hourly searches by status from the search log rollups"""
+    return await admin_dashboard_service.get_search_log_summary(from_date, to_date)
+
+
+@router.get("/search-logs/top-plates", description="Most searched plates")
+async def get_top_searched_plates(
+    user: AdminUserDependency,
+    admin_dashboard_service: AdminDashboardServiceDependency,
+    from_date: datetime | None = Query(
+        None, description="Filter from this UTC day (of the datetime)"
+    ),
+    to_date: datetime | None = Query(
+        None, description="Filter to this UTC day (of the datetime, inclusive)"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    not_found_only: bool = Query(
+        False, description="Rank by searches that found no vehicle"
+    ),
+) -> List[TopSearchedPlateSchema]:
+    return await admin_dashboard_service.get_top_searched_plates(
+        from_date, to_date, limit=limit, not_found_only=not_found_only
+    )
+
+
+@router.get("/search-logs/geo", description="Search counts per map cell")
+async def get_search_geo_buckets(
+    user: AdminUserDependency,
+    admin_dashboard_service: AdminDashboardServiceDependency,
+    from_date: datetime | None = Query(
+        None, description="Filter from this UTC day (of the datetime)"
+    ),
+    to_date: datetime | None = Query(
+        None, description="Filter to this UTC day (of the datetime, inclusive)"
+    ),
+    limit: int = Query(500, ge=1, le=5000),
+) -> List[SearchGeoBucketSchema]:
+    return await admin_dashboard_service.get_search_geo_buckets(
+        from_date, to_date, limit=limit
+    )
+
+
+@router.get("/search-logs/buffer", description="Search log write-behind buffer metrics")
+async def get_search_log_buffer_stats(
+    user: AdminUserDependency,
+) -> dict:
+    """
+    Queue depth and enqueued/written/dropped/failed row counters of this
+    worker's search log buffer. `lost` = dropped + failed.
+    """
+    return search_log_buffer.get_stats()
@@ -142,3 +142,35 @@ class VehicleSearchLogResponse(CustomBaseModel):
     user: UserSchema | None = Field(None)
     created_at: datetime = Field(...)
     updated_at: datetime = Field(...)
+
+
+class SearchLogHourSchema(CustomBaseModel):
+    hour: datetime = Field(..., description="Start of the UTC hour")
+    success: int = Field(0)
+    not_found: int = Field(0)
+
+
+class SearchLogSummarySchema(CustomBaseModel):
+    total_searches: int = Field(0)
+    success: int = Field(0)
+    not_found: int = Field(0)
+    not_found_rate: float = Field(0.0, description="not_found / total_searches")
+    compacted_until: datetime | None = Field(
+        None, description="Searches after this are not in the rollups yet"
+    )
+    hourly: List[SearchLogHourSchema] = Field(default_factory=list)
+
+
+class TopSearchedPlateSchema(CustomBaseModel):
+    formatted_search_term: str = Field(...)
+    searches: int = Field(...)
+    not_found: int = Field(...)
+    last_searched_at: datetime = Field(...)
+
+
+class SearchGeoBucketSchema(CustomBaseModel):
+    latitude: float = Field(..., description="South edge of the cell")
+    longitude: float = Field(..., description="West edge of the cell")
+    cell_size: float = Field(..., description="Cell size in degrees")
+    searches: int = Field(...)
+    not_found: int = Field(...)
@@ -1,12 +1,28 @@
-from typing import Annotated, List, Optional
+from typing import Annotated, List, Optional, Tuple
 from datetime import datetime
 import uuid
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, desc
 from sqlalchemy.orm import selectinload, joinedload
 
 from apps.api.user.models import User
-from apps.api.vehicle.models import SearchTermStatus, Vehicle, VehicleSearchLog
+from apps.api.vehicle.models import (
+    SearchTermStatus,
+    Vehicle,
+    VehicleSearchLog,
+    VehicleSearchHourlyRollup,
+    VehicleSearchPlateRollup,
+    VehicleSearchGeoRollup,
+    VehicleSearchRollupState,
+)
+from apps.api.vehicle.search_rollups import (
+    GEO_BUCKET_DEGREES,
+    STATE_NAME,
+    hour_bucket,
+    utc_day,
+)
 from apps.api.vehicle.report.models import VehicleReport
+from apps.pagination import CursorPagination, CountStrategy, count_rows
+from apps.statistics import combine_ctes, gather_statistics, cached_statistics
 from avcfastapi.core.database.sqlalchamey.core import SessionDep
 from avcfastapi.core.fastapi.dependency.service_dependency import AbstractService
 
@@ -29,36 +45,78 @@ class AdminDashboardService(AbstractService):
             conds.append(column <= to_date)
         return and_(*conds) if conds else None
 
+    def _rollup_hour_filter(self, from_date: datetime | None, to_date: datetime | None):
+        """Whole UTC hours of the hourly search rollups overlapping the range"""
+        return self._date_filter(
+            VehicleSearchHourlyRollup.hour,
+            hour_bucket(from_date) if from_date else None,
+            to_date,
+        )
+
+    def _rollup_day_filter(self, column, from_date: datetime | None, to_date: datetime | None):
+        """Whole UTC days of a daily search rollup overlapping the range"""
+        return self._date_filter(
+            column,
+            utc_day(from_date) if from_date else None,
+            utc_day(to_date) if to_date else None,
+        )
+
     # --- Counts ---
-    async def get_users_count(
-        self, from_date: datetime | None = None, to_date: datetime | None = None
-    ) -> int:
-        query = select(func.count(User.id))
-        date_cond = self._date_filter(User.created_at, from_date, to_date)
+    def _count_cte(self, name: str, column, date_column, from_date, to_date, **filtered):
+        """One-row CTE: count(column) as `name`, plus count(*) FILTER (...) per keyword"""
+        query = select(
+            func.count(column).label(name),
+            *[
+                func.count().filter(condition).label(label)
+                for label, condition in filtered.items()
+            ]
+        )
+        date_cond = self._date_filter(date_column, from_date, to_date)
         if date_cond is not None:
             query = query.where(date_cond)
-        result = await self.session.execute(query)
-        return result.scalar_one()
+        return query.cte(f"{name}_stats")
 
-    async def get_vehicles_count(
+    async def get_statistics(
         self, from_date: datetime | None = None, to_date: datetime | None = None
-    ) -> int:
-        query = select(func.count(Vehicle.id))
-        date_cond = self._date_filter(Vehicle.created_at, from_date, to_date)
-        if date_cond is not None:
-            query = query.where(date_cond)
-        result = await self.session.execute(query)
-        return result.scalar_one()
+    ) -> dict:
+        """
+        Headline counts for the admin dashboard (see apps/statistics.py):
+        users and vehicles in one statement, reports and search terms in
+        another, run concurrently and cached per date range.
+        """
+        async def load() -> dict:
+            accounts = combine_ctes(
+                self._count_cte("total_users", User.id, User.created_at, from_date, to_date),
+                self._count_cte("total_vehicles", Vehicle.id, Vehicle.created_at, from_date, to_date),
+            )
+            activity = combine_ctes(
+                self._count_cte(
+                    "total_reports", VehicleReport.id, VehicleReport.created_at, from_date, to_date
+                ),
+                self._count_cte(
+                    "total_search_terms",
+                    VehicleSearchLog.id,
+                    VehicleSearchLog.created_at,
+                    from_date,
+                    to_date,
+                    success=VehicleSearchLog.status == SearchTermStatus.SUCCESS.value,
+                    not_found=VehicleSearchLog.status == SearchTermStatus.NOT_FOUND.value,
+                ),
+            )
+            return await gather_statistics(
+                {"accounts": accounts, "activity": activity}, session=self.session
+            )
 
-    async def get_reports_count(
-        self, from_date: datetime | None = None, to_date: datetime | None = None
-    ) -> int:
-        query = select(func.count(VehicleReport.id))
-        date_cond = self._date_filter(VehicleReport.created_at, from_date, to_date)
-        if date_cond is not None:
-            query = query.where(date_cond)
-        result = await self.session.execute(query)
-        return result.scalar_one()
+        stats = await cached_statistics(("admin_statistics", from_date, to_date), load)
+        return {
+            "total_users": stats["total_users"],
+            "total_vehicles": stats["total_vehicles"],
+            "total_reports": stats["total_reports"],
+            "total_search_terms": {
+                "success": stats["success"],
+                "not_found": stats["not_found"],
+            },
+        }
 
     # --- Lists ---
     async def list_users(
@@ -67,6 +125,8 @@ class AdminDashboardService(AbstractService):
         limit: int = 10,
         from_date: datetime | None = None,
         to_date: datetime | None = None,
+        cursor: CursorPagination | None = None,
+        count_strategy: CountStrategy = CountStrategy.NONE,
     ):
         # Subquery for vehicle counts
         vehicle_count_subq = (
@@ -99,18 +159,26 @@ class AdminDashboardService(AbstractService):
             )
             .outerjoin(vehicle_count_subq, User.id == vehicle_count_subq.c.user_id)
             .outerjoin(report_count_subq, User.id == report_count_subq.c.user_id)
-            .offset(offset)
-            .limit(limit)
-            .order_by(User.created_at.desc())
         )
 
         # Apply date filter for user listing itself
+        count_query = select(User.id)
         user_date_cond = self._date_filter(User.created_at, from_date, to_date)
         if user_date_cond is not None:
             query = query.where(user_date_cond)
-
-        result = await self.session.execute(query)
-        rows = result.all()
+            count_query = count_query.where(user_date_cond)
+
+        total = None
+        if cursor is not None and cursor.enabled:
+            query = cursor.apply(query, User.created_at, User.id, limit)
+            result = await self.session.execute(query)
+            rows = cursor.page(result.all(), key=lambda row: row[0])
+        else:
+            # The count doesn't need the per-user aggregate joins
+            total = await count_rows(self.session, count_query, count_strategy)
+            query = query.offset(offset).limit(limit).order_by(User.created_at.desc())
+            result = await self.session.execute(query)
+            rows = result.all()
 
         return [
             {
@@ -119,7 +187,7 @@ class AdminDashboardService(AbstractService):
                 "total_reports_against_user": row[2] or 0,
             }
             for row in rows
-        ]
+        ], total
 
     async def list_vehicles(
         self,
@@ -128,6 +196,7 @@ class AdminDashboardService(AbstractService):
         limit: int = 10,
         from_date: datetime | None = None,
         to_date: datetime | None = None,
+        count_strategy: CountStrategy = CountStrategy.NONE,
     ):
         # Subquery for report counts per vehicle
         report_query = select(
@@ -146,13 +215,19 @@ class AdminDashboardService(AbstractService):
             .options(joinedload(Vehicle.owner))
         ).order_by(Vehicle.created_at.desc())
 
+        count_query = select(Vehicle.id)
+
         if user_id is not None:
             query = query.where(Vehicle.user_id == user_id)
+            count_query = count_query.where(Vehicle.user_id == user_id)
 
         # Apply date filter for vehicle itself
         vehicle_date_cond = self._date_filter(Vehicle.created_at, from_date, to_date)
         if vehicle_date_cond is not None:
             query = query.where(vehicle_date_cond)
+            count_query = count_query.where(vehicle_date_cond)
+
+        total = await count_rows(self.session, count_query, count_strategy)
 
         query = query.offset(offset).limit(limit)
 
@@ -165,7 +240,7 @@ class AdminDashboardService(AbstractService):
                 "total_reports_against_user": row[1] or 0,
             }
             for row in rows
-        ]
+        ], total
 
     async def list_reports(
         self,
@@ -175,6 +250,8 @@ class AdminDashboardService(AbstractService):
         limit: int = 10,
         from_date: datetime | None = None,
         to_date: datetime | None = None,
+        cursor: CursorPagination | None = None,
+        count_strategy: CountStrategy = CountStrategy.NONE,
     ):
         query = (
             select(VehicleReport)
@@ -199,10 +276,17 @@ class AdminDashboardService(AbstractService):
         if report_date_cond is not None:
             query = query.where(report_date_cond)
 
+        if cursor is not None and cursor.enabled:
+            query = cursor.apply(query, VehicleReport.created_at, VehicleReport.id, limit)
+            result = await self.session.execute(query)
+            return cursor.page(result.scalars().all()), None
+
+        total = await count_rows(self.session, query, count_strategy)
+
         query = query.offset(offset).limit(limit)
 
         result = await self.session.execute(query)
-        return result.scalars().all()
+        return result.scalars().all(), total
 
     async def get_search_logs(
         self,
@@ -212,7 +296,9 @@ class AdminDashboardService(AbstractService):
         offset: int = 0,
         from_date: Optional[datetime] = None,
         to_date: Optional[datetime] = None,
-    ) -> List[VehicleSearchLog]:
+        cursor: Optional[CursorPagination] = None,
+        count_strategy: CountStrategy = CountStrategy.NONE,
+    ) -> Tuple[List[VehicleSearchLog], Optional[int]]:
         query = select(VehicleSearchLog).options(joinedload(VehicleSearchLog.user))
 
         date_cond = self._date_filter(VehicleSearchLog.created_at, from_date, to_date)
@@ -225,6 +311,15 @@ class AdminDashboardService(AbstractService):
         if user_id:
             query = query.where(VehicleSearchLog.user_id == user_id)
 
+        if cursor is not None and cursor.enabled:
+            query = cursor.apply(
+                query, VehicleSearchLog.created_at, VehicleSearchLog.id, limit or 10
+            )
+            result = await self.session.execute(query)
+            return cursor.page(result.scalars().all()), None
+
+        total = await count_rows(self.session, query, count_strategy)
+
         if offset and offset > 0:
             query = query.offset(offset)
 
@@ -232,25 +327,135 @@ class AdminDashboardService(AbstractService):
             query = query.limit(limit)
 
         result = await self.session.execute(query)
-        return result.scalars().all()
+        return result.scalars().all(), total
 
-    async def count_search_logs(
+    # --- Search log rollups (see apps/api/vehicle/search_rollups.py) ---
+    async def get_search_log_summary(
         self,
-        status: Optional[SearchTermStatus] = None,
         from_date: Optional[datetime] = None,
         to_date: Optional[datetime] = None,
-    ) -> int:
-        query = select(func.count(VehicleSearchLog.id))
+    ) -> dict:
+        """Searches per hour by status, totals and the not-found rate"""
+        async def load() -> dict:
+            searches = VehicleSearchHourlyRollup.searches
+            status = VehicleSearchHourlyRollup.status
+            query = (
+                select(
+                    VehicleSearchHourlyRollup.hour,
+                    func.coalesce(
+                        func.sum(searches).filter(status == SearchTermStatus.SUCCESS.value), 0
+                    ).label("success"),
+                    func.coalesce(
+                        func.sum(searches).filter(status == SearchTermStatus.NOT_FOUND.value), 0
+                    ).label("not_found"),
+                )
+                .group_by(VehicleSearchHourlyRollup.hour)
+                .order_by(VehicleSearchHourlyRollup.hour)
+            )
+            date_cond = self._rollup_hour_filter(from_date, to_date)
+            if date_cond is not None:
+                query = query.where(date_cond)
+
+            hourly = [dict(row._mapping) for row in (await self.session.execute(query)).all()]
+            success = sum(hour["success"] for hour in hourly)
+            not_found = sum(hour["not_found"] for hour in hourly)
+            total = success + not_found
+            compacted_until = await self.session.scalar(
+                select(VehicleSearchRollupState.compacted_until).where(
+                    VehicleSearchRollupState.name == STATE_NAME
+                )
+            )
+            return {
+                "total_searches": total,
+                "success": success,
+                "not_found": not_found,
+                "not_found_rate": round(not_found / total, 4) if total else 0.0,
+                "compacted_until": compacted_until,
+                "hourly": hourly,
+            }
 
-        date_cond = self._date_filter(VehicleSearchLog.created_at, from_date, to_date)
-        if date_cond is not None:
-            query = query.where(date_cond)
+        return await cached_statistics(("search_log_summary", from_date, to_date), load)
 
-        if status:
-            query = query.where(VehicleSearchLog.status == status.value)
+    async def get_top_searched_plates(
+        self,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        limit: int = 20,
+        not_found_only: bool = False,
+    ) -> List[dict]:
+        """
+        Most searched formatted search terms over whole UTC days; with
+        not_found_only, the terms most often searched without a match.
+        """
+        async def load() -> dict:
+            searches = func.sum(VehicleSearchPlateRollup.searches)
+            not_found = func.sum(VehicleSearchPlateRollup.not_found)
+            query = (
+                select(
+                    VehicleSearchPlateRollup.formatted_search_term,
+                    searches.label("searches"),
+                    not_found.label("not_found"),
+                    func.max(VehicleSearchPlateRollup.last_searched_at).label("last_searched_at"),
+                )
+                .group_by(VehicleSearchPlateRollup.formatted_search_term)
+                .order_by(
+                    desc(not_found if not_found_only else searches),
+                    VehicleSearchPlateRollup.formatted_search_term,
+                )
+                .limit(limit)
+            )
+            date_cond = self._rollup_day_filter(VehicleSearchPlateRollup.day, from_date, to_date)
+            if date_cond is not None:
+                query = query.where(date_cond)
+            if not_found_only:
+                query = query.having(not_found > 0)
 
-        result = await self.session.execute(query)
-        return result.scalar_one()
+            rows = (await self.session.execute(query)).all()
+            return {"plates": [dict(row._mapping) for row in rows]}
+
+        key = ("top_searched_plates", from_date, to_date, limit, not_found_only)
+        return (await cached_statistics(key, load))["plates"]
+
+    async def get_search_geo_buckets(
+        self,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        limit: int = 500,
+    ) -> List[dict]:
+        """Busiest latitude/longitude cells over whole UTC days"""
+        async def load() -> dict:
+            searches = func.sum(VehicleSearchGeoRollup.searches)
+            query = (
+                select(
+                    VehicleSearchGeoRollup.lat_bucket,
+                    VehicleSearchGeoRollup.lng_bucket,
+                    searches.label("searches"),
+                    func.sum(VehicleSearchGeoRollup.not_found).label("not_found"),
+                )
+                .group_by(VehicleSearchGeoRollup.lat_bucket, VehicleSearchGeoRollup.lng_bucket)
+                .order_by(desc(searches))
+                .limit(limit)
+            )
+            date_cond = self._rollup_day_filter(VehicleSearchGeoRollup.day, from_date, to_date)
+            if date_cond is not None:
+                query = query.where(date_cond)
+
+            rows = (await self.session.execute(query)).all()
+            return {
+                "buckets": [
+                    {
+                        "latitude": float(row.lat_bucket),
+                        "longitude": float(row.lng_bucket),
+                        "cell_size": float(GEO_BUCKET_DEGREES),
+                        "searches": row.searches,
+                        "not_found": row.not_found,
+                    }
+                    for row in rows
+                ]
+            }
+
+        key = ("search_geo_buckets", from_date, to_date, limit)
+        return (await cached_statistics(key, load))["buckets"]
 
 
 AdminDashboardServiceDependency = Annotated[
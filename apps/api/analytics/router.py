@@ -2,7 +2,7 @@
 
 from typing import Optional
 from datetime import datetime
-from fastapi import APIRouter, Request, Query
+from fastapi import APIRouter, Request, Query, Response
 
 from apps.api.user.models import User
 from apps.api.auth.dependency import AdminUserDependency
@@ -19,6 +19,7 @@ from avcfastapi.core.fastapi.response.pagination import (
     PaginationParams,
     paginated_response,
 )
+from apps.pagination import CursorParams
 from avcfastapi.core.database.sqlalchamey.core import SessionDep
 from sqlalchemy import select
 
@@ -102,6 +103,8 @@ async def get_cta_events(
     admin: AdminUserDependency,
     analytics_service: AnalyticsServiceDependency,
     pagination: PaginationParams,
+    cursor: CursorParams,
+    response: Response,
     start_date: Optional[datetime] = Query(None, description="Filter from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter until this date"),
     event_type: Optional[str] = Query(None, description="Filter by event type"),
@@ -116,7 +119,9 @@ async def get_cta_events(
         start_date=start_date,
         end_date=end_date,
         event_type=event_type,
+        cursor=cursor,
     )
+    cursor.set_header(response)
     return paginated_response(
         result=[CTAEventResponse.model_validate(event) for event in events],
         request=pagination.request,
@@ -8,6 +8,7 @@ from datetime import datetime
 
 from apps.api.analytics.models import CallToActionEvent
 from apps.api.analytics.schema import CTAEventCreate, CTAAnalytics
+from apps.pagination import CursorPagination
 from avcfastapi.core.database.sqlalchamey.core import SessionDep
 from avcfastapi.core.fastapi.dependency.service_dependency import AbstractService
 
@@ -137,7 +138,8 @@ class AnalyticsService(AbstractService):
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         event_type: Optional[str] = None,
-    ) -> tuple[List[CallToActionEvent], int]:
+        cursor: Optional[CursorPagination] = None,
+    ) -> tuple[List[CallToActionEvent], Optional[int]]:
         """
         Get list of CTA events with optional filters.
 
@@ -147,9 +149,11 @@ class AnalyticsService(AbstractService):
             start_date: Filter events from this date
             end_date: Filter events until this date
             event_type: Filter by specific event type
+            cursor: Keyset pagination state; when enabled, skip is ignored
+                and no total count is run
 
         Returns:
-            Tuple of (list of events, total count)
+            Tuple of (list of events, total count or None in cursor mode)
         """
         query = select(CallToActionEvent)
 
@@ -161,6 +165,11 @@ class AnalyticsService(AbstractService):
         if event_type:
             query = query.where(CallToActionEvent.event_type == event_type)
 
+        if cursor is not None and cursor.enabled:
+            query = cursor.apply(query, CallToActionEvent.created_at, CallToActionEvent.id, limit)
+            result = await self.session.execute(query)
+            return cursor.page(result.scalars().all()), None
+
         # Get total count
         count_result = await self.session.execute(
             select(func.count()).select_from(query.subquery())
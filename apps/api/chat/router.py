@@ -1,5 +1,5 @@
 from uuid import UUID
-from fastapi import APIRouter, Form, Request, UploadFile
+from fastapi import APIRouter, Form, Request, Response, UploadFile
 from fastapi.params import File
 
 from apps.api.auth.dependency import UserDependency
@@ -12,6 +12,7 @@ from avcfastapi.core.fastapi.response.pagination import (
     PaginationParams,
     paginated_response,
 )
+from apps.pagination import CursorParams
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
@@ -48,6 +49,8 @@ async def list_messages(
     chat_service: ChatServiceDependency,
     report_id: str,
     pagination: PaginationParams,
+    cursor: CursorParams,
+    response: Response,
 ) -> PaginatedResponse[ChatMessageListSchema]:
     if not await chat_service.check_user_has_permission(user.id, report_id):
         raise InvalidRequestException(
@@ -57,7 +60,9 @@ async def list_messages(
         report_id=report_id,
         offset=pagination.offset,
         limit=pagination.limit,
+        cursor=cursor,
     )
+    cursor.set_header(response)
     return paginated_response(
         result=messages,
         request=request,
@@ -8,6 +8,7 @@ from sqlalchemy.orm import selectinload, joinedload
 from apps.api.chat.models import ChatMessage, ChatMessageAttachment
 from apps.api.vehicle.models import Vehicle
 from apps.api.vehicle.report.models import VehicleReport
+from apps.pagination import CursorPagination
 from avcfastapi.core.database.sqlalchamey.core import SessionDep
 from avcfastapi.core.exception.authentication import ForbiddenException
 from avcfastapi.core.fastapi.dependency.service_dependency import AbstractService
@@ -80,13 +81,18 @@ class ChatService(AbstractService):
         return message
 
     async def get_messages_for_report(
-        self, report_id: UUID, limit: int = 100, offset: int = 0
+        self,
+        report_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[CursorPagination] = None,
     ) -> List[ChatMessage]:
         """
         Retrieve chat messages for a specific report.
         :param report_id: The ID of the report for which to retrieve messages.
         :param limit: The maximum number of messages to retrieve.
         :param offset: The number of messages to skip before starting to collect the result set.
+        :param cursor: Keyset pagination state; when enabled, offset is ignored.
         :return: A list of chat messages.
         """
         query = (
@@ -100,6 +106,10 @@ class ChatService(AbstractService):
             .order_by(ChatMessage.created_at.desc())
         )
 
+        if cursor is not None and cursor.enabled:
+            query = cursor.apply(query, ChatMessage.created_at, ChatMessage.id, limit or 100)
+            return cursor.page((await self.session.scalars(query)).all())
+
         if limit is not None:
             query = query.limit(limit)
         if offset is not None:
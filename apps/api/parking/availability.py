@@ -0,0 +1,102 @@
+# apps/api/parking/availability.py
+
+"""
+Slot availability helpers shared by ParkingService and EnhancedParkingService.
+
+Occupancy is read from the maintained parking_slot_occupancy counters
+(see parking/occupancy.py), for many slots in one query. Bulk lookups go
+through the availability cache (see parking/cache.py).
+"""
+
+from typing import Dict, Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.parking.models import ParkingSlot, ParkingSlotOccupancy
+from apps.api.parking.schema import SlotAvailability
+from apps.api.parking.cache import availability_cache
+
+
+async def fetch_live_occupancy(
+    session: AsyncSession,
+    slot_ids: Iterable[UUID]
+) -> Dict[UUID, Dict[str, int]]:
+    """
+    Current occupancy by vehicle type for each slot.
+    Every requested slot is present in the result, empty slots map to {}.
+    """
+    slot_ids = list(dict.fromkeys(slot_ids))
+    occupancy: Dict[UUID, Dict[str, int]] = {slot_id: {} for slot_id in slot_ids}
+    if not slot_ids:
+        return occupancy
+
+    result = await session.execute(
+        select(
+            ParkingSlotOccupancy.slot_id,
+            ParkingSlotOccupancy.vehicle_type,
+            ParkingSlotOccupancy.occupied
+        )
+        .where(
+            ParkingSlotOccupancy.slot_id.in_(slot_ids),
+            ParkingSlotOccupancy.occupied > 0
+        )
+    )
+
+    for slot_id, vehicle_type, occupied in result:
+        occupancy[slot_id][vehicle_type] = occupied
+
+    return occupancy
+
+
+def build_slot_availability(
+    slot: ParkingSlot,
+    occupied: Dict[str, int]
+) -> SlotAvailability:
+    """Combine slot capacity with its current occupancy"""
+    capacity = slot.capacity or {}
+    available = {}
+    total_capacity = 0
+    total_occupied = 0
+
+    for vehicle_type, max_count in capacity.items():
+        current = occupied.get(vehicle_type, 0)
+        available[vehicle_type] = max_count - current
+        total_capacity += max_count
+        total_occupied += current
+
+    occupancy_pct = (total_occupied / total_capacity * 100) if total_capacity > 0 else 0
+
+    return SlotAvailability(
+        slot_id=slot.id,
+        capacity=capacity,
+        occupied=occupied,
+        available=available,
+        occupancy_percentage=round(occupancy_pct, 2)
+    )
+
+
+async def get_bulk_availability(
+    session: AsyncSession,
+    slots: Iterable[ParkingSlot],
+    use_cache: bool = True
+) -> Dict[UUID, SlotAvailability]:
+    """Availability for already-loaded slots, keyed by slot id"""
+    slots = list(slots)
+    availability = {}
+    if use_cache:
+        availability = await availability_cache.get_many(slot.id for slot in slots)
+
+    missing = [slot for slot in slots if slot.id not in availability]
+    if missing:
+        occupancy = await fetch_live_occupancy(session, [slot.id for slot in missing])
+        loaded = {
+            slot.id: build_slot_availability(slot, occupancy[slot.id])
+            for slot in missing
+        }
+        if use_cache:
+            await availability_cache.set_many(loaded)
+        availability.update(loaded)
+
+    return availability
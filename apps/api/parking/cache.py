@@ -0,0 +1,170 @@
+# apps/api/parking/cache.py
+
+"""
+TTL cache for slot availability.
+
+Public availability and nearby endpoints are polled constantly by the
+customer map, so SlotAvailability is cached per slot for a few seconds.
+Check-in, check-out, escape and slot edits invalidate the entry after
+they commit; the TTL bounds staleness for anything that slips through.
+
+The storage is pluggable: InMemoryAvailabilityBackend is per-process,
+a shared backend (e.g. Redis) can be installed with
+availability_cache.set_backend() so several workers see the same entries.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+from uuid import UUID
+
+from cachetools import TTLCache
+
+from apps.api.parking.schema import SlotAvailability
+from apps.settings import settings
+
+
+class AvailabilityCacheBackend(ABC):
+    """Storage interface for cached slot availability"""
+
+    @abstractmethod
+    async def get(self, slot_id: UUID) -> Optional[SlotAvailability]:
+        ...
+
+    @abstractmethod
+    async def set(self, slot_id: UUID, availability: SlotAvailability) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, slot_id: UUID) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    async def size(self) -> Optional[int]:
+        """Number of live entries, if the backend can tell cheaply"""
+        return None
+
+
+class InMemoryAvailabilityBackend(AvailabilityCacheBackend):
+    """Per-process TTL + LRU cache guarded by an asyncio lock"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = asyncio.Lock()
+
+    async def get(self, slot_id: UUID) -> Optional[SlotAvailability]:
+        async with self._lock:
+            return self._cache.get(slot_id)
+
+    async def set(self, slot_id: UUID, availability: SlotAvailability) -> None:
+        async with self._lock:
+            self._cache[slot_id] = availability
+
+    async def delete(self, slot_id: UUID) -> None:
+        async with self._lock:
+            self._cache.pop(slot_id, None)
+
+    async def clear(self) -> None:
+        async with self._lock:
+            self._cache.clear()
+
+    async def size(self) -> Optional[int]:
+        async with self._lock:
+            self._cache.expire()
+            return len(self._cache)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+
+class AvailabilityCache:
+    """Slot availability cache with hit/miss accounting"""
+
+    def __init__(self, backend: AvailabilityCacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.stats = CacheStats()
+
+    def set_backend(self, backend: AvailabilityCacheBackend) -> None:
+        self.backend = backend
+
+    async def get_or_load(
+        self,
+        slot_id: UUID,
+        loader: Callable[[], Awaitable[SlotAvailability]]
+    ) -> SlotAvailability:
+        """Return the cached availability or load and store it"""
+        if not self.enabled:
+            return await loader()
+
+        cached = await self.backend.get(slot_id)
+        if cached is not None:
+            self.stats.hits += 1
+            return cached
+
+        self.stats.misses += 1
+        availability = await loader()
+        await self.backend.set(slot_id, availability)
+        return availability
+
+    async def get_many(self, slot_ids: Iterable[UUID]) -> Dict[UUID, SlotAvailability]:
+        """Cached entries for the given slots; missing slots are left out"""
+        found = {}
+        if not self.enabled:
+            return found
+
+        for slot_id in slot_ids:
+            cached = await self.backend.get(slot_id)
+            if cached is not None:
+                self.stats.hits += 1
+                found[slot_id] = cached
+            else:
+                self.stats.misses += 1
+        return found
+
+    async def set_many(self, entries: Dict[UUID, SlotAvailability]) -> None:
+        if not self.enabled:
+            return
+
+        for slot_id, availability in entries.items():
+            await self.backend.set(slot_id, availability)
+
+    async def invalidate(self, slot_id: UUID) -> None:
+        """Drop a slot's entry; call after the write has committed"""
+        if not self.enabled:
+            return
+
+        self.stats.invalidations += 1
+        await self.backend.delete(slot_id)
+
+    async def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": settings.PARKING_AVAILABILITY_CACHE_TTL,
+            "size": await self.backend.size(),
+            "hit_ratio": self.stats.hit_ratio,
+            **asdict(self.stats)
+        }
+
+
+availability_cache = AvailabilityCache(
+    backend=InMemoryAvailabilityBackend(
+        maxsize=settings.PARKING_AVAILABILITY_CACHE_SIZE,
+        ttl=settings.PARKING_AVAILABILITY_CACHE_TTL
+    ),
+    enabled=settings.PARKING_AVAILABILITY_CACHE_TTL > 0
+)
@@ -0,0 +1,136 @@
+# apps/api/parking/geo.py
+
+"""
+Geo helpers for nearby parking search.
+
+Nearby queries run in two stages so they can use an index instead of
+scanning every active slot:
+1. A bounding-box prefilter on latitude/longitude, served by the
+   composite index ix_parking_slots_status_lat_lng.
+2. Exact Haversine distance on the rows that survive the prefilter,
+   ordered and limited in SQL.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from sqlalchemy import select, func, or_, and_
+
+from apps.api.parking.models import ParkingSlot, SlotStatus
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+@dataclass(frozen=True)
+class BoundingBox:
+    """Lat/lng square that fully contains a search circle"""
+    min_lat: float
+    max_lat: float
+    # One range normally, two when the box crosses the antimeridian
+    lon_ranges: Tuple[Tuple[float, float], ...]
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        if not (self.min_lat <= latitude <= self.max_lat):
+            return False
+        return any(low <= longitude <= high for low, high in self.lon_ranges)
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> BoundingBox:
+    """
+    Compute the bounding box of a circle on the earth's surface.
+    Every point within radius_km of (latitude, longitude) lies inside it.
+    """
+    angular_radius = radius_km / EARTH_RADIUS_KM
+    lat_delta = math.degrees(angular_radius)
+
+    min_lat = latitude - lat_delta
+    max_lat = latitude + lat_delta
+
+    # Circle touches a pole: every longitude is in range
+    if min_lat <= -90 or max_lat >= 90:
+        return BoundingBox(
+            min_lat=max(min_lat, -90.0),
+            max_lat=min(max_lat, 90.0),
+            lon_ranges=((-180.0, 180.0),)
+        )
+
+    lon_delta = math.degrees(
+        math.asin(min(1.0, math.sin(angular_radius) / math.cos(math.radians(latitude))))
+    )
+    min_lon = longitude - lon_delta
+    max_lon = longitude + lon_delta
+
+    if min_lon < -180:
+        lon_ranges = ((min_lon + 360, 180.0), (-180.0, max_lon))
+    elif max_lon > 180:
+        lon_ranges = ((min_lon, 180.0), (-180.0, max_lon - 360))
+    else:
+        lon_ranges = ((min_lon, max_lon),)
+
+    return BoundingBox(min_lat=min_lat, max_lat=max_lat, lon_ranges=lon_ranges)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def haversine_sql(latitude: float, longitude: float, lat_column, lon_column):
+    """SQL expression for the Haversine distance (km) from a fixed point to a row"""
+    lat_rad = math.radians(latitude)
+    lon_rad = math.radians(longitude)
+    row_lat_rad = func.radians(lat_column)
+    row_lon_rad = func.radians(lon_column)
+
+    a = (
+        func.power(func.sin((row_lat_rad - lat_rad) / 2), 2)
+        + math.cos(lat_rad) * func.cos(row_lat_rad)
+        * func.power(func.sin((row_lon_rad - lon_rad) / 2), 2)
+    )
+    # least() guards asin against floating point drift above 1.0
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+
+def bounding_box_clause(box: BoundingBox, lat_column, lon_column):
+    """Index-friendly range predicate for a bounding box"""
+    lon_clauses: List = [
+        lon_column.between(low, high) for low, high in box.lon_ranges
+    ]
+    return and_(
+        lat_column.between(box.min_lat, box.max_lat),
+        or_(*lon_clauses) if len(lon_clauses) > 1 else lon_clauses[0]
+    )
+
+
+def nearby_slots_query(
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    limit: int
+):
+    """
+    Select active slots within radius_km, closest first.
+    Rows are (ParkingSlot, distance_km).
+    """
+    box = bounding_box(latitude, longitude, radius_km)
+    distance = haversine_sql(latitude, longitude, ParkingSlot.latitude, ParkingSlot.longitude)
+
+    return (
+        select(ParkingSlot, distance.label("distance_km"))
+        .where(
+            ParkingSlot.status == SlotStatus.ACTIVE,
+            ParkingSlot.deleted_at.is_(None),
+            bounding_box_clause(box, ParkingSlot.latitude, ParkingSlot.longitude),
+            distance <= radius_km
+        )
+        .order_by(distance)
+        .limit(limit)
+    )
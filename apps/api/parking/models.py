@@ -2,10 +2,11 @@
 
 from sqlalchemy import Column, String, Float, Numeric, Enum as SQLEnum, ForeignKey, UUID, UniqueConstraint
 import sqlalchemy as sa
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.dialects.postgresql import JSONB
 import enum
 
+from apps.api.vehicle.plate import canonical_plate_sql
 from avcfastapi.core.database.sqlalchamey.base import AbstractSQLModel
 from avcfastapi.core.database.sqlalchamey.mixins import SoftDeleteMixin, TimestampsMixin
 from avcfastapi.core.database.sqlalchamey.fields import TZAwareDateTime
@@ -77,6 +78,19 @@ class DueStatus(str, enum.Enum):
     WRITTEN_OFF = "written_off"
 
 
+class SyncOperationType(str, enum.Enum):
+    """Operation in an offline gate batch sync"""
+    CHECK_IN = "check_in"
+    CHECK_OUT = "check_out"
+
+
+class SyncItemStatus(str, enum.Enum):
+    """Outcome of one batch sync operation"""
+    APPLIED = "applied"
+    DUPLICATE = "duplicate"  # Idempotency key already applied
+    FAILED = "failed"
+
+
 # ===== Models =====
 
 class ParkingSlot(AbstractSQLModel, SoftDeleteMixin, TimestampsMixin):
@@ -85,6 +99,10 @@ class ParkingSlot(AbstractSQLModel, SoftDeleteMixin, TimestampsMixin):
     Stores location, capacity, and pricing configuration.
     """
     __tablename__ = "parking_slots"
+    __table_args__ = (
+        # Bounding-box prefilter for nearby search (see parking/geo.py)
+        sa.Index("ix_parking_slots_status_lat_lng", "status", "latitude", "longitude"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -198,8 +216,35 @@ class ParkingSession(AbstractSQLModel, TimestampsMixin):
     Stores calculated fees and payment status.
     
     NEW: Links to vehicle owner when vehicle_number matches registered vehicle.
+    
+    Range partitioned by month of check_in_time (see parking/partitions.py).
+    Partitioning and the table's (id, check_in_time) primary key are owned
+    by migration f2b6d0c8a417, not declared here; id alone identifies a
+    session, so the ORM keys on it. Being partitioned, the table can't be
+    the target of foreign keys and has no unique index on vehicle_number:
+    one active session per vehicle is enforced by the check-in paths
+    (occupancy.lock_vehicle_numbers).
     """
     __tablename__ = "parking_sessions"
+    __table_args__ = (
+        # Hot-path composites (see scripts/test_parking_query_plans.py)
+        sa.Index("ix_parking_sessions_slot_status", "slot_id", "status"),
+        sa.Index("ix_parking_sessions_slot_check_in", "slot_id", "check_in_time", "id"),
+        sa.Index("ix_parking_sessions_vehicle_status", "vehicle_number", "status"),
+        sa.Index("ix_parking_sessions_vehicle_check_in", "vehicle_number", "check_in_time"),
+        # Plate history and joins with vehicles (see vehicle/plate.py)
+        sa.Index(
+            "ix_parking_sessions_canonical_plate_check_in",
+            canonical_plate_sql(sa.literal_column("vehicle_number")),
+            "check_in_time"
+        ),
+        sa.Index(
+            "ix_parking_sessions_checked_in_slot",
+            "slot_id",
+            "vehicle_type",
+            postgresql_where=sa.text("status = 'checked_in'")
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -219,6 +264,7 @@ class ParkingSession(AbstractSQLModel, TimestampsMixin):
         index=True,
         comment="Vehicle registration number"
     )
+    canonical_plate = column_property(canonical_plate_sql(vehicle_number), deferred=True)
     vehicle_type = Column(
         String(20),
         nullable=False
@@ -289,7 +335,90 @@ class ParkingSession(AbstractSQLModel, TimestampsMixin):
     check_in_staff = relationship("User", foreign_keys=[checked_in_by])
     check_out_staff = relationship("User", foreign_keys=[checked_out_by])
     vehicle_owner = relationship("User", foreign_keys=[vehicle_owner_id])  # NEW
-    due = relationship("VehicleDue", back_populates="session", uselist=False, foreign_keys="[VehicleDue.session_id]")
+    due = relationship(
+        "VehicleDue",
+        back_populates="session",
+        uselist=False,
+        primaryjoin="ParkingSession.id == foreign(VehicleDue.session_id)"
+    )
+
+
+class ParkingSlotOccupancy(AbstractSQLModel, TimestampsMixin):
+    """
+    Live count of checked-in vehicles per slot and vehicle type.
+    Maintained in the same transaction as every session status change
+    (see parking/occupancy.py), so availability is a primary-key read
+    instead of a COUNT over parking_sessions.
+    """
+    __tablename__ = "parking_slot_occupancy"
+
+    slot_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("parking_slots.id"),
+        primary_key=True
+    )
+    vehicle_type = Column(
+        String(20),
+        primary_key=True
+    )
+    occupied = Column(
+        sa.Integer,
+        nullable=False,
+        default=0,
+        server_default="0"
+    )
+
+
+class ParkingHourlyRollup(AbstractSQLModel, TimestampsMixin):
+    """
+    Closed sessions, revenue and dues per slot, vehicle type and UTC hour.
+    Maintained in the same transaction as check-outs, escapes and due
+    collections (see parking/rollups.py), so dashboards sum a few hundred
+    rollup rows instead of scanning parking_sessions.
+    """
+    __tablename__ = "parking_hourly_rollups"
+    __table_args__ = (
+        sa.Index("ix_parking_hourly_rollups_slot_hour", "slot_id", "hour"),
+    )
+
+    slot_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("parking_slots.id"),
+        primary_key=True
+    )
+    vehicle_type = Column(
+        String(20),
+        primary_key=True
+    )
+    hour = Column(
+        TZAwareDateTime(timezone=True),
+        primary_key=True,
+        comment="Start of the UTC hour"
+    )
+
+    checkouts = Column(sa.Integer, nullable=False, default=0, server_default="0")
+    escapes = Column(sa.Integer, nullable=False, default=0, server_default="0")
+    revenue = Column(
+        Numeric(12, 2),
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Fees collected at check-out"
+    )
+    dues_raised = Column(
+        Numeric(12, 2),
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Dues created for sessions closed in this hour"
+    )
+    dues_collected = Column(
+        Numeric(12, 2),
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Due payments collected in this hour, against this slot's sessions"
+    )
 
 
 class VehicleDue(AbstractSQLModel, TimestampsMixin):
@@ -298,6 +427,26 @@ class VehicleDue(AbstractSQLModel, TimestampsMixin):
     Links to slot owner (not specific slot) for cross-slot tracking.
     """
     __tablename__ = "vehicle_dues"
+    __table_args__ = (
+        # Due check at check-in and due lists (see scripts/test_parking_query_plans.py)
+        sa.Index(
+            "ix_vehicle_dues_vehicle_owner_status",
+            "vehicle_number",
+            "slot_owner_id",
+            "status"
+        ),
+        sa.Index(
+            "ix_vehicle_dues_pending_vehicle",
+            "vehicle_number",
+            postgresql_where=sa.text("status = 'pending'")
+        ),
+        sa.Index("ix_vehicle_dues_owner_created", "slot_owner_id", "created_at", "id"),
+        # Outstanding dues of a plate (see vehicle/plate.py)
+        sa.Index(
+            "ix_vehicle_dues_canonical_plate",
+            canonical_plate_sql(sa.literal_column("vehicle_number"))
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -311,6 +460,7 @@ class VehicleDue(AbstractSQLModel, TimestampsMixin):
         index=True,  # Critical for due checking on check-in
         comment="Vehicle registration number with unpaid dues"
     )
+    canonical_plate = column_property(canonical_plate_sql(vehicle_number), deferred=True)
     slot_owner_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id"),
@@ -318,9 +468,10 @@ class VehicleDue(AbstractSQLModel, TimestampsMixin):
         index=True,
         comment="Owner of parking slot (for cross-slot tracking)"
     )
+    # No foreign keys to the partitioned parking_sessions table; the
+    # session may also have been archived (scripts/parking_partitions.py)
     session_id = Column(
         UUID(as_uuid=True),
-        ForeignKey("parking_sessions.id"),
         nullable=False,
         unique=True,
         comment="Original escaped session"
@@ -356,7 +507,6 @@ class VehicleDue(AbstractSQLModel, TimestampsMixin):
     )
     payment_session_id = Column(
         UUID(as_uuid=True),
-        ForeignKey("parking_sessions.id"),
         nullable=True,
         comment="Session during which due was paid"
     )
@@ -370,6 +520,57 @@ class VehicleDue(AbstractSQLModel, TimestampsMixin):
 
     # Relationships
     owner = relationship("User", foreign_keys=[slot_owner_id])
-    session = relationship("ParkingSession", foreign_keys=[session_id], back_populates="due")
+    session = relationship(
+        "ParkingSession",
+        primaryjoin="foreign(VehicleDue.session_id) == ParkingSession.id",
+        back_populates="due"
+    )
     payment_staff = relationship("User", foreign_keys=[paid_by_staff])
-    payment_session = relationship("ParkingSession", foreign_keys=[payment_session_id])
\ No newline at end of file
+    payment_session = relationship(
+        "ParkingSession",
+        primaryjoin="foreign(VehicleDue.payment_session_id) == ParkingSession.id"
+    )
+
+
+class ParkingSyncOperation(AbstractSQLModel, TimestampsMixin):
+    """
+    Applied operations from gate batch sync, keyed by the client's
+    idempotency key so a retried batch never applies an entry twice.
+    """
+    __tablename__ = "parking_sync_operations"
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        server_default=sa.text("gen_random_uuid()"),
+        default=sa.text("gen_random_uuid()"),
+    )
+    idempotency_key = Column(
+        String(100),
+        nullable=False,
+        unique=True,
+        comment="Client generated key for the operation"
+    )
+    slot_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("parking_slots.id"),
+        nullable=False,
+        index=True
+    )
+    operation = Column(String(20), nullable=False)
+    vehicle_number = Column(String(20), nullable=False)
+    session_id = Column(
+        UUID(as_uuid=True),
+        nullable=False,
+        comment="Session created or closed by this operation"
+    )
+    submitted_by = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id"),
+        nullable=False
+    )
+    client_timestamp = Column(
+        TZAwareDateTime(timezone=True),
+        nullable=False,
+        comment="When the attendant recorded the operation offline"
+    )
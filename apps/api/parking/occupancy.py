@@ -0,0 +1,186 @@
+# apps/api/parking/occupancy.py
+
+"""
+Maintained live-occupancy counters (parking_slot_occupancy).
+
+Every session status change adjusts the counter for its slot and vehicle
+type in the caller's transaction, so the counter commits or rolls back
+together with the session row. rebuild_occupancy() recomputes the counters
+from parking_sessions and is used by the reconcile_parking_occupancy script.
+
+Check-ins either serialize per slot on the slot row (lock_slot) or bump
+the counter with a capacity-guarded upsert (parking/checkin.py), so two
+gates can't both take the last space. A vehicle is kept to one active
+session across slots by lock_vehicle_numbers(): parking_sessions is
+partitioned by check_in_time, so a unique index on vehicle_number alone
+is not possible, and check-ins instead serialize per plate on a
+transaction-scoped advisory lock taken before they look for an open session.
+Check-outs and escapes take the same plate lock and the session's row lock
+(lock_open_session) before checking its status, so a session is closed,
+and its counter decremented, only once.
+"""
+
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.dialects.postgresql import insert, array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.parking.models import (
+    ParkingSlot,
+    ParkingSession,
+    ParkingSlotOccupancy,
+    SessionStatus
+)
+
+
+# First key of the two-key advisory locks held on vehicle numbers ("park")
+VEHICLE_LOCK_NAMESPACE = 0x7061726B
+
+
+async def lock_slot(session: AsyncSession, slot_id: UUID) -> Optional[ParkingSlot]:
+    """
+    Take the slot row lock (SELECT ... FOR UPDATE) until the transaction ends
+    and return the refreshed slot.
+    """
+    return await session.get(
+        ParkingSlot,
+        slot_id,
+        with_for_update=True,
+        populate_existing=True
+    )
+
+
+async def lock_vehicle_numbers(session: AsyncSession, vehicle_numbers: Iterable[str]) -> None:
+    """
+    Take the per-plate advisory locks until the transaction ends.
+    Must run before the check-in reads the plate's open sessions: the
+    next statement's snapshot then includes any check-in committed by the
+    previous lock holder. Plates are locked in sorted order so batches
+    can't deadlock each other.
+    """
+    numbers = sorted(set(vehicle_numbers))
+    if not numbers:
+        return
+
+    plates = (
+        select(func.unnest(array(numbers)).column_valued("vehicle_number"))
+        .order_by("vehicle_number")
+        .subquery()
+    )
+    await session.execute(
+        select(
+            func.pg_advisory_xact_lock(
+                VEHICLE_LOCK_NAMESPACE,
+                func.hashtext(plates.c.vehicle_number)
+            )
+        ).select_from(plates)
+    )
+
+
+async def lock_open_session(session: AsyncSession, session_obj: ParkingSession) -> ParkingSession:
+    """
+    Take the session's plate lock and row lock (SELECT ... FOR UPDATE)
+    until the transaction ends and return the refreshed session, so the
+    caller's status check sees any close committed by a concurrent
+    check-out, escape or batch sync.
+    """
+    await lock_vehicle_numbers(session, [session_obj.vehicle_number])
+    return await session.get(
+        ParkingSession,
+        session_obj.id,
+        with_for_update=True,
+        populate_existing=True
+    )
+
+
+async def adjust_occupancy(
+    session: AsyncSession,
+    slot_id: UUID,
+    vehicle_type: str,
+    delta: int
+) -> None:
+    """Add delta (+1 on check-in, -1 on check-out/escape) to a counter"""
+    vehicle_type = getattr(vehicle_type, "value", vehicle_type)
+
+    stmt = insert(ParkingSlotOccupancy).values(
+        slot_id=slot_id,
+        vehicle_type=vehicle_type,
+        occupied=max(delta, 0)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ParkingSlotOccupancy.slot_id, ParkingSlotOccupancy.vehicle_type],
+        set_={
+            "occupied": func.greatest(ParkingSlotOccupancy.occupied + delta, 0),
+            "updated_at": func.now()
+        }
+    )
+    await session.execute(stmt)
+
+
+async def lock_occupancy(
+    session: AsyncSession,
+    slot_id: UUID,
+    vehicle_types: Iterable[str]
+) -> Dict[str, int]:
+    """
+    Lock a slot's counter rows until the transaction ends, creating missing
+    ones at zero first, and return the current counts by vehicle type.
+    """
+    rows = [
+        {"slot_id": slot_id, "vehicle_type": vehicle_type, "occupied": 0}
+        for vehicle_type in vehicle_types
+    ]
+    if rows:
+        await session.execute(
+            insert(ParkingSlotOccupancy)
+            .values(rows)
+            .on_conflict_do_nothing(
+                index_elements=[ParkingSlotOccupancy.slot_id, ParkingSlotOccupancy.vehicle_type]
+            )
+        )
+
+    result = await session.execute(
+        select(ParkingSlotOccupancy.vehicle_type, ParkingSlotOccupancy.occupied)
+        .where(ParkingSlotOccupancy.slot_id == slot_id)
+        .with_for_update()
+    )
+    return dict(result.all())
+
+
+async def rebuild_occupancy(
+    session: AsyncSession,
+    slot_id: Optional[UUID] = None
+) -> int:
+    """
+    Recompute counters from checked-in sessions, for one slot or all slots.
+    Returns the number of counter rows written. Caller commits.
+    """
+    clear_stmt = delete(ParkingSlotOccupancy)
+    counts_stmt = (
+        select(
+            ParkingSession.slot_id,
+            ParkingSession.vehicle_type,
+            func.count(ParkingSession.id)
+        )
+        .where(ParkingSession.status == SessionStatus.CHECKED_IN)
+        .group_by(ParkingSession.slot_id, ParkingSession.vehicle_type)
+    )
+    if slot_id is not None:
+        clear_stmt = clear_stmt.where(ParkingSlotOccupancy.slot_id == slot_id)
+        counts_stmt = counts_stmt.where(ParkingSession.slot_id == slot_id)
+
+    # Concurrent check-ins/outs wait on their counter upsert until the
+    # rebuild commits, then apply their delta on top of the fresh count
+    await session.execute(
+        text("LOCK TABLE parking_slot_occupancy IN EXCLUSIVE MODE")
+    )
+    await session.execute(clear_stmt)
+    result = await session.execute(
+        insert(ParkingSlotOccupancy).from_select(
+            ["slot_id", "vehicle_type", "occupied"],
+            counts_stmt
+        )
+    )
+    return result.rowcount
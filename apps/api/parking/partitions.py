@@ -0,0 +1,218 @@
+# apps/api/parking/partitions.py
+
+"""
+Monthly partitions of parking_sessions.
+
+parking_sessions is range partitioned on check_in_time, one partition per
+UTC calendar month named parking_sessions_YYYY_MM, plus
+parking_sessions_default for rows outside every monthly range (e.g. an
+offline sync replaying into a month that was archived). Queries that
+filter on check_in_time only touch the matching months, and an old month
+can be detached and archived without rewriting the live ones.
+
+Partitions are created by the parking_sessions_ensure_partitions() SQL
+function (migration f2b6d0c8a417): at application startup, then every
+PARKING_PARTITION_ENSURE_INTERVAL seconds in the background, and by the
+parking_partitions script, which is also what archives old months to
+gzip CSV files. If a month's rows reached the default partition before
+its partition existed, they are moved into the new partition
+(migration 5a8d3c1e6f42).
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import re
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from typing import List, Optional
+
+from sqlalchemy import select, func, exists, and_, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.parking.models import ParkingSession, VehicleDue, SessionStatus, DueStatus
+from apps.settings import settings
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^parking_sessions_(\d{4})_(\d{2})$")
+DEFAULT_PARTITION = "parking_sessions_default"
+
+_maintainer: Optional[asyncio.Task] = None
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before) `month`"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    today = datetime.now(timezone.utc).date()
+    return today.replace(day=1)
+
+
+@dataclass(frozen=True)
+class SessionPartition:
+    """One monthly partition, covering [start, end) of check_in_time"""
+    name: str
+    month: date
+
+    @property
+    def start(self) -> datetime:
+        return datetime.combine(self.month, time.min, tzinfo=timezone.utc)
+
+    @property
+    def end(self) -> datetime:
+        return datetime.combine(add_months(self.month, 1), time.min, tzinfo=timezone.utc)
+
+
+async def ensure_partitions(session: AsyncSession, months_ahead: Optional[int] = None) -> int:
+    """
+    Create the partitions of the current month and the next `months_ahead`
+    months that don't exist yet. Returns how many were created. Caller commits.
+    """
+    if months_ahead is None:
+        months_ahead = settings.PARKING_PARTITION_MONTHS_AHEAD
+    return await session.scalar(
+        select(func.parking_sessions_ensure_partitions(months_ahead))
+    )
+
+
+async def top_up_partitions() -> None:
+    """Top up future partitions; logs failures instead of raising"""
+    try:
+        async with AsyncSessionLocal() as session:
+            created = await ensure_partitions(session)
+            await session.commit()
+    except DBAPIError as e:
+        # e.g. the partitioning migration hasn't run yet
+        logger.warning("Could not ensure parking_sessions partitions: %s", e)
+        return
+
+    if created:
+        logger.info("Created %d parking_sessions partitions", created)
+
+
+async def _run_maintainer() -> None:
+    while True:
+        await asyncio.sleep(settings.PARKING_PARTITION_ENSURE_INTERVAL)
+        try:
+            await top_up_partitions()
+        except Exception:
+            logger.exception("parking_sessions partition maintenance failed")
+
+
+def start_partition_maintainer() -> None:
+    """Application startup hook; PARKING_PARTITION_ENSURE_INTERVAL=0 leaves it to the script"""
+    global _maintainer
+    if settings.PARKING_PARTITION_ENSURE_INTERVAL <= 0:
+        return
+    if _maintainer is None or _maintainer.done():
+        _maintainer = asyncio.create_task(_run_maintainer())
+
+
+async def stop_partition_maintainer() -> None:
+    """Application shutdown hook"""
+    global _maintainer
+    if _maintainer is None:
+        return
+    _maintainer.cancel()
+    with suppress(asyncio.CancelledError):
+        await _maintainer
+    _maintainer = None
+
+
+async def list_partitions(session: AsyncSession) -> List[SessionPartition]:
+    """Monthly partitions currently attached, oldest first"""
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'parking_sessions'::regclass"
+        )
+    )
+
+    partitions = []
+    for (name,) in result.all():
+        match = PARTITION_NAME.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            partitions.append(SessionPartition(name=name, month=date(year, month, 1)))
+    return sorted(partitions, key=lambda partition: partition.month)
+
+
+async def archivable_partitions(
+    session: AsyncSession,
+    retention_months: Optional[int] = None
+) -> List[SessionPartition]:
+    """Partitions whose whole month is older than the retention period"""
+    if retention_months is None:
+        retention_months = settings.PARKING_PARTITION_RETENTION_MONTHS
+    cutoff = add_months(current_month(), -retention_months)
+    return [
+        partition
+        for partition in await list_partitions(session)
+        if partition.month < cutoff
+    ]
+
+
+async def partition_in_use(session: AsyncSession, partition: SessionPartition) -> bool:
+    """
+    True while the month still has a checked-in session or a session with
+    a pending due; those must stay queryable.
+    """
+    in_month = and_(
+        ParkingSession.check_in_time >= partition.start,
+        ParkingSession.check_in_time < partition.end
+    )
+    open_session = exists().where(
+        in_month,
+        ParkingSession.status == SessionStatus.CHECKED_IN
+    )
+    pending_due = exists().where(
+        in_month,
+        VehicleDue.session_id == ParkingSession.id,
+        VehicleDue.status == DueStatus.PENDING
+    )
+    return await session.scalar(select(open_session | pending_due))
+
+
+async def lock_partition(session: AsyncSession, partition: SessionPartition) -> None:
+    """Block writes to the month's rows until the transaction ends"""
+    await session.execute(text(f'LOCK TABLE "{partition.name}" IN SHARE MODE'))
+
+
+async def detach_partition(session: AsyncSession, partition: SessionPartition) -> None:
+    """Detach the month; its rows stay in a standalone table of the same name"""
+    await session.execute(
+        text(f'ALTER TABLE parking_sessions DETACH PARTITION "{partition.name}"')
+    )
+
+
+async def export_table(session: AsyncSession, table_name: str, path: str) -> None:
+    """COPY a table to a gzip compressed CSV file (with header)"""
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wb") as archive:
+        async def write(chunk: bytes):
+            archive.write(chunk)
+
+        await driver_connection.copy_from_table(
+            table_name,
+            output=write,
+            format="csv",
+            header=True
+        )
+
+
+async def drop_table(session: AsyncSession, table_name: str) -> None:
+    await session.execute(text(f'DROP TABLE "{table_name}"'))
@@ -0,0 +1,162 @@
+# apps/api/parking/pricing.py
+
+"""
+Compiled parking tariffs.
+
+A slot's pricing_model/pricing_config JSON is parsed once into an immutable
+SlotTariff and cached by (slot id, updated_at), so editing a slot yields a
+fresh tariff on the next lookup. Fees are computed in integer paise over
+integer microsecond durations and only converted to Decimal at the edge.
+
+Pricing rules (unchanged from the original service code):
+- FREE: always 0
+- FIXED: flat fee per vehicle type
+- HOURLY: base fee covers base_hours (default 1); every started hour
+  after that adds the incremental fee
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Union
+
+from cachetools import LRUCache
+
+from apps.api.parking.models import ParkingSlot, PricingModel
+
+
+PAISE_PER_RUPEE = 100
+MICROSECONDS_PER_HOUR = 3_600_000_000
+
+_tariff_cache: LRUCache = LRUCache(maxsize=4096)
+
+
+def _to_paise(amount) -> int:
+    """Rupee amount from config JSON -> integer paise"""
+    return int(
+        (Decimal(str(amount)) * PAISE_PER_RUPEE).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    )
+
+
+def _hours_to_microseconds(hours) -> int:
+    return int(
+        (Decimal(str(hours)) * MICROSECONDS_PER_HOUR).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    )
+
+
+def _duration_microseconds(duration: timedelta) -> int:
+    return (duration.days * 86_400 + duration.seconds) * 1_000_000 + duration.microseconds
+
+
+def paise_to_decimal(paise: int) -> Decimal:
+    return Decimal(paise).scaleb(-2)
+
+
+@dataclass(frozen=True)
+class FixedRate:
+    """Flat fee regardless of duration"""
+    fee_paise: int
+
+    def fee_for(self, duration_us: int) -> int:
+        return self.fee_paise
+
+
+@dataclass(frozen=True)
+class HourlyRate:
+    """Base fee for the first base_hours, then incremental per started hour"""
+    base_paise: int
+    base_us: int
+    incremental_paise: int
+
+    def fee_for(self, duration_us: int) -> int:
+        if duration_us <= self.base_us:
+            return self.base_paise
+        # Ceiling division: every started hour counts
+        extra_hours = -(-(duration_us - self.base_us) // MICROSECONDS_PER_HOUR)
+        return self.base_paise + extra_hours * self.incremental_paise
+
+
+Rate = Union[FixedRate, HourlyRate]
+
+
+@dataclass(frozen=True)
+class SlotTariff:
+    """Immutable, pre-parsed pricing for one slot"""
+    pricing_model: str
+    rates: Mapping[str, Rate]
+
+    def _rate(self, vehicle_type) -> Optional[Rate]:
+        return self.rates.get(getattr(vehicle_type, "value", vehicle_type))
+
+    def fee_paise(self, vehicle_type, duration: timedelta) -> int:
+        rate = self._rate(vehicle_type)
+        if rate is None:
+            return 0
+        return rate.fee_for(_duration_microseconds(duration))
+
+    def fee(
+        self,
+        vehicle_type,
+        check_in_time: datetime,
+        check_out_time: datetime
+    ) -> Decimal:
+        """Fee in rupees for one stay"""
+        return paise_to_decimal(self.fee_paise(vehicle_type, check_out_time - check_in_time))
+
+    def fees_for(self, vehicle_type, durations: Iterable[timedelta]) -> List[Decimal]:
+        """
+        Fees for many stays of one vehicle type, e.g. projected revenue or
+        batch check-out. The rate is resolved once for the whole list.
+        """
+        rate = self._rate(vehicle_type)
+        if rate is None:
+            return [paise_to_decimal(0) for _ in durations]
+
+        fee_for = rate.fee_for
+        return [
+            paise_to_decimal(fee_for(_duration_microseconds(duration)))
+            for duration in durations
+        ]
+
+
+FREE_TARIFF = SlotTariff(pricing_model=PricingModel.FREE.value, rates=MappingProxyType({}))
+
+
+def compile_tariff(pricing_model: str, pricing_config: Optional[dict]) -> SlotTariff:
+    """Parse a slot's pricing JSON into a SlotTariff"""
+    pricing_model = getattr(pricing_model, "value", pricing_model)
+    config = pricing_config or {}
+    rates = {}
+
+    if pricing_model == PricingModel.FIXED.value:
+        for vehicle_type, fee in config.items():
+            rates[vehicle_type] = FixedRate(fee_paise=_to_paise(fee or 0))
+
+    elif pricing_model == PricingModel.HOURLY.value:
+        for vehicle_type, vehicle_config in config.items():
+            if not isinstance(vehicle_config, dict) or not vehicle_config:
+                continue
+            rates[vehicle_type] = HourlyRate(
+                base_paise=_to_paise(vehicle_config.get("base", 0)),
+                base_us=_hours_to_microseconds(vehicle_config.get("base_hours", 1)),
+                incremental_paise=_to_paise(vehicle_config.get("incremental", 0))
+            )
+
+    else:
+        return FREE_TARIFF
+
+    return SlotTariff(pricing_model=pricing_model, rates=MappingProxyType(rates))
+
+
+def get_tariff(slot: ParkingSlot) -> SlotTariff:
+    """Compiled tariff for a slot, cached until the slot is updated"""
+    if slot.id is None:
+        return compile_tariff(slot.pricing_model, slot.pricing_config)
+
+    key = (slot.id, slot.updated_at)
+    tariff = _tariff_cache.get(key)
+    if tariff is None:
+        tariff = compile_tariff(slot.pricing_model, slot.pricing_config)
+        _tariff_cache[key] = tariff
+    return tariff
@@ -9,13 +9,20 @@ Solves the multi-role problem where a single user can be:
 - Regular user parking their vehicle
 
 This module provides context-aware role management and permission checking.
+
+A user's full slot -> role map is loaded with one query the first time a
+request needs it and every later permission check in that request reads
+from it. With PARKING_ROLE_CACHE_TTL > 0 the maps are also shared across
+requests for that many seconds; staff and slot changes invalidate them via
+invalidate_user_roles() / invalidate_slot_roles().
 """
 
 from typing import Optional, List, Set, Dict
 from uuid import UUID
 from enum import Enum
 from dataclasses import dataclass
-from sqlalchemy import select
+from cachetools import TTLCache
+from sqlalchemy import select, exists
 from sqlalchemy.orm import Session
 
 from apps.api.parking.models import (
@@ -24,10 +31,30 @@ from apps.api.parking.models import (
     StaffRole,
     SlotStatus
 )
+from apps.settings import settings
 from avcfastapi.core.exception.authentication import ForbiddenException
 from avcfastapi.core.exception.request import InvalidRequestException
 
 
+# user_id -> {slot_id: UserSlotRole}, shared across requests (TTL 0 disables)
+_role_cache: TTLCache = TTLCache(
+    maxsize=settings.PARKING_ROLE_CACHE_SIZE,
+    ttl=max(settings.PARKING_ROLE_CACHE_TTL, 0.001)
+)
+
+
+def invalidate_user_roles(user_id: UUID) -> None:
+    """Drop a user's cached role map, e.g. after staff is added or removed"""
+    _role_cache.pop(user_id, None)
+
+
+def invalidate_slot_roles(slot_id: UUID) -> None:
+    """Drop every cached role map that mentions the slot (status/name/deletion)"""
+    for user_id, role_map in list(_role_cache.items()):
+        if slot_id in role_map:
+            _role_cache.pop(user_id, None)
+
+
 class UserRoleContext(str, Enum):
     """Context in which user is operating"""
     OWNER = "owner"          # Acting as slot owner
@@ -112,6 +139,67 @@ class ParkingRoleManager:
     
     def __init__(self, session: Session):
         self.session = session
+        # Request-scoped: one role map per user for the life of this manager
+        self._role_maps: Dict[UUID, Dict[UUID, UserSlotRole]] = {}
+    
+    # ===== Role Map =====
+    
+    async def get_role_map(self, user_id: UUID) -> Dict[UUID, UserSlotRole]:
+        """
+        All slots where the user has a role (slot_id -> UserSlotRole),
+        loaded with a single query per request.
+        """
+        role_map = self._role_maps.get(user_id)
+        if role_map is not None:
+            return role_map
+        
+        use_shared = settings.PARKING_ROLE_CACHE_TTL > 0
+        if use_shared:
+            role_map = _role_cache.get(user_id)
+        
+        if role_map is None:
+            result = await self.session.execute(
+                select(
+                    ParkingSlotStaff.slot_id,
+                    ParkingSlotStaff.role,
+                    ParkingSlot.owner_id,
+                    ParkingSlot.name,
+                    ParkingSlot.status
+                )
+                .join(ParkingSlot, ParkingSlot.id == ParkingSlotStaff.slot_id)
+                .where(
+                    ParkingSlotStaff.user_id == user_id,
+                    ParkingSlot.deleted_at.is_(None)
+                )
+            )
+            role_map = {
+                row.slot_id: UserSlotRole(
+                    slot_id=row.slot_id,
+                    user_id=user_id,
+                    role=row.role,
+                    slot_owner_id=row.owner_id,
+                    slot_name=row.name,
+                    slot_status=row.status
+                )
+                for row in result
+            }
+            if use_shared:
+                _role_cache[user_id] = role_map
+        
+        self._role_maps[user_id] = role_map
+        return role_map
+    
+    def invalidate(self, user_id: UUID) -> None:
+        """Forget a user's roles in this request and in the shared cache"""
+        self._role_maps.pop(user_id, None)
+        invalidate_user_roles(user_id)
+    
+    def invalidate_slot(self, slot_id: UUID) -> None:
+        """Forget every role map that includes the slot"""
+        for user_id, role_map in list(self._role_maps.items()):
+            if slot_id in role_map:
+                del self._role_maps[user_id]
+        invalidate_slot_roles(slot_id)
     
     # ===== Role Discovery =====
     
@@ -124,25 +212,15 @@ class ParkingRoleManager:
         - Which slots they're staff at
         - Their specific role in each slot
         """
-        stmt = (
-            select(ParkingSlotStaff, ParkingSlot)
-            .join(ParkingSlot, ParkingSlot.id == ParkingSlotStaff.slot_id)
-            .where(
-                ParkingSlotStaff.user_id == user_id,
-                ParkingSlot.deleted_at.is_(None)
-            )
-        )
-        
-        result = await self.session.execute(stmt)
-        rows = result.all()
+        role_map = await self.get_role_map(user_id)
         
         owned_slots = []
         staff_slots = {}
         
-        for staff_record, slot in rows:
-            staff_slots[slot.id] = staff_record.role
-            if staff_record.role == StaffRole.OWNER:
-                owned_slots.append(slot.id)
+        for slot_id, slot_role in role_map.items():
+            staff_slots[slot_id] = slot_role.role
+            if slot_role.role == StaffRole.OWNER:
+                owned_slots.append(slot_id)
         
         return UserRolesSummary(
             user_id=user_id,
@@ -160,32 +238,8 @@ class ParkingRoleManager:
         Get user's specific role and permissions for a parking slot.
         Returns None if user has no role in this slot.
         """
-        stmt = (
-            select(ParkingSlotStaff, ParkingSlot)
-            .join(ParkingSlot, ParkingSlot.id == ParkingSlotStaff.slot_id)
-            .where(
-                ParkingSlotStaff.user_id == user_id,
-                ParkingSlotStaff.slot_id == slot_id,
-                ParkingSlot.deleted_at.is_(None)
-            )
-        )
-        
-        result = await self.session.execute(stmt)
-        row = result.first()
-        
-        if not row:
-            return None
-        
-        staff_record, slot = row
-        
-        return UserSlotRole(
-            slot_id=slot.id,
-            user_id=user_id,
-            role=staff_record.role,
-            slot_owner_id=slot.owner_id,
-            slot_name=slot.name,
-            slot_status=slot.status
-        )
+        role_map = await self.get_role_map(user_id)
+        return role_map.get(slot_id)
     
     async def get_all_user_slot_roles(
         self,
@@ -196,33 +250,12 @@ class ParkingRoleManager:
         Get all slots where user has any role, with their specific role in each.
         Useful for displaying "My Workplaces" or "My Slots" views.
         """
-        stmt = (
-            select(ParkingSlotStaff, ParkingSlot)
-            .join(ParkingSlot, ParkingSlot.id == ParkingSlotStaff.slot_id)
-            .where(
-                ParkingSlotStaff.user_id == user_id,
-                ParkingSlot.deleted_at.is_(None)
-            )
-        )
+        role_map = await self.get_role_map(user_id)
         
-        if status_filter:
-            stmt = stmt.where(ParkingSlot.status == status_filter)
-        
-        result = await self.session.execute(stmt)
-        rows = result.all()
-        
-        roles = []
-        for staff_record, slot in rows:
-            roles.append(UserSlotRole(
-                slot_id=slot.id,
-                user_id=user_id,
-                role=staff_record.role,
-                slot_owner_id=slot.owner_id,
-                slot_name=slot.name,
-                slot_status=slot.status
-            ))
-        
-        return roles
+        return [
+            role for role in role_map.values()
+            if not status_filter or role.slot_status == status_filter
+        ]
     
     # ===== Permission Checking =====
     
@@ -372,6 +405,21 @@ class ParkingRoleManager:
         slots = await self.get_slots_where_user_is_owner(user_id)
         return [slot.id for slot in slots]
     
+    @staticmethod
+    def can_collect_due_clause(user_id: UUID, due_owner_id):
+        """
+        EXISTS probe: is the user staff (any role) at a live slot owned by
+        due_owner_id? due_owner_id may be a value or a column such as
+        VehicleDue.slot_owner_id, so the check can ride along with the
+        query that loads the due.
+        """
+        return exists().where(
+            ParkingSlotStaff.user_id == user_id,
+            ParkingSlot.id == ParkingSlotStaff.slot_id,
+            ParkingSlot.owner_id == due_owner_id,
+            ParkingSlot.deleted_at.is_(None)
+        )
+    
     async def can_user_collect_due(
         self,
         user_id: UUID,
@@ -381,18 +429,9 @@ class ParkingRoleManager:
         Check if user can collect a due.
         User can collect if they're staff at any slot owned by due_owner_id.
         """
-        # Get all slots owned by the due owner
-        owner_slots = await self.get_slots_where_user_is_owner(due_owner_id)
-        owner_slot_ids = {slot.id for slot in owner_slots}
-        
-        # Check if user is staff at any of these slots
-        user_roles = await self.get_user_roles_summary(user_id)
-        
-        for slot_id in owner_slot_ids:
-            if user_roles.has_access_to_slot(slot_id):
-                return True
-        
-        return False
+        return bool(await self.session.scalar(
+            select(self.can_collect_due_clause(user_id, due_owner_id))
+        ))
     
     # ===== Context-Aware Messages =====
     
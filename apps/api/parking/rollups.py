@@ -0,0 +1,255 @@
+# apps/api/parking/rollups.py
+
+"""
+Hourly parking rollups (parking_hourly_rollups).
+
+Each row holds, for one slot, vehicle type and UTC hour:
+- checkouts / escapes: sessions closed in that hour
+- revenue: collected_fee of those sessions
+- dues_raised: dues created for those sessions
+- dues_collected: due payments taken in that hour against the slot's sessions
+
+Check-out, escape and due collection add their delta with an upsert in the
+caller's transaction, so the rollup commits or rolls back together with
+the session or due. rebuild_rollups() recomputes a time window from
+parking_sessions/vehicle_dues and is used by the rebuild_parking_rollups
+script. A rebuild attributes a due's whole paid_amount to its last
+payment, so partial payments collected in different hours are folded
+into one.
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, delete, func, literal, literal_column, union_all, text, case
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.parking.models import (
+    ParkingHourlyRollup,
+    ParkingSession,
+    VehicleDue,
+    SessionStatus
+)
+
+
+MEASURES = ("checkouts", "escapes", "revenue", "dues_raised", "dues_collected")
+
+RollupKey = Tuple[UUID, str, datetime]
+
+# Inline constants, so the UNION below resolves column types from the real columns
+ZERO = literal_column("0")
+ONE = literal_column("1")
+
+
+def hour_bucket(at: datetime) -> datetime:
+    """Start of the UTC hour containing `at`"""
+    return at.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def hour_of(column):
+    """SQL counterpart of hour_bucket(), independent of the session time zone"""
+    return func.timezone("UTC", func.date_trunc("hour", func.timezone("UTC", column)))
+
+
+def closed_session_row(
+    parking_session: ParkingSession,
+    due_amount: Optional[Decimal] = None
+) -> dict:
+    """Rollup delta of a session that was just checked out or escaped"""
+    escaped = parking_session.status == SessionStatus.ESCAPED
+    return {
+        "slot_id": parking_session.slot_id,
+        "vehicle_type": getattr(parking_session.vehicle_type, "value", parking_session.vehicle_type),
+        "hour": hour_bucket(parking_session.check_out_time),
+        "checkouts": 0 if escaped else 1,
+        "escapes": 1 if escaped else 0,
+        "revenue": parking_session.collected_fee or Decimal("0.00"),
+        "dues_raised": due_amount or Decimal("0.00"),
+        "dues_collected": Decimal("0.00"),
+    }
+
+
+def _upsert(stmt):
+    return stmt.on_conflict_do_update(
+        index_elements=[
+            ParkingHourlyRollup.slot_id,
+            ParkingHourlyRollup.vehicle_type,
+            ParkingHourlyRollup.hour
+        ],
+        set_={
+            **{
+                measure: getattr(ParkingHourlyRollup, measure) + getattr(stmt.excluded, measure)
+                for measure in MEASURES
+            },
+            "updated_at": func.now()
+        }
+    )
+
+
+async def add_rollups(session: AsyncSession, rows: Iterable[dict]) -> None:
+    """
+    Add rollup deltas in one upsert. Rows for the same slot, vehicle type
+    and hour are summed first (an upsert may touch each row only once).
+    """
+    merged: Dict[RollupKey, dict] = {}
+    for row in rows:
+        key = (row["slot_id"], row["vehicle_type"], row["hour"])
+        if key not in merged:
+            merged[key] = dict(row)
+        else:
+            for measure in MEASURES:
+                merged[key][measure] += row[measure]
+
+    if merged:
+        await session.execute(
+            _upsert(insert(ParkingHourlyRollup).values(list(merged.values())))
+        )
+
+
+async def record_session_closed(
+    session: AsyncSession,
+    parking_session: ParkingSession,
+    due_amount: Optional[Decimal] = None
+) -> None:
+    """Count a check-out or escape (and the due it raised, if any)"""
+    await add_rollups(session, [closed_session_row(parking_session, due_amount)])
+
+
+async def record_due_collected(
+    session: AsyncSession,
+    due: VehicleDue,
+    amount: Decimal,
+    at: Optional[datetime] = None
+) -> None:
+    """
+    Count a due payment against the slot and vehicle type of the due's
+    session, read in the same statement. Nothing is recorded if that
+    session has been archived.
+    """
+    hour = hour_bucket(at or datetime.now(timezone.utc))
+    source = select(
+        ParkingSession.slot_id,
+        ParkingSession.vehicle_type,
+        literal(hour, ParkingHourlyRollup.hour.type),
+        literal(0),
+        literal(0),
+        literal(Decimal("0.00"), ParkingHourlyRollup.revenue.type),
+        literal(Decimal("0.00"), ParkingHourlyRollup.dues_raised.type),
+        literal(amount, ParkingHourlyRollup.dues_collected.type)
+    ).where(ParkingSession.id == due.session_id)
+
+    await session.execute(
+        _upsert(
+            insert(ParkingHourlyRollup).from_select(
+                ["slot_id", "vehicle_type", "hour", *MEASURES],
+                source
+            )
+        )
+    )
+
+
+def _rollup_source(since: Optional[datetime], until: Optional[datetime], slot_id: Optional[UUID]):
+    """Per-event rows (slot, vehicle type, hour, measures...) in the window"""
+    closed_hour = hour_of(ParkingSession.check_out_time)
+    closed = (
+        select(
+            ParkingSession.slot_id,
+            ParkingSession.vehicle_type,
+            closed_hour.label("hour"),
+            case((ParkingSession.status == SessionStatus.CHECKED_OUT, ONE), else_=ZERO).label("checkouts"),
+            case((ParkingSession.status == SessionStatus.ESCAPED, ONE), else_=ZERO).label("escapes"),
+            func.coalesce(ParkingSession.collected_fee, 0).label("revenue"),
+            func.coalesce(VehicleDue.due_amount, 0).label("dues_raised"),
+            ZERO.label("dues_collected")
+        )
+        .select_from(ParkingSession)
+        .outerjoin(VehicleDue, VehicleDue.session_id == ParkingSession.id)
+        .where(
+            ParkingSession.status.in_([SessionStatus.CHECKED_OUT, SessionStatus.ESCAPED]),
+            ParkingSession.check_out_time.isnot(None)
+        )
+    )
+
+    paid_at = func.coalesce(VehicleDue.paid_at, VehicleDue.updated_at)
+    collected = (
+        select(
+            ParkingSession.slot_id,
+            ParkingSession.vehicle_type,
+            hour_of(paid_at).label("hour"),
+            ZERO.label("checkouts"),
+            ZERO.label("escapes"),
+            ZERO.label("revenue"),
+            ZERO.label("dues_raised"),
+            VehicleDue.paid_amount.label("dues_collected")
+        )
+        .select_from(VehicleDue)
+        .join(ParkingSession, ParkingSession.id == VehicleDue.session_id)
+        .where(VehicleDue.paid_amount > 0)
+    )
+
+    if since is not None:
+        closed = closed.where(ParkingSession.check_out_time >= since)
+        collected = collected.where(paid_at >= since)
+    if until is not None:
+        # check_in_time bound lets Postgres skip later partitions
+        closed = closed.where(
+            ParkingSession.check_out_time < until,
+            ParkingSession.check_in_time < until
+        )
+        collected = collected.where(paid_at < until)
+    if slot_id is not None:
+        closed = closed.where(ParkingSession.slot_id == slot_id)
+        collected = collected.where(ParkingSession.slot_id == slot_id)
+
+    return union_all(closed, collected).subquery("events")
+
+
+async def rebuild_rollups(
+    session: AsyncSession,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    slot_id: Optional[UUID] = None
+) -> int:
+    """
+    Recompute rollups for whole hours in [since, until) (default: all
+    time), for one slot or all slots. Returns the number of rollup rows
+    written. Caller commits.
+    """
+    since = hour_bucket(since) if since else None
+    until = hour_bucket(until) if until else None
+
+    clear_stmt = delete(ParkingHourlyRollup)
+    if since is not None:
+        clear_stmt = clear_stmt.where(ParkingHourlyRollup.hour >= since)
+    if until is not None:
+        clear_stmt = clear_stmt.where(ParkingHourlyRollup.hour < until)
+    if slot_id is not None:
+        clear_stmt = clear_stmt.where(ParkingHourlyRollup.slot_id == slot_id)
+
+    events = _rollup_source(since, until, slot_id)
+    totals = (
+        select(
+            events.c.slot_id,
+            events.c.vehicle_type,
+            events.c.hour,
+            *[func.sum(events.c[measure]) for measure in MEASURES]
+        )
+        .group_by(events.c.slot_id, events.c.vehicle_type, events.c.hour)
+    )
+
+    # Concurrent check-outs wait on their rollup upsert until the rebuild
+    # commits, then add their delta on top of the recomputed rows
+    await session.execute(
+        text("LOCK TABLE parking_hourly_rollups IN EXCLUSIVE MODE")
+    )
+    await session.execute(clear_stmt)
+    result = await session.execute(
+        insert(ParkingHourlyRollup).from_select(
+            ["slot_id", "vehicle_type", "hour", *MEASURES],
+            totals
+        )
+    )
+    return result.rowcount
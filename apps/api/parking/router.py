@@ -3,7 +3,7 @@
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Query, Request
+from fastapi import APIRouter, Query, Request, Response
 from apps.api.parking.service_enhanced import EnhancedParkingServiceDependency
 
 from apps.api.auth.dependency import UserDependency, AdminUserDependency
@@ -27,14 +27,20 @@ from apps.api.parking.schema import (
     AdminAnalytics,
     NearbySlotResponse,
     VehicleTransactionHistory,  # NEW
+    SessionBatchRequest,
+    SessionBatchResponse,
+    ProjectedRevenue,
+    OwnerDashboard,
 )
 from apps.api.parking.models import SlotStatus, SessionStatus, DueStatus
+from apps.api.parking.cache import availability_cache
 from avcfastapi.core.fastapi.response.models import MessageResponse
 from avcfastapi.core.fastapi.response.pagination import (
     PaginatedResponse,
     PaginationParams,
     paginated_response,
 )
+from apps.pagination import CursorParams, CountParam, CountStrategy, set_total_header
 
 router = APIRouter(
     prefix="/parking",
@@ -106,7 +112,10 @@ async def list_my_slots(
     user: UserDependency,
     parking_service: ParkingServiceDependency,
     pagination: PaginationParams,
+    cursor: CursorParams,
+    response: Response,
     status: Optional[SlotStatus] = Query(None, description="Filter by status"),
+    count: CountParam = CountStrategy.EXACT,
 ) -> PaginatedResponse[ParkingSlotResponse]:
     """
     List all parking slots owned by the current user.
@@ -115,8 +124,12 @@ async def list_my_slots(
         user.id,
         status=status,
         limit=pagination.limit,
-        offset=pagination.offset
+        offset=pagination.offset,
+        cursor=cursor,
+        count_strategy=count
     )
+    cursor.set_header(response)
+    set_total_header(response, total)
     return paginated_response(
         result=[ParkingSlotResponse.model_validate(s) for s in slots],
         request=request,
@@ -210,6 +223,8 @@ async def list_pending_slots(
     admin: AdminUserDependency,
     parking_service: ParkingServiceDependency,
     pagination: PaginationParams,
+    response: Response,
+    count: CountParam = CountStrategy.EXACT,
 ) -> PaginatedResponse[ParkingSlotResponse]:
     """
     List all parking slots pending admin verification.
@@ -217,8 +232,10 @@ async def list_pending_slots(
     """
     slots, total = await parking_service.list_pending_slots(
         limit=pagination.limit,
-        offset=pagination.offset
+        offset=pagination.offset,
+        count_strategy=count
     )
+    set_total_header(response, total)
     return paginated_response(
         result=[ParkingSlotResponse.model_validate(s) for s in slots],
         request=request,
@@ -443,6 +460,49 @@ async def check_out_vehicle(
     return SessionResponse.model_validate(session)
 
 
+@router.post("/session/batch", description="Apply a batch of offline gate operations")
+async def apply_session_batch(
+    user: UserDependency,
+    parking_service: ParkingServiceDependency,
+    batch: SessionBatchRequest,
+) -> SessionBatchResponse:
+    """
+    Sync check-ins and check-outs recorded offline at a gate.
+    
+    Operations are applied in the given order in a single transaction,
+    using each operation's client_timestamp as the check-in/check-out time.
+    Fees are calculated exactly as for a normal check-out.
+    
+    Staff only.
+    
+    **Idempotency:** every operation carries an idempotency_key. Keys that
+    were already applied are reported as `duplicate` and not applied again,
+    so a batch can be safely re-sent after a network failure.
+    
+    **Returns:** one result per operation, in request order, with status
+    `applied`, `duplicate` or `failed` (with error_code: ALREADY_CHECKED_IN,
+    CAPACITY_FULL, OUTSTANDING_DUES_BLOCK, SESSION_NOT_FOUND,
+    INVALID_TIMESTAMP, INVALID_PARAMS).
+    
+    **Example:**
+    ```json
+    POST /api/parking/session/batch
+    {
+      "slot_id": "{uuid}",
+      "operations": [
+        {"idempotency_key": "gate1-0001", "operation": "check_in",
+         "vehicle_number": "KL01AB1234", "vehicle_type": "car",
+         "client_timestamp": "2024-11-12T09:15:00+05:30"},
+        {"idempotency_key": "gate1-0002", "operation": "check_out",
+         "vehicle_number": "KL01AB1234", "collected_fee": 30,
+         "payment_mode": "cash", "client_timestamp": "2024-11-12T11:40:00+05:30"}
+      ]
+    }
+    ```
+    """
+    return await parking_service.apply_session_batch(user.id, batch)
+
+
 @router.post("/session/escape", description="Mark vehicle as escaped")
 async def mark_vehicle_escaped(
     user: UserDependency,
@@ -480,8 +540,11 @@ async def list_parking_sessions(
     user: UserDependency,
     parking_service: ParkingServiceDependency,
     pagination: PaginationParams,
+    cursor: CursorParams,
+    response: Response,
     slot_id: UUID = Query(..., description="Parking slot ID"),
     status: Optional[SessionStatus] = Query(None, description="Filter by status"),
+    count: CountParam = CountStrategy.EXACT,
 ) -> PaginatedResponse[SessionResponse]:
     """
     List parking sessions for a specific slot.
@@ -492,8 +555,12 @@ async def list_parking_sessions(
         user.id,
         status=status,
         limit=pagination.limit,
-        offset=pagination.offset
+        offset=pagination.offset,
+        cursor=cursor,
+        count_strategy=count
     )
+    cursor.set_header(response)
+    set_total_header(response, total)
     return paginated_response(
         result=[SessionResponse.model_validate(s) for s in sessions],
         request=request,
@@ -698,7 +765,10 @@ async def list_vehicle_dues(
     user: UserDependency,
     parking_service: ParkingServiceDependency,
     pagination: PaginationParams,
+    cursor: CursorParams,
+    response: Response,
     status: Optional[DueStatus] = Query(None, description="Filter by status"),
+    count: CountParam = CountStrategy.EXACT,
 ) -> PaginatedResponse[DueResponse]:
     """
     List all vehicle dues for parking slots owned by current user.
@@ -708,8 +778,12 @@ async def list_vehicle_dues(
         user.id,
         status=status,
         limit=pagination.limit,
-        offset=pagination.offset
+        offset=pagination.offset,
+        cursor=cursor,
+        count_strategy=count
     )
+    cursor.set_header(response)
+    set_total_header(response, total)
     return paginated_response(
         result=[DueResponse.model_validate(d) for d in dues],
         request=request,
@@ -731,22 +805,30 @@ async def get_analytics_dashboard(
         None,
         description="End date (defaults to now)"
     ),
-) -> dict:
+    slot_id: Optional[UUID] = Query(None, description="Limit to one slot (defaults to all my slots)"),
+) -> OwnerDashboard:
     """
     Get analytics dashboard for slot owner.
-    Shows revenue, sessions, and dues breakdown.
+    Shows revenue, sessions, escapes and dues per slot and vehicle type,
+    plus a daily series, read from hourly rollups.
     Owner only.
+    """
+    return await parking_service.get_owner_dashboard(user.id, start_date, end_date, slot_id)
+
+
+@router.get("/analytics/projected-revenue", description="Projected revenue of parked vehicles")
+async def get_projected_revenue(
+    user: UserDependency,
+    parking_service: ParkingServiceDependency,
+    slot_id: Optional[UUID] = Query(None, description="Limit to one slot (defaults to all my slots)"),
+) -> ProjectedRevenue:
+    """
+    What every currently checked-in vehicle would pay if it checked out now,
+    using each slot's pricing.
     
-    **Not yet implemented** — returns 501.
+    Owner only. Returns totals plus a per-slot, per-vehicle-type breakdown.
     """
-    from fastapi.responses import JSONResponse
-    return JSONResponse(
-        status_code=501,
-        content={
-            "detail": "Analytics dashboard not yet implemented",
-            "error_code": "NOT_IMPLEMENTED"
-        }
-    )
+    return await parking_service.get_projected_revenue(user.id, slot_id)
 
 
 @router.get("/my-workplaces")
@@ -848,4 +930,16 @@ async def get_admin_analytics(
     Admin only.
     """
     analytics = await parking_service.get_admin_analytics(start_date, end_date)
-    return analytics
\ No newline at end of file
+    return analytics
+
+
+@router.get("/admin/cache/availability", description="Availability cache metrics")
+async def get_availability_cache_stats(
+    admin: AdminUserDependency,
+) -> dict:
+    """
+    Hit/miss/invalidation counters of this worker's slot availability cache.
+    Use the hit ratio to tune APP_PARKING_AVAILABILITY_CACHE_TTL.
+    Admin only.
+    """
+    return await availability_cache.get_stats()
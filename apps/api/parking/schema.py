@@ -14,8 +14,11 @@ from apps.api.parking.models import (
     StaffRole,
     SessionStatus,
     PaymentStatus,
-    DueStatus
+    DueStatus,
+    SyncOperationType,
+    SyncItemStatus
 )
+from apps.api.vehicle.plate import normalize_plate
 from avcfastapi.core.fastapi.response.models import CustomBaseModel
 
 
@@ -224,8 +227,7 @@ class SessionCheckIn(CustomBaseModel):
     @field_validator('vehicle_number')
     def normalize_vehicle_number(cls, v):
         """Normalize vehicle number (remove special chars, uppercase)"""
-        import re
-        return re.sub(r"[^a-zA-Z0-9]", "", v).upper()
+        return normalize_plate(v)
 
 
 class SessionCalculateFee(CustomBaseModel):
@@ -299,6 +301,67 @@ class SessionWithDueAlert(SessionResponse):
     due_id: Optional[UUID] = Field(None, description="Due record ID")
 
 
+# ===== Batch Sync Schemas =====
+
+class SessionBatchOperation(CustomBaseModel):
+    """One check-in or check-out recorded offline at the gate"""
+    idempotency_key: str = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Client generated unique key; retries with the same key are not re-applied"
+    )
+    operation: SyncOperationType = Field(..., description="check_in or check_out")
+    vehicle_number: str = Field(..., min_length=3, max_length=20)
+    vehicle_type: Optional[ParkingVehicleType] = Field(None, description="Required for check_in")
+    client_timestamp: datetime = Field(..., description="When the operation happened at the gate")
+    collected_fee: Optional[Decimal] = Field(None, ge=0, description="check_out only")
+    payment_mode: Optional[str] = Field(None, description="check_out only: cash, upi, card, other")
+    notes: Optional[str] = Field(None, max_length=500)
+
+    @field_validator('vehicle_number')
+    def normalize_vehicle_number(cls, v):
+        """Normalize vehicle number (remove special chars, uppercase)"""
+        return normalize_plate(v)
+
+    @field_validator('payment_mode')
+    def validate_payment_mode(cls, v):
+        """Validate payment mode"""
+        if v is None:
+            return v
+        from apps.api.parking.models import PaymentMode
+        valid_modes = {mode.value for mode in PaymentMode}
+        if v.lower() not in valid_modes:
+            raise ValueError(f"Invalid payment mode. Must be one of: {valid_modes}")
+        return v.lower()
+
+
+class SessionBatchRequest(CustomBaseModel):
+    """Ordered operations to apply for one slot"""
+    slot_id: UUID
+    operations: List[SessionBatchOperation] = Field(..., min_length=1, max_length=500)
+
+
+class SessionBatchItemResult(CustomBaseModel):
+    """Outcome of one batch operation, in request order"""
+    idempotency_key: str
+    operation: SyncOperationType
+    vehicle_number: str
+    status: SyncItemStatus
+    session_id: Optional[UUID] = None
+    calculated_fee: Optional[Decimal] = None
+    error_code: Optional[str] = None
+    message: Optional[str] = None
+
+
+class SessionBatchResponse(CustomBaseModel):
+    """Per-item results of a batch sync"""
+    results: List[SessionBatchItemResult]
+    applied: int
+    duplicates: int
+    failed: int
+
+
 # ===== NEW: Vehicle Transaction History Schemas =====
 
 class SlotBasicInfo(CustomBaseModel):
@@ -430,6 +493,57 @@ class AdminAnalytics(CustomBaseModel):
     revenue_by_slot: list[Dict]
 
 
+class DashboardTotals(CustomBaseModel):
+    """Rolled-up activity over the dashboard's date range"""
+    sessions: int = Field(..., description="Sessions closed (checked out or escaped)")
+    checkouts: int
+    escapes: int
+    revenue: Decimal = Field(..., description="Fees collected at check-out")
+    dues_raised: Decimal
+    dues_collected: Decimal
+
+
+class DashboardSlot(CustomBaseModel):
+    """One slot's share of the dashboard"""
+    slot_id: UUID
+    slot_name: str
+    totals: DashboardTotals
+    by_vehicle_type: Dict[str, DashboardTotals]
+
+
+class DashboardDay(CustomBaseModel):
+    """One UTC day of the dashboard's time series"""
+    day: datetime
+    totals: DashboardTotals
+
+
+class OwnerDashboard(CustomBaseModel):
+    """Owner analytics dashboard, read from hourly rollups"""
+    date_range: Dict[str, datetime]
+    totals: DashboardTotals
+    active_sessions: int
+    outstanding_dues: Decimal
+    slots: list[DashboardSlot]
+    daily: list[DashboardDay]
+
+
+class SlotProjectedRevenue(CustomBaseModel):
+    """Projected revenue of one slot's currently parked vehicles"""
+    slot_id: UUID
+    slot_name: str
+    open_sessions: int
+    projected_revenue: Decimal
+    by_vehicle_type: Dict[str, Decimal]
+
+
+class ProjectedRevenue(CustomBaseModel):
+    """What currently parked vehicles would pay if they left now"""
+    as_of: datetime
+    open_sessions: int
+    projected_revenue: Decimal
+    slots: list[SlotProjectedRevenue]
+
+
 # ===== Admin Verification Schemas =====
 
 class SlotVerification(CustomBaseModel):
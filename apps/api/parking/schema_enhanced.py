@@ -25,6 +25,7 @@ from apps.api.parking.models import (
     PaymentStatus,
     DueStatus
 )
+from apps.api.vehicle.plate import normalize_plate
 from avcfastapi.core.fastapi.response.models import CustomBaseModel
 
 
@@ -249,8 +250,7 @@ class SessionCheckIn(CustomBaseModel):
     @field_validator('vehicle_number')
     def normalize_vehicle_number(cls, v):
         """Normalize vehicle number (remove special chars, uppercase)"""
-        import re
-        return re.sub(r"[^a-zA-Z0-9]", "", v).upper()
+        return normalize_plate(v)
 
 
 class SessionCheckOut(CustomBaseModel):
@@ -1,12 +1,11 @@
 from sqlalchemy import select, func, and_, or_
 import sqlalchemy as sa
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from typing import Annotated, Optional, List, Dict, Tuple
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
-import math
-import re
 
 from apps.api.parking.models import (
     ParkingSlot,
@@ -19,7 +18,12 @@ from apps.api.parking.models import (
     StaffRole,
     SessionStatus,
     PaymentStatus,
-    DueStatus
+    DueStatus,
+    ParkingSyncOperation,
+    ParkingSlotOccupancy,
+    ParkingHourlyRollup,
+    SyncOperationType,
+    SyncItemStatus
 )
 from apps.api.parking.schema import (
     ParkingSlotCreate,
@@ -34,12 +38,50 @@ from apps.api.parking.schema import (
     TransactionHistoryItem,
     VehicleTransactionHistory,
     SlotBasicInfo,
+    SessionBatchOperation,
+    SessionBatchRequest,
+    SessionBatchItemResult,
+    SessionBatchResponse,
+    SlotProjectedRevenue,
+    ProjectedRevenue,
+    DashboardTotals,
+    DashboardSlot,
+    DashboardDay,
+    OwnerDashboard,
 )
+from apps.api.vehicle.models import Vehicle
+from apps.api.vehicle.owners import get_plate_owners
+from apps.api.vehicle.plate import normalize_plate
 from avcfastapi.core.database.sqlalchamey.core import SessionDep
 from avcfastapi.core.exception.authentication import ForbiddenException
 from avcfastapi.core.exception.request import InvalidRequestException
 from avcfastapi.core.fastapi.dependency.service_dependency import AbstractService
-from apps.api.parking.role_manager import ParkingRoleManager
+from apps.api.parking.role_manager import ParkingRoleManager, UserSlotRole
+from apps.api.parking.geo import nearby_slots_query
+from apps.api.parking.occupancy import (
+    adjust_occupancy,
+    lock_occupancy,
+    lock_open_session,
+    lock_vehicle_numbers
+)
+from apps.api.parking.checkin import load_check_in_context, insert_session_stmt
+from apps.api.parking.rollups import (
+    MEASURES,
+    add_rollups,
+    closed_session_row,
+    hour_bucket,
+    record_session_closed,
+    record_due_collected
+)
+from apps.api.parking.pricing import get_tariff
+from apps.api.parking.cache import availability_cache
+from apps.api.parking.availability import (
+    fetch_live_occupancy,
+    build_slot_availability,
+    get_bulk_availability
+)
+from apps.pagination import CursorPagination, CountStrategy, count_rows
+from apps.statistics import combine_ctes, gather_statistics, cached_statistics
 
 
 class ParkingService(AbstractService):
@@ -63,24 +105,18 @@ class ParkingService(AbstractService):
         
         return slot
 
-    async def _verify_slot_staff(self, slot_id: UUID, user_id: UUID) -> Tuple[ParkingSlot, ParkingSlotStaff]:
+    async def _verify_slot_staff(self, slot_id: UUID, user_id: UUID) -> Tuple[ParkingSlot, UserSlotRole]:
         """Verify user is staff of the slot (including owner)"""
+        # Reads the request's cached role map, no per-call staff query
+        role = await self.role_manager.get_user_role_for_slot(user_id, slot_id)
         slot = await self.session.get(ParkingSlot, slot_id)
         if not slot or slot.deleted_at is not None:
             raise InvalidRequestException("Parking slot not found", error_code="SLOT_NOT_FOUND")
         
-        # Check if user is staff
-        staff_record = await self.session.scalar(
-            select(ParkingSlotStaff).where(
-                ParkingSlotStaff.slot_id == slot_id,
-                ParkingSlotStaff.user_id == user_id
-            )
-        )
-        
-        if not staff_record:
+        if not role:
             raise ForbiddenException("You are not authorized to manage this parking slot")
         
-        return slot, staff_record
+        return slot, role
 
     def _calculate_parking_fee(
         self,
@@ -89,45 +125,11 @@ class ParkingService(AbstractService):
         check_in_time: datetime,
         check_out_time: datetime
     ) -> Decimal:
-        """Calculate parking fee based on slot's pricing model"""
-        
-        if slot.pricing_model == PricingModel.FREE:
-            return Decimal("0.00")
-        
-        # Handle both string and enum types
-        vehicle_type_str = vehicle_type.value if isinstance(vehicle_type, ParkingVehicleType) else vehicle_type
-        config = slot.pricing_config or {}
-        
-        if slot.pricing_model == PricingModel.FIXED:
-            # Fixed fee per vehicle type
-            fee = config.get(vehicle_type_str, 0)
-            return Decimal(str(fee))
-        
-        if slot.pricing_model == PricingModel.HOURLY:
-            # Hourly rate: base + incremental
-            vehicle_config = config.get(vehicle_type_str, {})
-            if not vehicle_config:
-                return Decimal("0.00")
-            
-            base_fee = Decimal(str(vehicle_config.get('base', 0)))
-            base_hours = Decimal(str(vehicle_config.get('base_hours', 1)))
-            incremental_fee = Decimal(str(vehicle_config.get('incremental', 0)))
-            
-            # Calculate duration in hours
-            duration = check_out_time - check_in_time
-            hours = Decimal(str(duration.total_seconds() / 3600))
-            
-            if hours <= base_hours:
-                return base_fee
-            
-            # Additional hours (ceiling)
-            additional_hours = hours - base_hours
-            additional_hours_rounded = Decimal(str(math.ceil(float(additional_hours))))
-            
-            total_fee = base_fee + (additional_hours_rounded * incremental_fee)
-            return total_fee.quantize(Decimal("0.01"))
-        
-        return Decimal("0.00")
+        """
+        Calculate parking fee based on slot's pricing model.
+        Uses the slot's compiled tariff (see parking/pricing.py).
+        """
+        return get_tariff(slot).fee(vehicle_type, check_in_time, check_out_time)
 
     async def _check_vehicle_dues(
         self,
@@ -146,23 +148,8 @@ class ParkingService(AbstractService):
 
     async def _get_live_occupancy(self, slot_id: UUID) -> Dict[str, int]:
         """Calculate current occupancy by vehicle type"""
-        result = await self.session.execute(
-            select(
-                ParkingSession.vehicle_type,
-                func.count(ParkingSession.id)
-            )
-            .where(
-                ParkingSession.slot_id == slot_id,
-                ParkingSession.status == SessionStatus.CHECKED_IN
-            )
-            .group_by(ParkingSession.vehicle_type)
-        )
-        
-        occupancy = {}
-        for vehicle_type, count in result:
-            occupancy[vehicle_type] = count
-        
-        return occupancy
+        occupancy = await fetch_live_occupancy(self.session, [slot_id])
+        return occupancy[slot_id]
 
     # ===== NEW: User Management Helper =====
     
@@ -177,20 +164,12 @@ class ParkingService(AbstractService):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
     
-    async def _get_vehicle_owner_id(self, vehicle_number: str) -> Optional[UUID]:
-        """Get vehicle owner ID from vehicles table if registered"""
-        try:
-            from apps.api.vehicle.models import Vehicle
-            
-            stmt = select(Vehicle.user_id).where(
-                Vehicle.vehicle_number == vehicle_number,
-                Vehicle.deleted_at.is_(None)
-            )
-            result = await self.session.execute(stmt)
-            return result.scalar_one_or_none()
-        except ImportError:
-            # Vehicle module not installed/available
-            return None
+    async def _get_vehicle_owner_ids(self, vehicle_numbers: List[str]) -> Dict[str, UUID]:
+        """Map registered (normalized) vehicle numbers to their owner IDs"""
+        if not vehicle_numbers:
+            return {}
+        owners = await get_plate_owners(self.session, vehicle_numbers)
+        return {plate: owner.user_id for plate, owner in owners.items()}
 
     # ===== Parking Slot Management =====
 
@@ -277,6 +256,7 @@ class ParkingService(AbstractService):
         self.session.add(owner_staff)
         
         await self.session.commit()
+        self.role_manager.invalidate(user_id)
         await self.session.refresh(slot)
         
         return slot
@@ -293,8 +273,10 @@ class ParkingService(AbstractService):
         user_id: UUID,
         status: Optional[SlotStatus] = None,
         limit: int = 100,
-        offset: int = 0
-    ) -> Tuple[List[ParkingSlot], int]:
+        offset: int = 0,
+        cursor: Optional[CursorPagination] = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT
+    ) -> Tuple[List[ParkingSlot], Optional[int]]:
         """List parking slots owned by user"""
         query = select(ParkingSlot).where(
             ParkingSlot.owner_id == user_id,
@@ -304,11 +286,12 @@ class ParkingService(AbstractService):
         if status:
             query = query.where(ParkingSlot.status == status)
         
-        # Get total count
-        count_result = await self.session.execute(
-            select(func.count()).select_from(query.subquery())
-        )
-        total = count_result.scalar_one()
+        if cursor is not None and cursor.enabled:
+            query = cursor.apply(query, ParkingSlot.created_at, ParkingSlot.id, limit)
+            result = await self.session.execute(query)
+            return cursor.page(result.scalars().all()), None
+        
+        total = await count_rows(self.session, query, count_strategy)
         
         # Get paginated results
         query = query.offset(offset).limit(limit).order_by(ParkingSlot.created_at.desc())
@@ -375,6 +358,8 @@ class ParkingService(AbstractService):
             setattr(slot, field, value)
         
         await self.session.commit()
+        await availability_cache.invalidate(slot_id)
+        self.role_manager.invalidate_slot(slot_id)
         await self.session.refresh(slot)
         
         return slot
@@ -401,37 +386,33 @@ class ParkingService(AbstractService):
         
         slot.soft_delete()
         await self.session.commit()
+        await availability_cache.invalidate(slot_id)
+        self.role_manager.invalidate_slot(slot_id)
         
         return True
 
-    async def get_slot_availability(self, slot_id: UUID) -> SlotAvailability:
-        """Get real-time availability for a parking slot"""
-        slot = await self.get_slot(slot_id)
-        
-        # Get current occupancy
-        occupied = await self._get_live_occupancy(slot_id)
-        
-        # Calculate available
-        capacity = slot.capacity or {}
-        available = {}
-        total_capacity = 0
-        total_occupied = 0
-        
-        for vehicle_type, max_count in capacity.items():
-            current = occupied.get(vehicle_type, 0)
-            available[vehicle_type] = max_count - current
-            total_capacity += max_count
-            total_occupied += current
+    async def get_slot_availability(
+        self,
+        slot_id: UUID,
+        use_cache: bool = True
+    ) -> SlotAvailability:
+        """
+        Get real-time availability for a parking slot.
+        Served from the availability cache unless use_cache is False
+        (capacity checks must always read the live counters).
+        """
+        async def load() -> SlotAvailability:
+            slot = await self.get_slot(slot_id)
+            
+            # Get current occupancy
+            occupied = await self._get_live_occupancy(slot_id)
+            
+            return build_slot_availability(slot, occupied)
         
-        occupancy_pct = (total_occupied / total_capacity * 100) if total_capacity > 0 else 0
+        if not use_cache:
+            return await load()
         
-        return SlotAvailability(
-            slot_id=slot.id,
-            capacity=capacity,
-            occupied=occupied,
-            available=available,
-            occupancy_percentage=round(occupancy_pct, 2)
-        )
+        return await availability_cache.get_or_load(slot_id, load)
 
     # ===== Staff Management =====
 
@@ -477,6 +458,7 @@ class ParkingService(AbstractService):
         
         self.session.add(staff)
         await self.session.commit()
+        self.role_manager.invalidate(staff_data.user_id)
         await self.session.refresh(staff)
         
         return staff
@@ -539,6 +521,7 @@ class ParkingService(AbstractService):
         
         self.session.add(staff)
         await self.session.commit()
+        self.role_manager.invalidate(user.id)
         await self.session.refresh(staff)
         
         return staff
@@ -568,6 +551,7 @@ class ParkingService(AbstractService):
         
         await self.session.delete(staff)
         await self.session.commit()
+        self.role_manager.invalidate(staff_user_id)
         
         return True
 
@@ -618,79 +602,91 @@ class ParkingService(AbstractService):
     ) -> Tuple[ParkingSession, Optional[VehicleDue]]:
         """
         ENHANCED: Check in a vehicle with automatic owner linking and due blocking.
+        
+        Takes the plate's advisory lock, then runs two statements (see
+        parking/checkin.py): one that reads the slot, staff role, open
+        session, occupancy, dues and vehicle owner, and one that bumps
+        occupancy (only while below capacity) and inserts the session.
         """
-        slot, staff_record = await self._verify_slot_staff(slot_id, staff_id)
+        # Normalize vehicle number for consistent lookups
+        normalized_vehicle_number = normalize_plate(check_in_data.vehicle_number)
+        vehicle_type_str = check_in_data.vehicle_type.value
+        
+        # Serializes check-ins of this plate, so the context read below sees
+        # a session opened for it by a concurrent request
+        await lock_vehicle_numbers(self.session, [normalized_vehicle_number])
+        
+        context = await load_check_in_context(
+            self.session,
+            slot_id,
+            staff_id,
+            normalized_vehicle_number,
+            vehicle_type_str
+        )
+        
+        if context is None:
+            raise InvalidRequestException("Parking slot not found", error_code="SLOT_NOT_FOUND")
+        
+        if context.staff_role is None:
+            raise ForbiddenException("You are not authorized to manage this parking slot")
+        
+        slot = context.slot
         
         # Verify slot is active
         if slot.status != SlotStatus.ACTIVE:
             raise InvalidRequestException("Parking slot is not active", error_code="SLOT_NOT_ACTIVE")
         
-        # Normalize vehicle number for consistent lookups
-        normalized_vehicle_number = re.sub(r"[^a-zA-Z0-9]", "", check_in_data.vehicle_number).upper()
-        
         # Check if vehicle is already checked in anywhere
-        existing_checkin = await self.session.execute(
-            select(ParkingSession)
-            .where(
-                ParkingSession.vehicle_number == normalized_vehicle_number,
-                ParkingSession.status == SessionStatus.CHECKED_IN
-            )
-        )
-        existing_session = existing_checkin.scalar_one_or_none()
-        
-        if existing_session:
-            existing_slot = await self.session.get(ParkingSlot, existing_session.slot_id)
+        if context.existing_slot_name is not None:
             raise InvalidRequestException(
-                f"Vehicle {check_in_data.vehicle_number} is already checked in at {existing_slot.name}. "
+                f"Vehicle {check_in_data.vehicle_number} is already checked in at {context.existing_slot_name}. "
                 f"Please check out from there first or mark as escaped.",
                 error_code="ALREADY_CHECKED_IN"
             )
         
         # Check capacity
-        availability = await self.get_slot_availability(slot_id)
-        vehicle_type_str = check_in_data.vehicle_type.value
+        capacity = (slot.capacity or {}).get(vehicle_type_str, 0)
         
-        if availability.available.get(vehicle_type_str, 0) <= 0:
+        if capacity - context.occupied <= 0:
             raise InvalidRequestException(
                 f"No capacity available for {vehicle_type_str}",
                 error_code="CAPACITY_FULL"
             )
         
         # Block checkin if outstanding dues exist with same owner
-        outstanding_due = await self._check_vehicle_dues(
-            normalized_vehicle_number,
-            slot.owner_id
-        )
-        
-        if outstanding_due:
+        if context.due_id is not None:
             # Block the checkin - vehicle must pay dues first
             raise InvalidRequestException(
                 f"Vehicle {check_in_data.vehicle_number} has outstanding dues of "
-                f"₹{outstanding_due.due_amount - outstanding_due.paid_amount:.2f}. "
-                f"Please pay the dues before checking in. Due ID: {outstanding_due.id}",
+                f"₹{context.due_outstanding:.2f}. "
+                f"Please pay the dues before checking in. Due ID: {context.due_id}",
                 error_code="OUTSTANDING_DUES_BLOCK"
             )
         
-        # Get vehicle owner ID if registered
-        vehicle_owner_id = await self._get_vehicle_owner_id(normalized_vehicle_number)
-        
-        # Create session with normalized vehicle number
-        session = ParkingSession(
-            slot_id=slot_id,
-            vehicle_number=normalized_vehicle_number,
-            vehicle_type=check_in_data.vehicle_type.value,
-            vehicle_owner_id=vehicle_owner_id,
-            checked_in_by=staff_id,
-            check_in_time=datetime.now(timezone.utc),
-            status=SessionStatus.CHECKED_IN,
-            payment_status=PaymentStatus.PENDING,
-            calculated_fee=Decimal("0.00"),
-            notes=check_in_data.notes
+        # Create session (linked to the vehicle owner if registered)
+        # and count it in the slot's occupancy
+        session = await self.session.scalar(
+            insert_session_stmt(
+                slot_id=slot_id,
+                staff_id=staff_id,
+                vehicle_number=normalized_vehicle_number,
+                vehicle_type=vehicle_type_str,
+                capacity=capacity,
+                vehicle_owner_id=context.vehicle_owner_id,
+                notes=check_in_data.notes
+            )
         )
-        
-        self.session.add(session)
+        if session is None:
+            # Filled up by a concurrent check-in since the context was read
+            await self.session.rollback()
+            raise InvalidRequestException(
+                f"No capacity available for {vehicle_type_str}",
+                error_code="CAPACITY_FULL"
+            )
+        # Keep the RETURNING-loaded row usable after commit without a refresh
+        self.session.expunge(session)
         await self.session.commit()
-        await self.session.refresh(session)
+        await availability_cache.invalidate(slot_id)
         
         # Return session and None for due (since no due if checkin was allowed)
         return session, None
@@ -701,7 +697,7 @@ class ParkingService(AbstractService):
         vehicle_number: str
     ) -> Optional[ParkingSession]:
         """Get active session for a vehicle in a specific slot"""
-        vehicle_number = re.sub(r"[^a-zA-Z0-9]", "", vehicle_number).upper()
+        vehicle_number = normalize_plate(vehicle_number)
         
         session = await self.session.scalar(
             select(ParkingSession)
@@ -846,6 +842,7 @@ class ParkingService(AbstractService):
         # Verify staff access
         await self._verify_slot_staff(session_obj.slot_id, staff_id)
         
+        session_obj = await lock_open_session(self.session, session_obj)
         if session_obj.status != SessionStatus.CHECKED_IN:
             raise InvalidRequestException("Session is not checked in", error_code="NOT_CHECKED_IN")
         
@@ -878,7 +875,10 @@ class ParkingService(AbstractService):
         if check_out_data.notes:
             session_obj.notes = (session_obj.notes or "") + f"\nCheckout: {check_out_data.notes}"
         
+        await adjust_occupancy(self.session, session_obj.slot_id, session_obj.vehicle_type, -1)
+        await record_session_closed(self.session, session_obj)
         await self.session.commit()
+        await availability_cache.invalidate(session_obj.slot_id)
         await self.session.refresh(session_obj)
         
         return session_obj
@@ -913,6 +913,7 @@ class ParkingService(AbstractService):
         # Verify staff access
         slot, _ = await self._verify_slot_staff(session_obj.slot_id, staff_id)
         
+        session_obj = await lock_open_session(self.session, session_obj)
         if session_obj.status != SessionStatus.CHECKED_IN:
             raise InvalidRequestException("Session is not checked in", error_code="NOT_CHECKED_IN")
         
@@ -943,20 +944,281 @@ class ParkingService(AbstractService):
         )
         
         self.session.add(due)
+        await adjust_occupancy(self.session, session_obj.slot_id, session_obj.vehicle_type, -1)
+        await record_session_closed(self.session, session_obj, due_amount=calculated_fee)
         await self.session.commit()
+        await availability_cache.invalidate(session_obj.slot_id)
         await self.session.refresh(session_obj)
         await self.session.refresh(due)
         
         return session_obj, due
 
+    # ===== Batch Sync =====
+
+    # Client clocks may run slightly ahead of the server
+    BATCH_CLOCK_SKEW = timedelta(minutes=5)
+
+    async def apply_session_batch(
+        self,
+        staff_id: UUID,
+        batch: SessionBatchRequest
+    ) -> SessionBatchResponse:
+        """
+        Apply check-ins/check-outs recorded offline at a gate, in order.
+        
+        Everything the operations depend on is preloaded in a few queries,
+        operations are applied in memory, then written with bulk inserts in
+        one transaction. A failing operation is reported in its result and
+        does not stop the rest. Applied operations are recorded by
+        idempotency key, so re-sending a batch reports them as duplicates.
+        """
+        slot, _ = await self._verify_slot_staff(batch.slot_id, staff_id)
+        
+        if slot.status != SlotStatus.ACTIVE:
+            raise InvalidRequestException("Parking slot is not active", error_code="SLOT_NOT_ACTIVE")
+        
+        operations = batch.operations
+        vehicle_numbers = list({op.vehicle_number for op in operations})
+        capacity = slot.capacity or {}
+        
+        # Held until commit, so no other check-in of these plates can slip
+        # in between the open-session read below and the bulk insert
+        await lock_vehicle_numbers(self.session, vehicle_numbers)
+        
+        # Operations already applied by an earlier sync
+        applied_keys = dict((await self.session.execute(
+            select(ParkingSyncOperation.idempotency_key, ParkingSyncOperation.session_id)
+            .where(ParkingSyncOperation.idempotency_key.in_(
+                [op.idempotency_key for op in operations]
+            ))
+        )).all())
+        
+        # Open sessions for these vehicles at any slot
+        open_sessions = {
+            session.vehicle_number: session
+            for session in (await self.session.scalars(
+                select(ParkingSession).where(
+                    ParkingSession.vehicle_number.in_(vehicle_numbers),
+                    ParkingSession.status == SessionStatus.CHECKED_IN
+                )
+            )).all()
+        }
+        
+        # Vehicles blocked by outstanding dues with this owner
+        blocked_vehicles = set((await self.session.scalars(
+            select(VehicleDue.vehicle_number).where(
+                VehicleDue.vehicle_number.in_(vehicle_numbers),
+                VehicleDue.slot_owner_id == slot.owner_id,
+                VehicleDue.status == DueStatus.PENDING
+            )
+        )).all())
+        
+        vehicle_owners = await self._get_vehicle_owner_ids(vehicle_numbers)
+        
+        # Counter rows stay locked until commit so concurrent check-ins wait
+        occupied = await lock_occupancy(self.session, slot.id, capacity.keys())
+        
+        now = datetime.now(timezone.utc)
+        results = []
+        new_sessions = []
+        closed_sessions = []
+        sync_records = []
+        occupancy_delta: Dict[str, int] = {}
+        
+        def record(op: SessionBatchOperation, status: SyncItemStatus, **fields):
+            results.append(SessionBatchItemResult(
+                idempotency_key=op.idempotency_key,
+                operation=op.operation,
+                vehicle_number=op.vehicle_number,
+                status=status,
+                **fields
+            ))
+        
+        for op in operations:
+            if op.idempotency_key in applied_keys:
+                record(op, SyncItemStatus.DUPLICATE, session_id=applied_keys[op.idempotency_key])
+                continue
+            
+            client_time = op.client_timestamp
+            if client_time.tzinfo is None:
+                client_time = client_time.replace(tzinfo=timezone.utc)
+            
+            if client_time > now + self.BATCH_CLOCK_SKEW:
+                record(
+                    op, SyncItemStatus.FAILED,
+                    error_code="INVALID_TIMESTAMP",
+                    message="Client timestamp is in the future"
+                )
+                continue
+            
+            if op.operation == SyncOperationType.CHECK_IN:
+                if op.vehicle_type is None:
+                    record(
+                        op, SyncItemStatus.FAILED,
+                        error_code="INVALID_PARAMS",
+                        message="vehicle_type is required for check_in"
+                    )
+                    continue
+                
+                vehicle_type_str = op.vehicle_type.value
+                
+                if op.vehicle_number in open_sessions:
+                    record(
+                        op, SyncItemStatus.FAILED,
+                        error_code="ALREADY_CHECKED_IN",
+                        message=f"Vehicle {op.vehicle_number} is already checked in"
+                    )
+                    continue
+                
+                if occupied.get(vehicle_type_str, 0) >= capacity.get(vehicle_type_str, 0):
+                    record(
+                        op, SyncItemStatus.FAILED,
+                        error_code="CAPACITY_FULL",
+                        message=f"No capacity available for {vehicle_type_str}"
+                    )
+                    continue
+                
+                if op.vehicle_number in blocked_vehicles:
+                    record(
+                        op, SyncItemStatus.FAILED,
+                        error_code="OUTSTANDING_DUES_BLOCK",
+                        message=f"Vehicle {op.vehicle_number} has outstanding dues"
+                    )
+                    continue
+                
+                session_obj = ParkingSession(
+                    id=uuid4(),
+                    slot_id=slot.id,
+                    vehicle_number=op.vehicle_number,
+                    vehicle_type=vehicle_type_str,
+                    vehicle_owner_id=vehicle_owners.get(op.vehicle_number),
+                    checked_in_by=staff_id,
+                    check_in_time=client_time,
+                    status=SessionStatus.CHECKED_IN,
+                    payment_status=PaymentStatus.PENDING,
+                    calculated_fee=Decimal("0.00"),
+                    notes=op.notes
+                )
+                new_sessions.append(session_obj)
+                open_sessions[op.vehicle_number] = session_obj
+                occupied[vehicle_type_str] = occupied.get(vehicle_type_str, 0) + 1
+                occupancy_delta[vehicle_type_str] = occupancy_delta.get(vehicle_type_str, 0) + 1
+                
+                calculated_fee = None
+            
+            else:
+                session_obj = open_sessions.get(op.vehicle_number)
+                
+                if session_obj is None or session_obj.slot_id != slot.id:
+                    record(
+                        op, SyncItemStatus.FAILED,
+                        error_code="SESSION_NOT_FOUND",
+                        message=f"No active session found for vehicle {op.vehicle_number}"
+                    )
+                    continue
+                
+                if op.collected_fee is None or op.payment_mode is None:
+                    record(
+                        op, SyncItemStatus.FAILED,
+                        error_code="INVALID_PARAMS",
+                        message="collected_fee and payment_mode are required for check_out"
+                    )
+                    continue
+                
+                if client_time < session_obj.check_in_time:
+                    record(
+                        op, SyncItemStatus.FAILED,
+                        error_code="INVALID_TIMESTAMP",
+                        message="Check-out time is before check-in time"
+                    )
+                    continue
+                
+                calculated_fee = self._calculate_parking_fee(
+                    slot,
+                    session_obj.vehicle_type,
+                    session_obj.check_in_time,
+                    client_time
+                )
+                
+                # Same updates as check_out_vehicle
+                session_obj.check_out_time = client_time
+                session_obj.checked_out_by = staff_id
+                session_obj.calculated_fee = calculated_fee
+                session_obj.collected_fee = op.collected_fee
+                session_obj.payment_mode = op.payment_mode
+                session_obj.status = SessionStatus.CHECKED_OUT
+                
+                if op.collected_fee >= calculated_fee:
+                    session_obj.payment_status = PaymentStatus.PAID
+                elif op.collected_fee > 0:
+                    session_obj.payment_status = PaymentStatus.PARTIAL
+                else:
+                    session_obj.payment_status = PaymentStatus.PENDING
+                
+                if op.notes:
+                    session_obj.notes = (session_obj.notes or "") + f"\nCheckout: {op.notes}"
+                
+                del open_sessions[op.vehicle_number]
+                closed_sessions.append(session_obj)
+                vehicle_type_str = session_obj.vehicle_type
+                occupied[vehicle_type_str] = max(occupied.get(vehicle_type_str, 0) - 1, 0)
+                occupancy_delta[vehicle_type_str] = occupancy_delta.get(vehicle_type_str, 0) - 1
+            
+            sync_records.append(ParkingSyncOperation(
+                idempotency_key=op.idempotency_key,
+                slot_id=slot.id,
+                operation=op.operation.value,
+                vehicle_number=op.vehicle_number,
+                session_id=session_obj.id,
+                submitted_by=staff_id,
+                client_timestamp=client_time
+            ))
+            # A repeated key later in the same batch is a duplicate
+            applied_keys[op.idempotency_key] = session_obj.id
+            record(
+                op, SyncItemStatus.APPLIED,
+                session_id=session_obj.id,
+                calculated_fee=calculated_fee
+            )
+        
+        self.session.add_all(new_sessions)
+        self.session.add_all(sync_records)
+        
+        try:
+            for vehicle_type_str, delta in occupancy_delta.items():
+                if delta:
+                    await adjust_occupancy(self.session, slot.id, vehicle_type_str, delta)
+            await add_rollups(self.session, [closed_session_row(s) for s in closed_sessions])
+            await self.session.commit()
+        except IntegrityError as e:
+            await self.session.rollback()
+            if "idempotency_key" in str(e.orig):
+                raise InvalidRequestException(
+                    "This batch is already being synced. Please retry the sync.",
+                    error_code="SYNC_IN_PROGRESS"
+                )
+            raise
+        
+        if sync_records:
+            await availability_cache.invalidate(slot.id)
+        
+        return SessionBatchResponse(
+            results=results,
+            applied=sum(1 for r in results if r.status == SyncItemStatus.APPLIED),
+            duplicates=sum(1 for r in results if r.status == SyncItemStatus.DUPLICATE),
+            failed=sum(1 for r in results if r.status == SyncItemStatus.FAILED)
+        )
+
     async def list_sessions(
         self,
         slot_id: UUID,
         user_id: UUID,
         status: Optional[SessionStatus] = None,
         limit: int = 100,
-        offset: int = 0
-    ) -> Tuple[List[ParkingSession], int]:
+        offset: int = 0,
+        cursor: Optional[CursorPagination] = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT
+    ) -> Tuple[List[ParkingSession], Optional[int]]:
         """List parking sessions for a slot"""
         await self._verify_slot_staff(slot_id, user_id)
         
@@ -965,11 +1227,13 @@ class ParkingService(AbstractService):
         if status:
             query = query.where(ParkingSession.status == status)
         
-        # Get total count
-        count_result = await self.session.execute(
-            select(func.count()).select_from(query.subquery())
-        )
-        total = count_result.scalar_one()
+        if cursor is not None and cursor.enabled:
+            # Same order as offset mode: newest check-in first
+            query = cursor.apply(query, ParkingSession.check_in_time, ParkingSession.id, limit)
+            result = await self.session.execute(query)
+            return cursor.page(result.scalars().all()), None
+        
+        total = await count_rows(self.session, query, count_strategy)
         
         # Get paginated results
         query = query.offset(offset).limit(limit).order_by(ParkingSession.check_in_time.desc())
@@ -998,96 +1262,123 @@ class ParkingService(AbstractService):
         
         Returns:
             Complete transaction history with all sessions and dues
-        """
-        # Normalize vehicle number
-        vehicle_number = re.sub(r"[^a-zA-Z0-9]", "", vehicle_number).upper()
         
-        # Check if vehicle is registered
-        vehicle_owner_id = await self._get_vehicle_owner_id(vehicle_number)
-        is_registered = vehicle_owner_id is not None
-        is_owned_by_user = (requesting_user_id == vehicle_owner_id) if vehicle_owner_id else False
+        Totals, outstanding dues, the registered owner and the page of
+        sessions are all read in a single statement.
+        """
+        # Sessions, dues and the vehicle are matched on canonical_plate,
+        # so rows stored in an older format are included
+        vehicle_number = normalize_plate(vehicle_number)
         
-        # Get all sessions for this vehicle
-        sessions_query = (
-            select(ParkingSession)
-            .where(ParkingSession.vehicle_number == vehicle_number)
-            .options(
-                joinedload(ParkingSession.slot),
-                joinedload(ParkingSession.due)
+        # One statement: the summary aggregates (always exactly one row)
+        # outer-joined to the requested page of sessions
+        summary = (
+            select(
+                func.count(ParkingSession.id).label("total_sessions"),
+                func.sum(ParkingSession.collected_fee).filter(
+                    ParkingSession.status == SessionStatus.CHECKED_OUT,
+                    ParkingSession.collected_fee.isnot(None)
+                ).label("total_spent"),
+                func.count(ParkingSession.id).filter(
+                    ParkingSession.status == SessionStatus.CHECKED_IN
+                ).label("active_sessions")
             )
-            .order_by(ParkingSession.check_in_time.desc())
-            .offset(offset)
-            .limit(limit)
+            .where(ParkingSession.canonical_plate == vehicle_number)
+            .subquery("summary")
         )
         
-        result = await self.session.execute(sessions_query)
-        sessions = result.unique().scalars().all()
-        
-        # Count total sessions
-        count_result = await self.session.execute(
-            select(func.count()).select_from(
-                select(ParkingSession.id)
-                .where(ParkingSession.vehicle_number == vehicle_number)
-                .subquery()
+        outstanding_dues = (
+            select(func.sum(VehicleDue.due_amount - VehicleDue.paid_amount))
+            .where(
+                VehicleDue.canonical_plate == vehicle_number,
+                VehicleDue.status == DueStatus.PENDING
             )
+            .scalar_subquery()
         )
-        total_sessions = count_result.scalar_one()
         
-        # Calculate total spent (completed sessions only)
-        spent_result = await self.session.execute(
-            select(func.sum(ParkingSession.collected_fee))
+        vehicle_owner = (
+            select(Vehicle.user_id)
             .where(
-                ParkingSession.vehicle_number == vehicle_number,
-                ParkingSession.status == SessionStatus.CHECKED_OUT,
-                ParkingSession.collected_fee.isnot(None)
+                Vehicle.canonical_plate == vehicle_number,
+                Vehicle.deleted_at.is_(None)
             )
+            .order_by(Vehicle.created_at)
+            .limit(1)
+            .scalar_subquery()
         )
-        total_spent = spent_result.scalar_one() or Decimal("0.00")
         
-        # Count active sessions
-        active_count = await self.session.scalar(
-            select(func.count()).select_from(
-                select(ParkingSession.id)
-                .where(
-                    ParkingSession.vehicle_number == vehicle_number,
-                    ParkingSession.status == SessionStatus.CHECKED_IN
-                )
-                .subquery()
+        page = (
+            select(
+                ParkingSession.id,
+                ParkingSession.vehicle_type,
+                ParkingSession.check_in_time,
+                ParkingSession.check_out_time,
+                ParkingSession.status,
+                ParkingSession.calculated_fee,
+                ParkingSession.collected_fee,
+                ParkingSession.payment_mode,
+                ParkingSession.payment_status,
+                ParkingSlot.id.label("slot_id"),
+                ParkingSlot.name.label("slot_name"),
+                ParkingSlot.location.label("slot_location"),
+                ParkingSlot.pricing_model.label("slot_pricing_model")
             )
+            .join(ParkingSlot, ParkingSlot.id == ParkingSession.slot_id)
+            .where(ParkingSession.canonical_plate == vehicle_number)
+            .order_by(ParkingSession.check_in_time.desc())
+            .offset(offset)
+            .limit(limit)
+            .subquery("page")
         )
         
-        # Calculate outstanding dues
-        dues_result = await self.session.execute(
-            select(func.sum(VehicleDue.due_amount - VehicleDue.paid_amount))
-            .where(
-                VehicleDue.vehicle_number == vehicle_number,
-                VehicleDue.status == DueStatus.PENDING
+        result = await self.session.execute(
+            select(
+                summary,
+                outstanding_dues.label("outstanding_dues"),
+                vehicle_owner.label("vehicle_owner_id"),
+                page
             )
+            .select_from(summary)
+            .outerjoin(page, sa.true())
+            .order_by(page.c.check_in_time.desc())
         )
-        outstanding_dues = dues_result.scalar_one() or Decimal("0.00")
+        rows = result.all()
+        first = rows[0]
+        
+        vehicle_owner_id = first.vehicle_owner_id
+        is_registered = vehicle_owner_id is not None
+        is_owned_by_user = (requesting_user_id == vehicle_owner_id) if vehicle_owner_id else False
         
-        # Build transaction list
+        total_sessions = first.total_sessions
+        total_spent = first.total_spent or Decimal("0.00")
+        active_count = first.active_sessions
+        outstanding_dues = first.outstanding_dues or Decimal("0.00")
+        
+        # Build transaction list (no page rows -> a single all-NULL row)
         transactions = []
-        for session in sessions:
+        for row in rows:
+            if row.id is None:
+                continue
+            
             slot_info = SlotBasicInfo(
-                id=session.slot.id,
-                name=session.slot.name,
-                location=session.slot.location,
-                pricing_model=session.slot.pricing_model
+                id=row.slot_id,
+                name=row.slot_name,
+                location=row.slot_location,
+                pricing_model=row.slot_pricing_model
             )
             
             transaction = TransactionHistoryItem(
-                id=session.id,
+                id=row.id,
                 slot=slot_info,
-                vehicle_number=session.vehicle_number,
-                vehicle_type=session.vehicle_type,
-                check_in_time=session.check_in_time,
-                check_out_time=session.check_out_time,
-                status=session.status,
-                calculated_fee=session.calculated_fee,
-                collected_fee=session.collected_fee,
-                payment_mode=session.payment_mode,
-                payment_status=session.payment_status,
+                vehicle_number=vehicle_number,
+                vehicle_type=row.vehicle_type,
+                check_in_time=row.check_in_time,
+                check_out_time=row.check_out_time,
+                status=row.status,
+                calculated_fee=row.calculated_fee,
+                collected_fee=row.collected_fee,
+                payment_mode=row.payment_mode,
+                payment_status=row.payment_status,
                 is_owned_by_user=is_owned_by_user
             )
             transactions.append(transaction)
@@ -1111,113 +1402,109 @@ class ParkingService(AbstractService):
         """
         Get parking transaction history for all vehicles owned by the user.
         
+        All per-vehicle totals come from one grouped query, so the number
+        of round trips doesn't grow with the size of the fleet.
+        
         Returns:
             Summary of all vehicles and their parking history
         """
-        try:
-            from apps.api.vehicle.models import Vehicle
-            
-            # Get all vehicles owned by user
-            vehicles_query = (
-                select(Vehicle)
-                .where(
-                    Vehicle.user_id == user_id,
-                    Vehicle.deleted_at.is_(None)
-                )
+        owned_numbers = (
+            select(Vehicle.canonical_plate)
+            .where(
+                Vehicle.user_id == user_id,
+                Vehicle.deleted_at.is_(None)
             )
-            
-            result = await self.session.execute(vehicles_query)
-            vehicles = result.scalars().all()
-            
-            if not vehicles:
-                return {
-                    "total_vehicles": 0,
-                    "total_sessions": 0,
-                    "total_spent": Decimal("0.00"),
-                    "outstanding_dues": Decimal("0.00"),
-                    "vehicles": []
-                }
-            
-            # Get transaction history for each vehicle
-            vehicle_summaries = []
-            total_sessions = 0
-            total_spent = Decimal("0.00")
-            total_dues = Decimal("0.00")
-            
-            for vehicle in vehicles:
-                # Get session stats for this vehicle
-                sessions_count = await self.session.scalar(
-                    select(func.count()).select_from(
-                        select(ParkingSession.id)
-                        .where(ParkingSession.vehicle_number == vehicle.vehicle_number)
-                        .subquery()
-                    )
-                )
-                
-                # Get total spent
-                spent = await self.session.scalar(
-                    select(func.sum(ParkingSession.collected_fee))
-                    .where(
-                        ParkingSession.vehicle_number == vehicle.vehicle_number,
-                        ParkingSession.status == SessionStatus.CHECKED_OUT,
-                        ParkingSession.collected_fee.isnot(None)
-                    )
-                ) or Decimal("0.00")
-                
-                # Get active sessions count
-                active = await self.session.scalar(
-                    select(func.count()).select_from(
-                        select(ParkingSession.id)
-                        .where(
-                            ParkingSession.vehicle_number == vehicle.vehicle_number,
-                            ParkingSession.status == SessionStatus.CHECKED_IN
-                        )
-                        .subquery()
-                    )
-                )
-                
-                # Get outstanding dues
-                dues = await self.session.scalar(
-                    select(func.sum(VehicleDue.due_amount - VehicleDue.paid_amount))
-                    .where(
-                        VehicleDue.vehicle_number == vehicle.vehicle_number,
-                        VehicleDue.status == DueStatus.PENDING
-                    )
-                ) or Decimal("0.00")
-                
-                vehicle_summaries.append({
-                    "vehicle_id": vehicle.id,
-                    "vehicle_number": vehicle.vehicle_number,
-                    "vehicle_name": vehicle.name,
-                    "vehicle_type": vehicle.vehicle_type,
-                    "total_sessions": sessions_count,
-                    "total_spent": float(spent),
-                    "active_sessions": active,
-                    "outstanding_dues": float(dues)
-                })
-                
-                total_sessions += sessions_count
-                total_spent += spent
-                total_dues += dues
-            
-            return {
-                "total_vehicles": len(vehicles),
-                "total_sessions": total_sessions,
-                "total_spent": float(total_spent),
-                "outstanding_dues": float(total_dues),
-                "vehicles": vehicle_summaries
-            }
-            
-        except ImportError:
-            # Vehicle module not installed/available
+        )
+        
+        # Per-vehicle aggregates for the whole fleet, grouped separately
+        # so sessions and dues don't multiply each other in the join
+        session_stats = (
+            select(
+                ParkingSession.canonical_plate,
+                func.count(ParkingSession.id).label("total_sessions"),
+                func.sum(ParkingSession.collected_fee).filter(
+                    ParkingSession.status == SessionStatus.CHECKED_OUT,
+                    ParkingSession.collected_fee.isnot(None)
+                ).label("total_spent"),
+                func.count(ParkingSession.id).filter(
+                    ParkingSession.status == SessionStatus.CHECKED_IN
+                ).label("active_sessions")
+            )
+            .where(ParkingSession.canonical_plate.in_(owned_numbers))
+            .group_by(ParkingSession.canonical_plate)
+            .subquery("session_stats")
+        )
+        
+        due_stats = (
+            select(
+                VehicleDue.canonical_plate,
+                func.sum(VehicleDue.due_amount - VehicleDue.paid_amount).label("outstanding_dues")
+            )
+            .where(
+                VehicleDue.canonical_plate.in_(owned_numbers),
+                VehicleDue.status == DueStatus.PENDING
+            )
+            .group_by(VehicleDue.canonical_plate)
+            .subquery("due_stats")
+        )
+        
+        result = await self.session.execute(
+            select(
+                Vehicle.id,
+                Vehicle.vehicle_number,
+                Vehicle.name,
+                Vehicle.vehicle_type,
+                func.coalesce(session_stats.c.total_sessions, 0).label("total_sessions"),
+                func.coalesce(session_stats.c.total_spent, 0).label("total_spent"),
+                func.coalesce(session_stats.c.active_sessions, 0).label("active_sessions"),
+                func.coalesce(due_stats.c.outstanding_dues, 0).label("outstanding_dues")
+            )
+            .outerjoin(session_stats, session_stats.c.canonical_plate == Vehicle.canonical_plate)
+            .outerjoin(due_stats, due_stats.c.canonical_plate == Vehicle.canonical_plate)
+            .where(
+                Vehicle.user_id == user_id,
+                Vehicle.deleted_at.is_(None)
+            )
+        )
+        vehicles = result.all()
+        
+        if not vehicles:
             return {
                 "total_vehicles": 0,
                 "total_sessions": 0,
-                "total_spent": 0.0,
-                "outstanding_dues": 0.0,
-                "vehicles": [],
-                "error": "Vehicle module not available"
+                "total_spent": Decimal("0.00"),
+                "outstanding_dues": Decimal("0.00"),
+                "vehicles": []
             }
+        
+        vehicle_summaries = []
+        total_sessions = 0
+        total_spent = Decimal("0.00")
+        total_dues = Decimal("0.00")
+        
+        for vehicle in vehicles:
+            vehicle_summaries.append({
+                "vehicle_id": vehicle.id,
+                "vehicle_number": vehicle.vehicle_number,
+                "vehicle_name": vehicle.name,
+                "vehicle_type": vehicle.vehicle_type,
+                "total_sessions": vehicle.total_sessions,
+                "total_spent": float(vehicle.total_spent),
+                "active_sessions": vehicle.active_sessions,
+                "outstanding_dues": float(vehicle.outstanding_dues)
+            })
+            
+            total_sessions += vehicle.total_sessions
+            total_spent += vehicle.total_spent
+            total_dues += vehicle.outstanding_dues
+        
+        return {
+            "total_vehicles": len(vehicles),
+            "total_sessions": total_sessions,
+            "total_spent": float(total_spent),
+            "outstanding_dues": float(total_dues),
+            "vehicles": vehicle_summaries
+        }
 
     # ===== Due Management =====
 
@@ -1228,25 +1515,23 @@ class ParkingService(AbstractService):
         payment_data: DueCollect
     ) -> VehicleDue:
         """Collect payment for a vehicle due"""
-        due = await self.session.get(VehicleDue, due_id)
-        if not due:
+        # Load the due and probe staff access at any of the owner's slots together
+        row = (await self.session.execute(
+            select(
+                VehicleDue,
+                self.role_manager.can_collect_due_clause(
+                    staff_id, VehicleDue.slot_owner_id
+                ).label("can_collect")
+            ).where(VehicleDue.id == due_id)
+        )).one_or_none()
+        if not row:
             raise InvalidRequestException("Due record not found", error_code="DUE_NOT_FOUND")
         
+        due = row.VehicleDue
         if due.status != DueStatus.PENDING:
             raise InvalidRequestException("Due is not pending payment", error_code="NOT_PENDING")
         
-        # Verify staff belongs to slot owner
-        # Get any slot owned by the due owner
-        slot = await self.session.scalar(
-            select(ParkingSlot).where(
-                ParkingSlot.owner_id == due.slot_owner_id,
-                ParkingSlot.deleted_at.is_(None)
-            ).limit(1)
-        )
-        
-        if slot:
-            await self._verify_slot_staff(slot.id, staff_id)
-        else:
+        if not row.can_collect:
             raise ForbiddenException("You are not authorized to collect this payment")
         
         # Update due
@@ -1263,6 +1548,7 @@ class ParkingService(AbstractService):
         if due.paid_amount >= due.due_amount:
             due.status = DueStatus.PAID
         
+        await record_due_collected(self.session, due, payment_data.paid_amount, due.paid_at)
         await self.session.commit()
         await self.session.refresh(due)
         
@@ -1273,19 +1559,22 @@ class ParkingService(AbstractService):
         owner_id: UUID,
         status: Optional[DueStatus] = None,
         limit: int = 100,
-        offset: int = 0
-    ) -> Tuple[List[VehicleDue], int]:
+        offset: int = 0,
+        cursor: Optional[CursorPagination] = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT
+    ) -> Tuple[List[VehicleDue], Optional[int]]:
         """List vehicle dues for an owner"""
         query = select(VehicleDue).where(VehicleDue.slot_owner_id == owner_id)
         
         if status:
             query = query.where(VehicleDue.status == status)
         
-        # Get total count
-        count_result = await self.session.execute(
-            select(func.count()).select_from(query.subquery())
-        )
-        total = count_result.scalar_one()
+        if cursor is not None and cursor.enabled:
+            query = cursor.apply(query, VehicleDue.created_at, VehicleDue.id, limit)
+            result = await self.session.execute(query)
+            return cursor.page(result.scalars().all()), None
+        
+        total = await count_rows(self.session, query, count_strategy)
         
         # Get paginated results
         query = query.offset(offset).limit(limit).order_by(VehicleDue.created_at.desc())
@@ -1299,19 +1588,16 @@ class ParkingService(AbstractService):
     async def list_pending_slots(
         self,
         limit: int = 100,
-        offset: int = 0
-    ) -> Tuple[List[ParkingSlot], int]:
+        offset: int = 0,
+        count_strategy: CountStrategy = CountStrategy.EXACT
+    ) -> Tuple[List[ParkingSlot], Optional[int]]:
         """List slots pending verification (admin only)"""
         query = select(ParkingSlot).where(
             ParkingSlot.status == SlotStatus.PENDING_VERIFICATION,
             ParkingSlot.deleted_at.is_(None)
         )
         
-        # Get total count
-        count_result = await self.session.execute(
-            select(func.count()).select_from(query.subquery())
-        )
-        total = count_result.scalar_one()
+        total = await count_rows(self.session, query, count_strategy)
         
         # Get paginated results
         query = query.offset(offset).limit(limit).order_by(ParkingSlot.created_at.asc())
@@ -1343,152 +1629,329 @@ class ParkingService(AbstractService):
             slot.rejection_reason = verification.rejection_reason
         
         await self.session.commit()
+        self.role_manager.invalidate_slot(slot_id)
         await self.session.refresh(slot)
         
         return slot
 
-    async def get_admin_analytics(
+    async def get_projected_revenue(
         self,
+        owner_id: UUID,
+        slot_id: Optional[UUID] = None
+    ) -> ProjectedRevenue:
+        """
+        Fees currently parked vehicles would pay if they checked out now,
+        for one slot or all of the owner's slots.
+        
+        Only (slot_id, vehicle_type, check_in_time) columns are loaded, and
+        fees are computed per slot and vehicle type in one fees_for() pass
+        over the compiled tariff.
+        """
+        slots_stmt = select(ParkingSlot).where(
+            ParkingSlot.owner_id == owner_id,
+            ParkingSlot.deleted_at.is_(None)
+        )
+        if slot_id:
+            await self._verify_slot_owner(slot_id, owner_id)
+            slots_stmt = slots_stmt.where(ParkingSlot.id == slot_id)
+        
+        slots = {slot.id: slot for slot in (await self.session.scalars(slots_stmt)).all()}
+        
+        result = await self.session.execute(
+            select(
+                ParkingSession.slot_id,
+                ParkingSession.vehicle_type,
+                ParkingSession.check_in_time
+            )
+            .where(
+                ParkingSession.slot_id.in_(list(slots)),
+                ParkingSession.status == SessionStatus.CHECKED_IN
+            )
+        )
+        
+        # Durations grouped per (slot, vehicle type)
+        now = datetime.now(timezone.utc)
+        durations: Dict[Tuple[UUID, str], List[timedelta]] = {}
+        for session_slot_id, vehicle_type, check_in_time in result:
+            durations.setdefault((session_slot_id, vehicle_type), []).append(now - check_in_time)
+        
+        by_slot: Dict[UUID, Dict[str, Decimal]] = {}
+        open_by_slot: Dict[UUID, int] = {}
+        for (session_slot_id, vehicle_type), stays in durations.items():
+            fees = get_tariff(slots[session_slot_id]).fees_for(vehicle_type, stays)
+            by_slot.setdefault(session_slot_id, {})[vehicle_type] = sum(fees, Decimal("0.00"))
+            open_by_slot[session_slot_id] = open_by_slot.get(session_slot_id, 0) + len(stays)
+        
+        slot_results = [
+            SlotProjectedRevenue(
+                slot_id=slot.id,
+                slot_name=slot.name,
+                open_sessions=open_by_slot.get(slot.id, 0),
+                projected_revenue=sum(by_slot.get(slot.id, {}).values(), Decimal("0.00")),
+                by_vehicle_type=by_slot.get(slot.id, {})
+            )
+            for slot in slots.values()
+        ]
+        slot_results.sort(key=lambda item: item.projected_revenue, reverse=True)
+        
+        return ProjectedRevenue(
+            as_of=now,
+            open_sessions=sum(item.open_sessions for item in slot_results),
+            projected_revenue=sum((item.projected_revenue for item in slot_results), Decimal("0.00")),
+            slots=slot_results
+        )
+
+    async def get_owner_dashboard(
+        self,
+        owner_id: UUID,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> Dict:
-        """Get master analytics for admin"""
+        end_date: Optional[datetime] = None,
+        slot_id: Optional[UUID] = None
+    ) -> OwnerDashboard:
+        """
+        Owner analytics over the date range, for one slot or all owned slots.
+        
+        Reads parking_hourly_rollups (see parking/rollups.py), so a range of
+        months sums a few hundred rows per slot instead of scanning
+        sessions. Resolution is one hour: the hours containing start_date
+        and end_date are counted whole.
+        """
         if not start_date:
             start_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
         if not end_date:
             end_date = datetime.now(timezone.utc)
         
-        # Total slots
-        total_slots = await self.session.scalar(
-            select(func.count()).select_from(
-                select(ParkingSlot).where(ParkingSlot.deleted_at.is_(None)).subquery()
-            )
+        slots_stmt = select(ParkingSlot.id, ParkingSlot.name).where(
+            ParkingSlot.owner_id == owner_id,
+            ParkingSlot.deleted_at.is_(None)
         )
-        
-        # Active slots
-        active_slots = await self.session.scalar(
-            select(func.count()).select_from(
-                select(ParkingSlot).where(
-                    ParkingSlot.status == SlotStatus.ACTIVE,
-                    ParkingSlot.deleted_at.is_(None)
-                ).subquery()
-            )
+        if slot_id:
+            await self._verify_slot_owner(slot_id, owner_id)
+            slots_stmt = slots_stmt.where(ParkingSlot.id == slot_id)
+        slot_names = dict((await self.session.execute(slots_stmt)).all())
+        slot_ids = list(slot_names)
+        
+        sums = [
+            func.coalesce(func.sum(getattr(ParkingHourlyRollup, measure)), 0).label(measure)
+            for measure in MEASURES
+        ]
+        in_range = (
+            ParkingHourlyRollup.slot_id.in_(slot_ids),
+            ParkingHourlyRollup.hour >= hour_bucket(start_date),
+            ParkingHourlyRollup.hour < end_date
         )
         
-        # Total revenue
-        total_revenue = await self.session.scalar(
-            select(func.sum(ParkingSession.collected_fee)).where(
-                ParkingSession.check_out_time >= start_date,
-                ParkingSession.check_out_time <= end_date,
-                ParkingSession.status.in_([SessionStatus.CHECKED_OUT])
+        by_slot_rows = (await self.session.execute(
+            select(ParkingHourlyRollup.slot_id, ParkingHourlyRollup.vehicle_type, *sums)
+            .where(*in_range)
+            .group_by(ParkingHourlyRollup.slot_id, ParkingHourlyRollup.vehicle_type)
+        )).all()
+        
+        day = func.date_trunc("day", func.timezone("UTC", ParkingHourlyRollup.hour)).label("day")
+        daily_rows = (await self.session.execute(
+            select(day, *sums)
+            .where(*in_range)
+            .group_by(day)
+            .order_by(day)
+        )).all()
+        
+        live = (await self.session.execute(
+            select(
+                select(func.coalesce(func.sum(ParkingSlotOccupancy.occupied), 0))
+                .where(ParkingSlotOccupancy.slot_id.in_(slot_ids))
+                .scalar_subquery()
+                .label("active_sessions"),
+                select(func.coalesce(func.sum(VehicleDue.due_amount - VehicleDue.paid_amount), 0))
+                .where(
+                    VehicleDue.slot_owner_id == owner_id,
+                    VehicleDue.status == DueStatus.PENDING
+                )
+                .scalar_subquery()
+                .label("outstanding_dues")
+            )
+        )).one()
+        
+        def totals(values: Dict[str, Decimal]) -> DashboardTotals:
+            return DashboardTotals(
+                sessions=int(values["checkouts"] + values["escapes"]),
+                checkouts=int(values["checkouts"]),
+                escapes=int(values["escapes"]),
+                revenue=Decimal(values["revenue"]),
+                dues_raised=Decimal(values["dues_raised"]),
+                dues_collected=Decimal(values["dues_collected"])
             )
-        ) or Decimal("0.00")
         
-        # Total sessions
-        total_sessions = await self.session.scalar(
-            select(func.count()).select_from(
-                select(ParkingSession).where(
-                    ParkingSession.check_in_time >= start_date,
-                    ParkingSession.check_in_time <= end_date
-                ).subquery()
+        def add(target: Dict[str, Decimal], row) -> None:
+            for measure in MEASURES:
+                target[measure] = target.get(measure, 0) + getattr(row, measure)
+        
+        grand: Dict[str, Decimal] = dict.fromkeys(MEASURES, 0)
+        per_slot: Dict[UUID, Dict[str, Decimal]] = {}
+        per_type: Dict[UUID, Dict[str, Dict[str, Decimal]]] = {}
+        for row in by_slot_rows:
+            add(grand, row)
+            add(per_slot.setdefault(row.slot_id, dict.fromkeys(MEASURES, 0)), row)
+            add(per_type.setdefault(row.slot_id, {}).setdefault(row.vehicle_type, {}), row)
+        
+        slot_results = [
+            DashboardSlot(
+                slot_id=owned_slot_id,
+                slot_name=name,
+                totals=totals(per_slot.get(owned_slot_id, dict.fromkeys(MEASURES, 0))),
+                by_vehicle_type={
+                    vehicle_type: totals(values)
+                    for vehicle_type, values in per_type.get(owned_slot_id, {}).items()
+                }
             )
+            for owned_slot_id, name in slot_names.items()
+        ]
+        slot_results.sort(key=lambda item: item.totals.revenue, reverse=True)
+        
+        return OwnerDashboard(
+            date_range={
+                "start_date": start_date,
+                "end_date": end_date
+            },
+            totals=totals(grand),
+            active_sessions=live.active_sessions,
+            outstanding_dues=Decimal(live.outstanding_dues),
+            slots=slot_results,
+            daily=[
+                DashboardDay(
+                    day=row.day.replace(tzinfo=timezone.utc),
+                    totals=totals({measure: getattr(row, measure) for measure in MEASURES})
+                )
+                for row in daily_rows
+            ]
         )
+
+    async def get_admin_analytics(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict:
+        """
+        Get master analytics for admin.
         
-        # Outstanding dues
-        outstanding_dues = await self.session.scalar(
-            select(func.sum(VehicleDue.due_amount - VehicleDue.paid_amount)).where(
-                VehicleDue.status == DueStatus.PENDING
+        All KPIs come from one statement with a CTE per table (slots,
+        sessions, dues), each aggregating its table in a single scan, and
+        are cached per date range (see apps/statistics.py).
+        """
+        cache_key = ("parking_admin_analytics", start_date, end_date)
+        if not start_date:
+            start_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        if not end_date:
+            end_date = datetime.now(timezone.utc)
+        
+        async def load() -> Dict:
+            slot_stats = (
+                select(
+                    func.count().label("total_slots"),
+                    func.count().filter(ParkingSlot.status == SlotStatus.ACTIVE).label("active_slots")
+                )
+                .where(ParkingSlot.deleted_at.is_(None))
+                .cte("slot_stats")
             )
-        ) or Decimal("0.00")
+            
+            checked_out_in_range = and_(
+                ParkingSession.status == SessionStatus.CHECKED_OUT,
+                ParkingSession.check_out_time >= start_date,
+                ParkingSession.check_out_time <= end_date
+            )
+            checked_in_in_range = ParkingSession.check_in_time >= start_date
+            session_stats = (
+                select(
+                    func.coalesce(
+                        func.sum(ParkingSession.collected_fee).filter(checked_out_in_range), 0
+                    ).label("total_revenue"),
+                    func.count().filter(checked_in_in_range).label("total_sessions")
+                )
+                .where(
+                    # Both KPIs need check_in_time <= end_date, which also
+                    # prunes later partitions
+                    ParkingSession.check_in_time <= end_date,
+                    or_(checked_in_in_range, ParkingSession.check_out_time >= start_date)
+                )
+                .cte("session_stats")
+            )
+            
+            due_stats = (
+                select(
+                    func.coalesce(
+                        func.sum(VehicleDue.due_amount - VehicleDue.paid_amount), 0
+                    ).label("total_outstanding_dues")
+                )
+                .where(VehicleDue.status == DueStatus.PENDING)
+                .cte("due_stats")
+            )
+            
+            return await gather_statistics(
+                {"parking": combine_ctes(slot_stats, session_stats, due_stats)},
+                session=self.session
+            )
+        
+        stats = await cached_statistics(cache_key, load)
         
         return {
             "date_range": {
                 "start_date": start_date,
                 "end_date": end_date
             },
-            "total_slots": total_slots,
-            "active_slots": active_slots,
-            "total_revenue": float(total_revenue),
-            "total_sessions": total_sessions,
-            "total_outstanding_dues": float(outstanding_dues)
+            "total_slots": stats["total_slots"],
+            "active_slots": stats["active_slots"],
+            "total_revenue": float(stats["total_revenue"]),
+            "total_sessions": stats["total_sessions"],
+            "total_outstanding_dues": float(stats["total_outstanding_dues"])
         }
 
     # ===== Public Endpoints =====
 
     async def find_nearby_parking_slots(
-            self,
-            latitude: float,
-            longitude: float,
-            radius_km: float = 5.0,
-            limit: int = 20
-        ) -> List[Dict]:
-            """
-            Find active parking slots near a location with real-time availability.
-            Public endpoint - no authentication required.
-            
-            Uses Haversine formula to calculate distance.
-            """
-            
-            # Haversine formula for distance calculation
-            # Distance in kilometers
-            earth_radius_km = 6371
-            
-            # Convert degrees to radians for calculation
-            lat_rad = func.radians(latitude)
-            lon_rad = func.radians(longitude)
-            slot_lat_rad = func.radians(ParkingSlot.latitude)
-            slot_lon_rad = func.radians(ParkingSlot.longitude)
-            
-            # Haversine formula
-            dlat = slot_lat_rad - lat_rad
-            dlon = slot_lon_rad - lon_rad
-            
-            # Use func.power() instead of ** operator
-            a = (func.power(func.sin(dlat / 2), 2) + 
-                func.cos(lat_rad) * func.cos(slot_lat_rad) * 
-                func.power(func.sin(dlon / 2), 2))
-            
-            c = 2 * func.asin(func.sqrt(a))
-            distance = earth_radius_km * c
-            
-            # Query active slots within radius
-            query = select(
-                ParkingSlot,
-                distance.label('distance_km')
-            ).where(
-                ParkingSlot.status == SlotStatus.ACTIVE,
-                ParkingSlot.deleted_at.is_(None),
-                distance <= radius_km
-            ).order_by(
-                distance
-            ).limit(limit)
-            
-            result = await self.session.execute(query)
-            slots_with_distance = result.all()
-            
-            # Build response with availability for each slot
-            nearby_slots = []
-            for slot, distance_km in slots_with_distance:
-                # Get real-time availability
-                availability = await self.get_slot_availability(slot.id)
-                
-                nearby_slots.append({
-                    "id": slot.id,
-                    "name": slot.name,
-                    "description": slot.description,
-                    "location": slot.location,
-                    "latitude": slot.latitude,
-                    "longitude": slot.longitude,
-                    "distance_km": round(float(distance_km), 2),
-                    "capacity": slot.capacity,
-                    "pricing_model": slot.pricing_model,
-                    "pricing_config": slot.pricing_config,
-                    "payment_timing": slot.payment_timing,
-                    "availability": availability.available,
-                    "occupancy_percentage": availability.occupancy_percentage
-                })
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float = 5.0,
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Find active parking slots near a location with real-time availability.
+        Public endpoint - no authentication required.
+        
+        Prefilters on an indexed bounding box, then orders the survivors
+        by exact Haversine distance (see parking/geo.py).
+        """
+        result = await self.session.execute(
+            nearby_slots_query(latitude, longitude, radius_km, limit)
+        )
+        slots_with_distance = result.all()
+        
+        # Real-time availability for all results in one grouped query
+        availability_by_slot = await get_bulk_availability(
+            self.session,
+            [slot for slot, _ in slots_with_distance]
+        )
+        
+        nearby_slots = []
+        for slot, distance_km in slots_with_distance:
+            availability = availability_by_slot[slot.id]
             
-            return nearby_slots
+            nearby_slots.append({
+                "id": slot.id,
+                "name": slot.name,
+                "description": slot.description,
+                "location": slot.location,
+                "latitude": slot.latitude,
+                "longitude": slot.longitude,
+                "distance_km": round(float(distance_km), 2),
+                "capacity": slot.capacity,
+                "pricing_model": slot.pricing_model,
+                "pricing_config": slot.pricing_config,
+                "payment_timing": slot.payment_timing,
+                "availability": availability.available,
+                "occupancy_percentage": availability.occupancy_percentage
+            })
+        
+        return nearby_slots
 
 
 ParkingServiceDependency = Annotated[ParkingService, ParkingService.get_dependency()]
\ No newline at end of file
@@ -23,8 +23,6 @@ from typing import Optional, List, Dict, Tuple
 from uuid import UUID
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
-import math
-import re
 
 from apps.api.parking.models import (
     ParkingSlot,
@@ -55,6 +53,23 @@ from apps.api.parking.role_manager import (
     UserRoleContext,
     UserSlotRole
 )
+from apps.api.parking.geo import nearby_slots_query
+from apps.api.parking.pricing import get_tariff
+from apps.api.parking.occupancy import (
+    adjust_occupancy,
+    lock_open_session,
+    lock_slot,
+    lock_vehicle_numbers
+)
+from apps.api.parking.rollups import record_session_closed, record_due_collected
+from apps.api.parking.cache import availability_cache
+from apps.api.parking.availability import (
+    fetch_live_occupancy,
+    build_slot_availability,
+    get_bulk_availability
+)
+from apps.api.vehicle.owners import get_plate_owner
+from apps.api.vehicle.plate import normalize_plate
 from avcfastapi.core.database.sqlalchamey.core import SessionDep
 from avcfastapi.core.exception.authentication import ForbiddenException
 from avcfastapi.core.exception.request import InvalidRequestException
@@ -122,6 +137,7 @@ class EnhancedParkingService(AbstractService):
         self.session.add(owner_staff)
         
         await self.session.commit()
+        self.role_manager.invalidate(user_id)
         await self.session.refresh(slot)
         
         return slot
@@ -157,6 +173,8 @@ class EnhancedParkingService(AbstractService):
             setattr(slot, field, value)
         
         await self.session.commit()
+        await availability_cache.invalidate(slot_id)
+        self.role_manager.invalidate_slot(slot_id)
         await self.session.refresh(slot)
         
         return slot
@@ -194,6 +212,8 @@ class EnhancedParkingService(AbstractService):
         
         slot.soft_delete()
         await self.session.commit()
+        await availability_cache.invalidate(slot_id)
+        self.role_manager.invalidate_slot(slot_id)
         
         return True
     
@@ -251,6 +271,7 @@ class EnhancedParkingService(AbstractService):
         
         self.session.add(staff)
         await self.session.commit()
+        self.role_manager.invalidate(staff_data.user_id)
         await self.session.refresh(staff)
         
         return staff
@@ -283,8 +304,10 @@ class EnhancedParkingService(AbstractService):
                 error_code="CANNOT_REMOVE_OWNER"
             )
         
+        staff_user_id = staff.user_id
         await self.session.delete(staff)
         await self.session.commit()
+        self.role_manager.invalidate(staff_user_id)
         
         return True
     
@@ -333,23 +356,26 @@ class EnhancedParkingService(AbstractService):
             require_active=True
         )
         
-        slot = await self.session.get(ParkingSlot, slot_id)
-        
         # Normalize vehicle number
-        vehicle_number = self._normalize_vehicle_number(vehicle_data.vehicle_number)
+        vehicle_number = normalize_plate(vehicle_data.vehicle_number)
         
-        # Check if vehicle is already checked in
+        # Plate lock, then slot row lock: check-ins of this vehicle and
+        # check-ins at this slot both serialize until commit
+        await lock_vehicle_numbers(self.session, [vehicle_number])
+        slot = await lock_slot(self.session, slot_id)
+        
+        # Check if vehicle is already checked in anywhere
         existing = await self.session.scalar(
             select(ParkingSession).where(
-                ParkingSession.slot_id == slot_id,
                 ParkingSession.vehicle_number == vehicle_number,
                 ParkingSession.status == SessionStatus.CHECKED_IN
             )
         )
         
         if existing:
+            where = "this slot" if existing.slot_id == slot_id else "another slot"
             raise InvalidRequestException(
-                f"Vehicle {vehicle_number} is already checked in at this slot",
+                f"Vehicle {vehicle_number} is already checked in at {where}",
                 error_code="VEHICLE_ALREADY_CHECKED_IN"
             )
         
@@ -377,7 +403,9 @@ class EnhancedParkingService(AbstractService):
         )
         
         self.session.add(session)
+        await adjust_occupancy(self.session, slot_id, session.vehicle_type, 1)
         await self.session.commit()
+        await availability_cache.invalidate(slot_id)
         await self.session.refresh(session)
         
         # Return session with due alert if exists
@@ -414,6 +442,7 @@ class EnhancedParkingService(AbstractService):
         )
         
         # Verify session is checked in
+        session = await lock_open_session(self.session, session)
         if session.status != SessionStatus.CHECKED_IN:
             raise InvalidRequestException(
                 f"Cannot check out: session status is {session.status.value}",
@@ -441,6 +470,7 @@ class EnhancedParkingService(AbstractService):
         session.notes = checkout_data.notes or session.notes
         
         # Determine payment status
+        due_amount = None
         if checkout_data.collected_fee >= calculated_fee:
             session.payment_status = PaymentStatus.PAID
             session.status = SessionStatus.CHECKED_OUT
@@ -449,23 +479,29 @@ class EnhancedParkingService(AbstractService):
             session.status = SessionStatus.CHECKED_OUT
             
             # Create due for remaining amount
+            due_amount = calculated_fee - checkout_data.collected_fee
             await self._create_vehicle_due(
                 session=session,
                 slot_owner_id=slot.owner_id,
-                due_amount=calculated_fee - checkout_data.collected_fee
+                due_amount=due_amount
             )
         else:
             session.payment_status = PaymentStatus.PENDING
             session.status = SessionStatus.ESCAPED
             
             # Create full due
+            due_amount = calculated_fee
             await self._create_vehicle_due(
                 session=session,
                 slot_owner_id=slot.owner_id,
-                due_amount=calculated_fee
+                due_amount=due_amount
             )
         
+        # Both CHECKED_OUT and ESCAPED free the space
+        await adjust_occupancy(self.session, session.slot_id, session.vehicle_type, -1)
+        await record_session_closed(self.session, session, due_amount=due_amount)
         await self.session.commit()
+        await availability_cache.invalidate(session.slot_id)
         await self.session.refresh(session)
         
         return session
@@ -526,12 +562,20 @@ class EnhancedParkingService(AbstractService):
         
         Context: STAFF (verified)
         """
-        # Get due
-        due = await self.session.get(VehicleDue, due_id)
-        
-        if not due:
+        # Get due, with the staff access probe in the same query
+        row = (await self.session.execute(
+            select(
+                VehicleDue,
+                self.role_manager.can_collect_due_clause(
+                    user_id, VehicleDue.slot_owner_id
+                ).label("can_collect")
+            ).where(VehicleDue.id == due_id)
+        )).one_or_none()
+        
+        if not row:
             raise InvalidRequestException("Due not found")
         
+        due = row.VehicleDue
         if due.status != DueStatus.PENDING:
             raise InvalidRequestException(
                 f"Cannot collect: due status is {due.status.value}",
@@ -539,12 +583,7 @@ class EnhancedParkingService(AbstractService):
             )
         
         # Verify user can collect this due
-        can_collect = await self.role_manager.can_user_collect_due(
-            user_id=user_id,
-            due_owner_id=due.slot_owner_id
-        )
-        
-        if not can_collect:
+        if not row.can_collect:
             raise ForbiddenException(
                 "You don't have permission to collect payments for this parking slot owner"
             )
@@ -565,6 +604,7 @@ class EnhancedParkingService(AbstractService):
         due.payment_mode = payment_data.payment_mode
         due.notes = payment_data.notes or due.notes
         
+        await record_due_collected(self.session, due, payment_data.paid_amount)
         await self.session.commit()
         await self.session.refresh(due)
         
@@ -586,51 +626,40 @@ class EnhancedParkingService(AbstractService):
         
         Context: CUSTOMER (no authentication needed)
         """
-        # Use Haversine formula to calculate distance
-        # This is a simplified version - for production use PostGIS
-        
-        stmt = (
-            select(ParkingSlot)
-            .where(
-                ParkingSlot.status == SlotStatus.ACTIVE,
-                ParkingSlot.deleted_at.is_(None)
-            )
+        # Bounding-box prefilter on an index, exact distance,
+        # ordering and limit all in SQL (see parking/geo.py)
+        result = await self.session.execute(
+            nearby_slots_query(latitude, longitude, radius_km, limit)
         )
+        in_range = result.all()
         
-        result = await self.session.execute(stmt)
-        all_slots = result.scalars().all()
+        # Availability for all results in one grouped query
+        availability_by_slot = await get_bulk_availability(
+            self.session,
+            [slot for slot, _ in in_range]
+        )
         
-        # Calculate distances and filter
         nearby_slots = []
-        for slot in all_slots:
-            distance = self._calculate_distance(
-                latitude, longitude,
-                slot.latitude, slot.longitude
-            )
+        for slot, distance in in_range:
+            availability = availability_by_slot[slot.id]
             
-            if distance <= radius_km:
-                # Get availability
-                availability = await self._calculate_slot_availability(slot.id)
-                
-                nearby_slots.append({
-                    "id": slot.id,
-                    "name": slot.name,
-                    "description": slot.description,
-                    "location": slot.location,
-                    "latitude": slot.latitude,
-                    "longitude": slot.longitude,
-                    "distance_km": round(distance, 2),
-                    "capacity": slot.capacity,
-                    "pricing_model": slot.pricing_model,
-                    "pricing_config": slot.pricing_config,
-                    "payment_timing": slot.payment_timing,
-                    "availability": availability.available,
-                    "occupancy_percentage": availability.occupancy_percentage
-                })
-        
-        # Sort by distance and limit
-        nearby_slots.sort(key=lambda x: x["distance_km"])
-        return nearby_slots[:limit]
+            nearby_slots.append({
+                "id": slot.id,
+                "name": slot.name,
+                "description": slot.description,
+                "location": slot.location,
+                "latitude": slot.latitude,
+                "longitude": slot.longitude,
+                "distance_km": round(float(distance), 2),
+                "capacity": slot.capacity,
+                "pricing_model": slot.pricing_model,
+                "pricing_config": slot.pricing_config,
+                "payment_timing": slot.payment_timing,
+                "availability": availability.available,
+                "occupancy_percentage": availability.occupancy_percentage
+            })
+        
+        return nearby_slots
     
     # ===== HELPER METHODS =====
     
@@ -654,10 +683,6 @@ class EnhancedParkingService(AbstractService):
                     error_code="INCOMPLETE_PRICING_CONFIG"
                 )
     
-    def _normalize_vehicle_number(self, vehicle_number: str) -> str:
-        """Normalize vehicle number format"""
-        return re.sub(r"[^a-zA-Z0-9]", "", vehicle_number).upper()
-    
     async def _verify_capacity_available(
         self,
         slot: ParkingSlot,
@@ -673,13 +698,8 @@ class EnhancedParkingService(AbstractService):
             )
         
         # Get current occupancy
-        current_count = await self.session.scalar(
-            select(func.count(ParkingSession.id)).where(
-                ParkingSession.slot_id == slot.id,
-                ParkingSession.vehicle_type == vehicle_type.value,
-                ParkingSession.status == SessionStatus.CHECKED_IN
-            )
-        )
+        occupancy = await fetch_live_occupancy(self.session, [slot.id])
+        current_count = occupancy[slot.id].get(vehicle_type.value, 0)
         
         if current_count >= capacity:
             raise InvalidRequestException(
@@ -694,40 +714,11 @@ class EnhancedParkingService(AbstractService):
         check_in_time: datetime,
         check_out_time: datetime
     ) -> Decimal:
-        """Calculate parking fee based on slot's pricing model"""
-        
-        if slot.pricing_model == PricingModel.FREE:
-            return Decimal("0.00")
-        
-        vehicle_type_str = vehicle_type.value if isinstance(vehicle_type, ParkingVehicleType) else vehicle_type
-        config = slot.pricing_config or {}
-        
-        if slot.pricing_model == PricingModel.FIXED:
-            fee = config.get(vehicle_type_str, 0)
-            return Decimal(str(fee))
-        
-        if slot.pricing_model == PricingModel.HOURLY:
-            vehicle_config = config.get(vehicle_type_str, {})
-            if not vehicle_config:
-                return Decimal("0.00")
-            
-            base_fee = Decimal(str(vehicle_config.get('base', 0)))
-            base_hours = Decimal(str(vehicle_config.get('base_hours', 1)))
-            incremental_fee = Decimal(str(vehicle_config.get('incremental', 0)))
-            
-            duration = check_out_time - check_in_time
-            hours = Decimal(str(duration.total_seconds() / 3600))
-            
-            if hours <= base_hours:
-                return base_fee
-            
-            additional_hours = hours - base_hours
-            additional_hours_rounded = Decimal(str(math.ceil(float(additional_hours))))
-            
-            total_fee = base_fee + (additional_hours_rounded * incremental_fee)
-            return total_fee.quantize(Decimal("0.01"))
-        
-        return Decimal("0.00")
+        """
+        Calculate parking fee based on slot's pricing model.
+        Uses the slot's compiled tariff (see parking/pricing.py).
+        """
+        return get_tariff(slot).fee(vehicle_type, check_in_time, check_out_time)
     
     async def _check_vehicle_dues(
         self,
@@ -762,18 +753,9 @@ class EnhancedParkingService(AbstractService):
         self.session.add(due)
     
     async def _get_vehicle_owner_id(self, vehicle_number: str) -> Optional[UUID]:
-        """Get vehicle owner from vehicles table if exists"""
-        try:
-            from apps.api.vehicle.models import Vehicle
-            
-            stmt = select(Vehicle.user_id).where(
-                Vehicle.vehicle_number == vehicle_number,
-                Vehicle.deleted_at.is_(None)
-            )
-            result = await self.session.execute(stmt)
-            return result.scalar_one_or_none()
-        except ImportError:
-            return None
+        """Get vehicle owner if registered (cached, see vehicle/owners.py)"""
+        owner = await get_plate_owner(self.session, vehicle_number)
+        return owner.user_id if owner else None
     
     async def _calculate_slot_availability(
         self,
@@ -782,62 +764,10 @@ class EnhancedParkingService(AbstractService):
         """Calculate real-time slot availability"""
         slot = await self.session.get(ParkingSlot, slot_id)
         
-        # Get occupancy by vehicle type
-        result = await self.session.execute(
-            select(
-                ParkingSession.vehicle_type,
-                func.count(ParkingSession.id)
-            )
-            .where(
-                ParkingSession.slot_id == slot_id,
-                ParkingSession.status == SessionStatus.CHECKED_IN
-            )
-            .group_by(ParkingSession.vehicle_type)
-        )
-        
-        occupied = dict(result.all())
-        capacity = slot.capacity or {}
-        available = {}
-        total_capacity = 0
-        total_occupied = 0
-        
-        for vehicle_type, max_count in capacity.items():
-            current = occupied.get(vehicle_type, 0)
-            available[vehicle_type] = max_count - current
-            total_capacity += max_count
-            total_occupied += current
-        
-        occupancy_pct = (total_occupied / total_capacity * 100) if total_capacity > 0 else 0
+        occupancy = await fetch_live_occupancy(self.session, [slot_id])
         
-        return SlotAvailability(
-            slot_id=slot.id,
-            capacity=capacity,
-            occupied=occupied,
-            available=available,
-            occupancy_percentage=round(occupancy_pct, 2)
-        )
-    
-    def _calculate_distance(
-        self,
-        lat1: float, lon1: float,
-        lat2: float, lon2: float
-    ) -> float:
-        """Calculate distance between two points using Haversine formula"""
-        from math import radians, cos, sin, asin, sqrt
-        
-        # Convert to radians
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        
-        # Earth radius in kilometers
-        r = 6371
-        
-        return c * r
+        return build_slot_availability(slot, occupancy[slot_id])
+
 # At the bottom of service_enhanced.py
 
 from typing import Annotated
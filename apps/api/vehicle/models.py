@@ -9,13 +9,15 @@ from sqlalchemy import (
     ForeignKey,
     UUID,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 import sqlalchemy as sa
 import enum
 
+from apps.api.vehicle.plate import canonical_plate_sql
 from apps.storage import default_storage
 from avcfastapi.core.database.sqlalchamey.base import AbstractSQLModel
 from avcfastapi.core.database.sqlalchamey.mixins import SoftDeleteMixin, TimestampsMixin
+from avcfastapi.core.database.sqlalchamey.fields import TZAwareDateTime
 from avcfastapi.core.storage.sqlalchemy.fields.imagefield import ImageField
 
 
@@ -35,6 +37,26 @@ class SearchTermStatus(enum.Enum):
 # -------------------------
 class Vehicle(AbstractSQLModel, SoftDeleteMixin, TimestampsMixin):
     __tablename__ = "vehicles"
+    __table_args__ = (
+        # Substring search over search_text / brand (see vehicle/search.py)
+        sa.Index(
+            "ix_vehicles_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        sa.Index(
+            "ix_vehicles_brand_trgm",
+            "brand",
+            postgresql_using="gin",
+            postgresql_ops={"brand": "gin_trgm_ops"},
+        ),
+        # Plate lookups and joins from other modules (see vehicle/plate.py)
+        sa.Index(
+            "ix_vehicles_canonical_plate",
+            canonical_plate_sql(sa.literal_column("vehicle_number"))
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -43,6 +65,7 @@ class Vehicle(AbstractSQLModel, SoftDeleteMixin, TimestampsMixin):
         default=sa.text("gen_random_uuid()"),
     )
     vehicle_number = Column(String(20), unique=True, nullable=False)
+    canonical_plate = column_property(canonical_plate_sql(vehicle_number), deferred=True)
     name = Column(String(100), nullable=True)
     fuel_type = Column(String(50), nullable=True)
     vehicle_type = Column(String(30), nullable=True)
@@ -61,6 +84,17 @@ class Vehicle(AbstractSQLModel, SoftDeleteMixin, TimestampsMixin):
         nullable=True,
     )
     is_verified = Column(Boolean, default=False)
+    # Lowercased plate (compact and as entered), name and brand, maintained by Postgres
+    search_text = Column(
+        sa.Text,
+        sa.Computed(
+            "lower("
+            "regexp_replace(vehicle_number, '[^A-Za-z0-9]', '', 'g') || ' ' || vehicle_number"
+            " || ' ' || coalesce(name, '') || ' ' || coalesce(brand, '')"
+            ")",
+            persisted=True,
+        ),
+    )
 
     owner = relationship("User", back_populates="vehicles")
     reports = relationship("VehicleReport", back_populates="vehicle")
@@ -75,6 +109,12 @@ class Vehicle(AbstractSQLModel, SoftDeleteMixin, TimestampsMixin):
 
 class VehicleLocation(AbstractSQLModel, SoftDeleteMixin, TimestampsMixin):
     __tablename__ = "vehicle_locations"
+    __table_args__ = (
+        sa.Index(
+            "ix_vehicle_locations_canonical_plate",
+            canonical_plate_sql(sa.literal_column("vehicle_number"))
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -84,6 +124,7 @@ class VehicleLocation(AbstractSQLModel, SoftDeleteMixin, TimestampsMixin):
     )
     vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=True)
     vehicle_number = Column(String(20), nullable=True)
+    canonical_plate = column_property(canonical_plate_sql(vehicle_number), deferred=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     latitude = Column(Float(), nullable=False)
     longitude = Column(Float(), nullable=False)
@@ -112,6 +153,10 @@ class VehicleLocation(AbstractSQLModel, SoftDeleteMixin, TimestampsMixin):
 
 class VehicleSearchLog(AbstractSQLModel, TimestampsMixin):
     __tablename__ = "vehicle_search_logs"
+    __table_args__ = (
+        # Rollup compaction windows and cursor pagination
+        sa.Index("ix_vehicle_search_logs_created_at", "created_at", "id"),
+    )
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
@@ -128,3 +173,61 @@ class VehicleSearchLog(AbstractSQLModel, TimestampsMixin):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     user = relationship("User")
+
+
+# -------------------------
+# Search log rollups (see vehicle/search_rollups.py)
+# -------------------------
+class VehicleSearchHourlyRollup(AbstractSQLModel, TimestampsMixin):
+    """Searches per UTC hour and status"""
+    __tablename__ = "vehicle_search_hourly_rollups"
+
+    hour = Column(
+        TZAwareDateTime(timezone=True),
+        primary_key=True,
+        comment="Start of the UTC hour"
+    )
+    status = Column(String(50), primary_key=True)
+    searches = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class VehicleSearchPlateRollup(AbstractSQLModel, TimestampsMixin):
+    """Searches per UTC day and normalized search term"""
+    __tablename__ = "vehicle_search_plate_rollups"
+
+    day = Column(sa.Date, primary_key=True, comment="UTC day")
+    formatted_search_term = Column(String(100), primary_key=True)
+    searches = Column(Integer, nullable=False, default=0, server_default="0")
+    not_found = Column(Integer, nullable=False, default=0, server_default="0")
+    last_searched_at = Column(TZAwareDateTime(timezone=True), nullable=False)
+
+
+class VehicleSearchGeoRollup(AbstractSQLModel, TimestampsMixin):
+    """Searches per UTC day and latitude/longitude cell"""
+    __tablename__ = "vehicle_search_geo_rollups"
+
+    day = Column(sa.Date, primary_key=True, comment="UTC day")
+    lat_bucket = Column(
+        sa.Numeric(8, 4),
+        primary_key=True,
+        comment="South edge of the cell"
+    )
+    lng_bucket = Column(
+        sa.Numeric(8, 4),
+        primary_key=True,
+        comment="West edge of the cell"
+    )
+    searches = Column(Integer, nullable=False, default=0, server_default="0")
+    not_found = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class VehicleSearchRollupState(AbstractSQLModel):
+    """How far vehicle_search_logs has been compacted into the rollups"""
+    __tablename__ = "vehicle_search_rollup_state"
+
+    name = Column(String(50), primary_key=True)
+    compacted_until = Column(
+        TZAwareDateTime(timezone=True),
+        nullable=False,
+        comment="Search logs created before this are counted in the rollups"
+    )
@@ -0,0 +1,118 @@
+# apps/api/vehicle/owners.py
+
+"""
+Registered owner of a plate, cached per process.
+
+Parking check-in links a session to the owner of a registered vehicle.
+Most vehicles at a lot are repeat visitors, so canonical plate ->
+(vehicle_id, user_id) is kept in a bounded TTL + LRU cache. Unregistered
+plates are cached too ("negative" entries, with their own shorter TTL),
+since most walk-in plates never get registered.
+
+VehicleService drops a plate's entries after creating, updating or
+deleting a vehicle. That only reaches the current process; other workers
+pick the change up when their entry expires, so the TTLs bound
+staleness. Setting a TTL to 0 disables that half of the cache.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+from cachetools import TTLCache
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.vehicle.models import Vehicle
+from apps.api.vehicle.plate import normalize_plate
+from apps.settings import settings
+
+
+@dataclass(frozen=True)
+class PlateOwner:
+    vehicle_id: UUID
+    user_id: UUID
+
+
+_owner_cache: TTLCache = TTLCache(
+    maxsize=settings.VEHICLE_OWNER_CACHE_SIZE,
+    ttl=max(settings.VEHICLE_OWNER_CACHE_TTL, 0.001)
+)
+_unregistered_cache: TTLCache = TTLCache(
+    maxsize=settings.VEHICLE_OWNER_CACHE_SIZE,
+    ttl=max(settings.VEHICLE_OWNER_NEGATIVE_CACHE_TTL, 0.001)
+)
+# Bumped by every invalidation; a lookup that raced one doesn't store its result
+_generation = 0
+
+
+def invalidate_plates(*plates: Optional[str]) -> None:
+    """Forget the cached owner of these plates; call after the write has committed"""
+    global _generation
+    _generation += 1
+    for plate in plates:
+        plate = normalize_plate(plate)
+        _owner_cache.pop(plate, None)
+        _unregistered_cache.pop(plate, None)
+
+
+def clear_plate_owner_cache() -> None:
+    global _generation
+    _generation += 1
+    _owner_cache.clear()
+    _unregistered_cache.clear()
+
+
+async def get_plate_owners(
+    session: AsyncSession,
+    plates: Iterable[str]
+) -> Dict[str, PlateOwner]:
+    """
+    Owners of the registered plates among `plates`, keyed by canonical
+    plate. Plates not in the cache are read in one query.
+    """
+    owners: Dict[str, PlateOwner] = {}
+    missing = []
+    for plate in {normalize_plate(plate) for plate in plates}:
+        if not plate or plate in _unregistered_cache:
+            continue
+        owner = _owner_cache.get(plate)
+        if owner is not None:
+            owners[plate] = owner
+        else:
+            missing.append(plate)
+
+    if not missing:
+        return owners
+
+    generation = _generation
+    result = await session.execute(
+        select(Vehicle.canonical_plate, Vehicle.id, Vehicle.user_id)
+        .where(
+            Vehicle.canonical_plate.in_(missing),
+            Vehicle.deleted_at.is_(None)
+        )
+        # The earliest registration of a canonical plate owns it
+        .distinct(Vehicle.canonical_plate)
+        .order_by(Vehicle.canonical_plate, Vehicle.created_at)
+    )
+    loaded = {
+        plate: PlateOwner(vehicle_id=vehicle_id, user_id=user_id)
+        for plate, vehicle_id, user_id in result.all()
+    }
+    owners.update(loaded)
+
+    if generation == _generation:
+        if settings.VEHICLE_OWNER_CACHE_TTL > 0:
+            _owner_cache.update(loaded)
+        if settings.VEHICLE_OWNER_NEGATIVE_CACHE_TTL > 0:
+            for plate in missing:
+                if plate not in loaded:
+                    _unregistered_cache[plate] = True
+    return owners
+
+
+async def get_plate_owner(session: AsyncSession, plate: str) -> Optional[PlateOwner]:
+    """Owner of a registered plate, or None"""
+    owners = await get_plate_owners(session, [plate])
+    return owners.get(normalize_plate(plate))
@@ -0,0 +1,47 @@
+# apps/api/vehicle/plate.py
+
+"""
+Canonical vehicle plates.
+
+A plate is compared in its canonical form: ASCII letters and digits only,
+upper-cased ("kl-07 ab 1234" -> "KL07AB1234"). normalize_plate() computes
+it in Python; canonical_plate_sql() is the same rule in SQL. It backs the
+canonical_plate attribute of Vehicle, VehicleLocation, ParkingSession and
+VehicleDue, which is not stored: each table has an expression index on
+it (migration 3e5b8d1f7a20), and the pattern is inlined as literals so
+queries match the indexed expression exactly.
+
+Lookups and joins between those tables go through canonical_plate, so a
+plate stored as "KL 07 AB 1234" by an older client still matches one
+entered as "kl07ab1234". Parking writes plates already normalized, so
+its own hot paths keep using the vehicle_number composite indexes.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import String, func, literal_column
+
+
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]")
+
+
+def canonical_plate_sql(column):
+    """upper(regexp_replace(column, '[^A-Za-z0-9]', '', 'g'))"""
+    return func.upper(
+        func.regexp_replace(
+            column,
+            literal_column("'[^A-Za-z0-9]'"),
+            literal_column("''"),
+            literal_column("'g'")
+        ),
+        type_=String(20)
+    )
+
+
+def normalize_plate(value: Optional[str]) -> str:
+    """Canonical form of a plate as typed by a user"""
+    if not value:
+        return ""
+    return _NON_ALNUM.sub("", value).upper()
+
@@ -16,6 +16,7 @@ from apps.api.notification.service import NotificationServiceDependency
 from apps.api.user.schema import PrivacyPreference
 from apps.api.user.models import User
 from apps.api.vehicle.models import Vehicle
+from apps.api.vehicle.plate import normalize_plate
 from apps.api.vehicle.report.models import (
     VehicleReport,
     VehicleReportFlag,
@@ -57,9 +58,9 @@ class ReportService(AbstractService):
         Fetches a vehicle by its vehicle number.
         """
         query = select(Vehicle).where(
-            Vehicle.vehicle_number == vehicle_number,
+            Vehicle.canonical_plate == normalize_plate(vehicle_number),
             Vehicle.deleted_at.is_(None),
-        )
+        ).order_by(Vehicle.created_at)
         result = await self.session.execute(query)
         vehicle = result.scalars().first()
         if not vehicle:
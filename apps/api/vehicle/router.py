@@ -1,7 +1,7 @@
 # apps/vehicle/router.py
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, File, Request, UploadFile, Form
+from fastapi import APIRouter, File, Query, Request, UploadFile, Form
 from fastapi.responses import RedirectResponse
 
 from apps.api.auth.dependency import UserDependency
@@ -105,8 +105,8 @@ async def get_vehicle_endpoint(
     vehicle_service: VehicleServiceDependency,
     user: UserDependency,
     id: str,
-    latitude: Optional[float] = None,
-    longitude: Optional[float] = None,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
 ) -> VehicleDetailResponse:
     if is_valid_uuid(id):
         return await vehicle_service.get_vehicle(vehicle_id=id)
@@ -154,8 +154,8 @@ async def search_vehicles_endpoint(
     vehicle_service: VehicleServiceDependency,
     user: UserDependency,
     vehicle_number: str,
-    latitude: Optional[float] = None,
-    longitude: Optional[float] = None,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
     limit: int = 10,
     offset: int = 0,
 ) -> List[VehicleResponseMin]:
@@ -11,6 +11,7 @@ from apps.api.user.schema import UserPrivacyWrapper
 
 
 from apps.api.vehicle.report.schema import UserMin
+from apps.api.vehicle.plate import normalize_plate
 from avcfastapi.core.fastapi.response.models import CustomBaseModel
 
 vehicle_type_display_text = {
@@ -87,8 +88,7 @@ class VehicleType(Enum):
 class VehicleValidatorMixin:
     @field_validator("vehicle_number")
     def validate_vehicle_number(cls, v):
-        v = re.sub(r"[^a-zA-Z0-9]", "", v)
-        v = v.strip().upper()
+        v = normalize_plate(v)
 
         patterns = [
             # Standard private/commercial format
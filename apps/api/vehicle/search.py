@@ -0,0 +1,64 @@
+# apps/api/vehicle/search.py
+
+"""
+Free-text vehicle search.
+
+vehicles.search_text is a stored generated column with the lowercased
+plate (with separators stripped and as entered), name and brand, so
+Postgres keeps it current on every insert and update. The pg_trgm GIN
+index ix_vehicles_search_text_trgm answers `search_text LIKE '%word%'`
+for words of three or more characters, so partial plates ("4521"),
+names and brands are found without a sequential scan of vehicles.
+
+Every word of the term must match. Results are ranked by
+word_similarity of the whole term to search_text, so an exact plate or
+a whole-word match comes before a fragment.
+"""
+
+import re
+from typing import List
+
+from sqlalchemy import and_, func
+
+from apps.api.vehicle.models import Vehicle
+
+
+LIKE_ESCAPE = "\\"
+
+
+def search_words(term: str) -> List[str]:
+    """Lowercased words of a search term"""
+    return term.lower().split()
+
+
+def contains_pattern(word: str) -> str:
+    """LIKE pattern matching `word` anywhere, with wildcards in it escaped"""
+    escaped = re.sub(r"([\\%_])", r"\\\1", word)
+    return f"%{escaped}%"
+
+
+def search_condition(term: str):
+    """All words of the term occur in search_text; None for a blank term"""
+    words = search_words(term)
+    if not words:
+        return None
+    return and_(*[
+        Vehicle.search_text.like(contains_pattern(word), escape=LIKE_ESCAPE)
+        for word in words
+    ])
+
+
+def search_rank(term: str):
+    """Higher is better; 1 for an exact word (e.g. the whole plate)"""
+    return func.word_similarity(" ".join(search_words(term)), Vehicle.search_text)
+
+
+def apply_search(query, term: str):
+    """Filter a Vehicle query to the term and order it best match first"""
+    condition = search_condition(term)
+    if condition is None:
+        return query
+    return query.where(condition).order_by(
+        search_rank(term).desc(),
+        Vehicle.vehicle_number
+    )
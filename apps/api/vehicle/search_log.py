@@ -0,0 +1,214 @@
+# apps/api/vehicle/search_log.py
+
+"""
+Write-behind buffer for vehicle_search_logs.
+
+Every plate search writes an audit row. Instead of an INSERT and COMMIT
+inside the request, VehicleService.log_search_term() puts the row on a
+bounded in-process queue and returns. A background task writes the
+queue in multi-row INSERTs of up to SEARCH_LOG_BATCH_SIZE rows, at least
+every SEARCH_LOG_FLUSH_INTERVAL_MS while rows are waiting.
+
+Backpressure: when the queue is full, a search waits up to
+SEARCH_LOG_ENQUEUE_TIMEOUT seconds for space, then its row is dropped.
+If a batch fails to write, its rows are retried one at a time, so only
+the rows that fail on their own are lost. Dropped and failed rows are
+counted (see get_stats(), exposed at /admin/search-logs/buffer). close() stops taking
+rows and writes what is queued, within one timeout; it runs at
+application shutdown. Rows it could not write in time, including the
+batch being written, are counted as dropped. Rows still queued when a
+worker is killed are lost.
+
+The row's created_at is taken when the search happens, not when it is
+written.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import insert
+
+from apps.api.vehicle.models import VehicleSearchLog
+from apps.settings import settings
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+# Queued after the last row by close(); the writer exits when it reaches it
+_CLOSE = object()
+
+
+@dataclass
+class SearchLogStats:
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    failed: int = 0
+    batches: int = 0
+
+    @property
+    def lost(self) -> int:
+        return self.dropped + self.failed
+
+
+class SearchLogBuffer:
+    """Bounded queue of search log rows and the task that writes them"""
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        enqueue_timeout: float
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.stats = SearchLogStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        # Rows taken off the queue and not yet written or counted as failed
+        self._in_flight: List = []
+        self._closing = False
+
+    def _ensure_writer(self) -> None:
+        # Created on first use, inside the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._run())
+
+    async def enqueue(self, row: dict) -> bool:
+        """
+        Queue one row (column values of VehicleSearchLog). Returns False if
+        the row was dropped because the queue stayed full or is closed.
+        """
+        if self._closing:
+            self.stats.dropped += 1
+            return False
+
+        self._ensure_writer()
+        row.setdefault("created_at", datetime.now(timezone.utc))
+        row.setdefault("updated_at", row["created_at"])
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(row), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.stats.dropped += 1
+                return False
+
+        self.stats.enqueued += 1
+        return True
+
+    async def _next_batch(self) -> List:
+        """Wait for a row, then collect more until the batch is full or the interval ends"""
+        loop = asyncio.get_running_loop()
+        self._in_flight = batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size and batch[-1] is not _CLOSE:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, rows: List[dict]) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(insert(VehicleSearchLog), rows)
+                await session.commit()
+        except Exception:
+            if len(rows) == 1:
+                self.stats.failed += 1
+                logger.exception("Could not write a vehicle search log row")
+                return
+            logger.warning(
+                "Could not write a batch of %d vehicle search log rows; retrying one by one",
+                len(rows),
+                exc_info=True
+            )
+            for row in list(rows):
+                await self._write([row])
+                # Written or counted as failed; not lost if close() cancels
+                self._in_flight.remove(row)
+            return
+
+        self.stats.written += len(rows)
+        self.stats.batches += 1
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            closing = batch[-1] is _CLOSE
+            rows = batch[:-1] if closing else batch
+            if rows:
+                await self._write(rows)
+            self._in_flight = []
+            if closing:
+                return
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """Stop taking rows and write the queued ones (up to `timeout` seconds in all)"""
+        self._closing = True
+        if self._writer is None or self._writer.done():
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(deadline - loop.time(), 0)
+
+        try:
+            await asyncio.wait_for(self._queue.put(_CLOSE), remaining())
+            await asyncio.wait_for(asyncio.shield(self._writer), remaining())
+        except asyncio.TimeoutError:
+            # Cancelling interrupts the batch being written, if any; nothing
+            # else runs before the rows are counted
+            self._writer.cancel()
+            unwritten = sum(1 for row in self._in_flight if row is not _CLOSE)
+            self._in_flight = []
+            while not self._queue.empty():
+                if self._queue.get_nowait() is not _CLOSE:
+                    unwritten += 1
+            self.stats.dropped += unwritten
+            logger.warning("Vehicle search log buffer closed with %d rows unwritten", unwritten)
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": settings.SEARCH_LOG_BUFFERED,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "lost": self.stats.lost,
+            **asdict(self.stats)
+        }
+
+
+search_log_buffer = SearchLogBuffer(
+    max_size=settings.SEARCH_LOG_QUEUE_SIZE,
+    batch_size=settings.SEARCH_LOG_BATCH_SIZE,
+    flush_interval=settings.SEARCH_LOG_FLUSH_INTERVAL_MS / 1000,
+    enqueue_timeout=settings.SEARCH_LOG_ENQUEUE_TIMEOUT
+)
+
+
+async def close_search_log_buffer() -> None:
+    """Application shutdown hook"""
+    await search_log_buffer.close(settings.SEARCH_LOG_SHUTDOWN_TIMEOUT)
@@ -0,0 +1,258 @@
+# apps/api/vehicle/search_rollups.py
+
+"""
+Rollups of vehicle_search_logs for admin dashboards.
+
+- vehicle_search_hourly_rollups: searches per UTC hour and status
+- vehicle_search_plate_rollups: searches and not-found searches per UTC
+  day and formatted search term (top searched plates)
+- vehicle_search_geo_rollups: searches per UTC day and GEO_BUCKET_DEGREES
+  latitude/longitude cell
+
+A compactor folds raw logs into the rollups, one window at a time: each
+window's logs are counted with INSERT ... SELECT ... ON CONFLICT (add),
+and vehicle_search_rollup_state.compacted_until moves to the window's
+end in the same transaction. The state row is locked with SKIP LOCKED,
+so with several workers only one compacts at a time. Logs newer than
+SEARCH_LOG_ROLLUP_LAG seconds are left for the next run. This gives
+search_log_buffer (and slow transactions) time to write rows stamped
+with an earlier created_at. A row that is written later than that is
+not counted until rebuild_search_rollups() recomputes its day.
+
+The compactor runs in the background every SEARCH_LOG_ROLLUP_INTERVAL
+seconds, and via the rebuild_search_log_rollups script.
+"""
+
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import select, delete, func, cast, Date, Numeric
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.vehicle.models import (
+    SearchTermStatus,
+    VehicleSearchLog,
+    VehicleSearchHourlyRollup,
+    VehicleSearchPlateRollup,
+    VehicleSearchGeoRollup,
+    VehicleSearchRollupState,
+)
+from apps.settings import settings
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "vehicle_search_logs"
+
+# Cell size of the geographic buckets, about 1.1 km of latitude
+GEO_BUCKET_DEGREES = Decimal("0.01")
+
+_compactor: Optional[asyncio.Task] = None
+
+
+def hour_bucket(at: datetime) -> datetime:
+    """Start of the UTC hour containing `at`"""
+    return at.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def hour_of(column):
+    """Start of the UTC hour of a timestamptz column"""
+    return func.timezone("UTC", func.date_trunc("hour", func.timezone("UTC", column)))
+
+
+def day_of(column):
+    """UTC day of a timestamptz column"""
+    return cast(func.timezone("UTC", column), Date)
+
+
+def utc_day(at: datetime) -> date:
+    return at.astimezone(timezone.utc).date()
+
+
+def geo_bucket(column):
+    """South/west edge of the GEO_BUCKET_DEGREES cell containing a coordinate"""
+    return func.floor(cast(column, Numeric) / GEO_BUCKET_DEGREES) * GEO_BUCKET_DEGREES
+
+
+def _added(table, stmt, *measures):
+    return {
+        **{measure: getattr(table, measure) + getattr(stmt.excluded, measure) for measure in measures},
+        "updated_at": func.now()
+    }
+
+
+async def _add_window(session: AsyncSession, since: Optional[datetime], until: datetime) -> None:
+    """Add the logs created in [since, until) to the rollups"""
+    in_window = [VehicleSearchLog.created_at < until]
+    if since is not None:
+        in_window.append(VehicleSearchLog.created_at >= since)
+    not_found = func.count().filter(
+        VehicleSearchLog.status == SearchTermStatus.NOT_FOUND.value
+    )
+
+    hour = hour_of(VehicleSearchLog.created_at)
+    hourly = insert(VehicleSearchHourlyRollup).from_select(
+        ["hour", "status", "searches"],
+        select(hour, VehicleSearchLog.status, func.count())
+        .where(*in_window)
+        .group_by(hour, VehicleSearchLog.status)
+    )
+    await session.execute(
+        hourly.on_conflict_do_update(
+            index_elements=[VehicleSearchHourlyRollup.hour, VehicleSearchHourlyRollup.status],
+            set_=_added(VehicleSearchHourlyRollup, hourly, "searches")
+        )
+    )
+
+    day = day_of(VehicleSearchLog.created_at)
+    plates = insert(VehicleSearchPlateRollup).from_select(
+        ["day", "formatted_search_term", "searches", "not_found", "last_searched_at"],
+        select(
+            day,
+            VehicleSearchLog.formatted_search_term,
+            func.count(),
+            not_found,
+            func.max(VehicleSearchLog.created_at)
+        )
+        .where(*in_window, VehicleSearchLog.formatted_search_term != "")
+        .group_by(day, VehicleSearchLog.formatted_search_term)
+    )
+    await session.execute(
+        plates.on_conflict_do_update(
+            index_elements=[
+                VehicleSearchPlateRollup.day,
+                VehicleSearchPlateRollup.formatted_search_term
+            ],
+            set_={
+                **_added(VehicleSearchPlateRollup, plates, "searches", "not_found"),
+                "last_searched_at": func.greatest(
+                    VehicleSearchPlateRollup.last_searched_at,
+                    plates.excluded.last_searched_at
+                )
+            }
+        )
+    )
+
+    lat_bucket = geo_bucket(VehicleSearchLog.latitude)
+    lng_bucket = geo_bucket(VehicleSearchLog.longitude)
+    geo = insert(VehicleSearchGeoRollup).from_select(
+        ["day", "lat_bucket", "lng_bucket", "searches", "not_found"],
+        select(day, lat_bucket, lng_bucket, func.count(), not_found)
+        .where(
+            *in_window,
+            # Rows logged before the router validated coordinates would
+            # overflow the bucket columns and stall every rollup
+            VehicleSearchLog.latitude.between(-90, 90),
+            VehicleSearchLog.longitude.between(-180, 180)
+        )
+        .group_by(day, lat_bucket, lng_bucket)
+    )
+    await session.execute(
+        geo.on_conflict_do_update(
+            index_elements=[
+                VehicleSearchGeoRollup.day,
+                VehicleSearchGeoRollup.lat_bucket,
+                VehicleSearchGeoRollup.lng_bucket
+            ],
+            set_=_added(VehicleSearchGeoRollup, geo, "searches", "not_found")
+        )
+    )
+
+
+async def _lock_state(session: AsyncSession, skip_locked: bool) -> Optional[VehicleSearchRollupState]:
+    return await session.scalar(
+        select(VehicleSearchRollupState)
+        .where(VehicleSearchRollupState.name == STATE_NAME)
+        .with_for_update(skip_locked=skip_locked)
+    )
+
+
+async def compact_search_logs() -> int:
+    """
+    Fold logs up to SEARCH_LOG_ROLLUP_LAG seconds ago into the rollups, in
+    windows of at most SEARCH_LOG_ROLLUP_MAX_WINDOW_HOURS, each in its own
+    transaction. Returns the number of windows compacted; 0 if there was
+    nothing to do or another worker holds the state row.
+    """
+    windows = 0
+    max_window = timedelta(hours=settings.SEARCH_LOG_ROLLUP_MAX_WINDOW_HOURS)
+
+    while True:
+        async with AsyncSessionLocal() as session:
+            state = await _lock_state(session, skip_locked=True)
+            if state is None:
+                return windows
+
+            horizon = datetime.now(timezone.utc) - timedelta(seconds=settings.SEARCH_LOG_ROLLUP_LAG)
+            until = min(horizon, state.compacted_until + max_window)
+            if until <= state.compacted_until:
+                return windows
+
+            await _add_window(session, state.compacted_until, until)
+            state.compacted_until = until
+            await session.commit()
+            windows += 1
+
+
+async def rebuild_search_rollups(session: AsyncSession, since: Optional[datetime] = None) -> datetime:
+    """
+    Recompute the rollups from the start of the UTC day of `since` (default:
+    all time) up to the compaction watermark. Returns the watermark. Caller
+    commits; the state row stays locked until then, so the compactor waits.
+    """
+    state = await _lock_state(session, skip_locked=False)
+    until = state.compacted_until
+
+    if since is not None:
+        since = datetime.combine(utc_day(since), time.min, tzinfo=timezone.utc)
+        await session.execute(
+            delete(VehicleSearchHourlyRollup).where(VehicleSearchHourlyRollup.hour >= since)
+        )
+        await session.execute(
+            delete(VehicleSearchPlateRollup).where(VehicleSearchPlateRollup.day >= since.date())
+        )
+        await session.execute(
+            delete(VehicleSearchGeoRollup).where(VehicleSearchGeoRollup.day >= since.date())
+        )
+    else:
+        for model in (VehicleSearchHourlyRollup, VehicleSearchPlateRollup, VehicleSearchGeoRollup):
+            await session.execute(delete(model))
+
+    if since is None or since < until:
+        await _add_window(session, since, until)
+    return until
+
+
+async def _run_compactor() -> None:
+    while True:
+        try:
+            await compact_search_logs()
+        except Exception:
+            logger.exception("Vehicle search log compaction failed")
+        await asyncio.sleep(settings.SEARCH_LOG_ROLLUP_INTERVAL)
+
+
+def start_search_log_compactor() -> None:
+    """Application startup hook; SEARCH_LOG_ROLLUP_INTERVAL=0 leaves it to the script"""
+    global _compactor
+    if settings.SEARCH_LOG_ROLLUP_INTERVAL <= 0:
+        return
+    if _compactor is None or _compactor.done():
+        _compactor = asyncio.create_task(_run_compactor())
+
+
+async def stop_search_log_compactor() -> None:
+    """Application shutdown hook"""
+    global _compactor
+    if _compactor is None:
+        return
+    _compactor.cancel()
+    with suppress(asyncio.CancelledError):
+        await _compactor
+    _compactor = None
@@ -1,5 +1,4 @@
 # apps/vehicle/service.py
-import re
 from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from typing import Annotated, Literal, Optional, List
@@ -14,6 +13,11 @@ from apps.api.vehicle.models import (
     VehicleLocationVisibility,
     VehicleSearchLog,
 )
+from apps.api.vehicle.owners import invalidate_plates
+from apps.api.vehicle.plate import normalize_plate
+from apps.api.vehicle.search import LIKE_ESCAPE, apply_search, contains_pattern
+from apps.api.vehicle.search_log import search_log_buffer
+from apps.settings import settings
 from avcfastapi.core.database.sqlalchamey.core import SessionDep
 from avcfastapi.core.exception.authentication import ForbiddenException
 from avcfastapi.core.exception.request import InvalidRequestException
@@ -60,7 +64,7 @@ class VehicleService(AbstractService):
             IntegrityError: If vehicle_number already exists or user_id is invalid
         """
         try:
-            vehicle_number = re.sub(r"[^a-zA-Z0-9]", "", vehicle_number).upper()
+            vehicle_number = normalize_plate(vehicle_number)
             vehicle = Vehicle(
                 vehicle_number=vehicle_number,
                 name=name,
@@ -82,6 +86,7 @@ class VehicleService(AbstractService):
 
             self.session.add(vehicle)
             await self.session.commit()
+            invalidate_plates(vehicle_number)
             await self.session.refresh(vehicle)
             return vehicle
 
@@ -114,8 +119,7 @@ class VehicleService(AbstractService):
             query = query.where(Vehicle.user_id == user_id)
 
         if vehicle_number is not None:
-            vehicle_number = re.sub(r"[^a-zA-Z0-9]", "", vehicle_number).upper()
-            query = query.where(Vehicle.vehicle_number.ilike(vehicle_number))
+            query = query.where(Vehicle.canonical_plate == normalize_plate(vehicle_number))
 
         if vehicle_id is not None:
             query = query.where(Vehicle.id == vehicle_id)
@@ -141,18 +145,31 @@ class VehicleService(AbstractService):
         ip_address: str | None = None,
         result_count: int | None = None,
     ) -> None:
-        formatted_search_term = re.sub(r"[^a-zA-Z0-9]", "", search_term).upper()
-        log_entry = VehicleSearchLog(
+        """
+        Record a plate search. Buffered and written in batches by
+        search_log_buffer (see vehicle/search_log.py) unless
+        SEARCH_LOG_BUFFERED is off.
+        """
+        # Raw request input; cut to the column sizes so a long value can't
+        # fail the batch it is written with
+        search_term = search_term[:VehicleSearchLog.search_term.type.length]
+        if ip_address:
+            ip_address = ip_address[:VehicleSearchLog.ip_address.type.length]
+        row = dict(
             user_id=user_id,
             search_term=search_term,
-            formatted_search_term=formatted_search_term,
+            formatted_search_term=normalize_plate(search_term),
             latitude=latitude,
             longitude=longitude,
             ip_address=ip_address,
             status=status,
             result_count=result_count,
         )
-        self.session.add(log_entry)
+        if settings.SEARCH_LOG_BUFFERED:
+            await search_log_buffer.enqueue(row)
+            return
+
+        self.session.add(VehicleSearchLog(**row))
         await self.session.commit()
 
     async def search_vehicle_number(
@@ -164,10 +181,8 @@ class VehicleService(AbstractService):
         """
         Search for a vehicle by its number.
         """
-        vehicle_number = re.sub(r"[^a-zA-Z0-9]", "", vehicle_number).upper()
-
         query = select(Vehicle).where(
-            Vehicle.vehicle_number == vehicle_number,
+            Vehicle.canonical_plate == normalize_plate(vehicle_number),
             Vehicle.deleted_at.is_(None),
         )
         if offset is not None:
@@ -196,8 +211,9 @@ class VehicleService(AbstractService):
             session: AsyncSession database connection
             user_id: Filter by owner user ID
             vehicle_type: Filter by vehicle type
-            brand: Filter by brand
+            brand: Filter by brand (substring, case-insensitive)
             is_verified: Filter by verification status
+            search_term: Words to find in plate, name or brand (ranked)
             limit: Maximum number of records to return
             offset: Number of records to skip
 
@@ -217,15 +233,12 @@ class VehicleService(AbstractService):
             query = query.where(Vehicle.fuel_type == fuel_type)
 
         if brand:
-            query = query.where(Vehicle.brand.ilike(f"%{brand}%"))
+            # Backed by the trigram index ix_vehicles_brand_trgm
+            query = query.where(Vehicle.brand.ilike(contains_pattern(brand), escape=LIKE_ESCAPE))
 
         if search_term:
-            search_term = f"%{search_term}%"
-            query = query.where(
-                (Vehicle.vehicle_number.ilike(search_term))
-                | (Vehicle.name.ilike(search_term))
-                | (Vehicle.brand.ilike(search_term))
-            )
+            # Trigram-indexed search_text, best match first (see vehicle/search.py)
+            query = apply_search(query, search_term)
 
         if is_verified is not None:
             query = query.where(Vehicle.is_verified == is_verified)
@@ -285,7 +298,8 @@ class VehicleService(AbstractService):
                     "You do not have permission to update this vehicle."
                 )
 
-            vehicle_number = re.sub(r"[^a-zA-Z0-9]", "", vehicle_number).upper()
+            vehicle_number = normalize_plate(vehicle_number)
+            previous_vehicle_number = existing_vehicle.vehicle_number
 
             # Prepare update data
             update_data = {
@@ -310,6 +324,7 @@ class VehicleService(AbstractService):
 
             await self.session.execute(stmt)
             await self.session.commit()
+            invalidate_plates(previous_vehicle_number, vehicle_number)
 
             # Refresh and return the updated vehicle
             await self.session.refresh(existing_vehicle)
@@ -341,8 +356,10 @@ class VehicleService(AbstractService):
         if existing_vehicle.user_id != user_id:
             raise ForbiddenException("Not authorized to perform this action")
 
+        vehicle_number = existing_vehicle.vehicle_number
         existing_vehicle.soft_delete()
         await self.session.commit()
+        invalidate_plates(vehicle_number)
         return True
 
     async def save_vehicle_location(
@@ -376,13 +393,13 @@ class VehicleService(AbstractService):
                 Vehicle.deleted_at.is_(None),
             )
         else:
-            vehicle_number = re.sub(r"[^a-zA-Z0-9]", "", vehicle_number).upper()
+            vehicle_number = normalize_plate(vehicle_number)
             query = select(Vehicle).where(
                 and_(
-                    Vehicle.vehicle_number.ilike(vehicle_number),
+                    Vehicle.canonical_plate == vehicle_number,
                     Vehicle.deleted_at.is_(None),
                 )
-            )
+            ).order_by(Vehicle.created_at)
         vehicle = (await self.session.execute(query)).scalar()
 
         if len(vehicle_number) > 20 and not vehicle:
@@ -489,7 +506,18 @@ class VehicleService(AbstractService):
         # if owner_id:
         #     query = query.join(Vehicle).where(Vehicle.user_id == owner_id)
         if vehicle_id:
-            query = query.where(VehicleLocation.vehicle_id == vehicle_id)
+            # Also pins saved by plate before the vehicle was registered
+            vehicle_plate = (
+                select(Vehicle.canonical_plate)
+                .where(Vehicle.id == vehicle_id)
+                .scalar_subquery()
+            )
+            query = query.where(
+                or_(
+                    VehicleLocation.vehicle_id == vehicle_id,
+                    VehicleLocation.canonical_plate == vehicle_plate,
+                )
+            )
 
         if visibility:
             query = query.where(VehicleLocation.visibility == visibility)
@@ -0,0 +1,228 @@
+# apps/pagination.py
+
+"""
+Opt-in keyset (cursor) pagination for list endpoints.
+
+OFFSET pagination makes Postgres read and throw away every skipped row, so
+deep pages of large tables get slower the further the client scrolls, and
+each page also pays for a count(*). In cursor mode a page is "the next
+`limit` rows after the last (sort key, id) seen", which an index on the
+sort key answers directly, and no count is run.
+
+Endpoints take CursorParams next to PaginationParams. A client opts in with
+?page_mode=cursor (or by sending a cursor); the token for the next page is
+returned in the X-Next-Cursor response header, so the paginated_response
+body is unchanged. The header is absent on the last page. Tokens are opaque
+to clients: urlsafe base64 of the last row's sort value and id.
+
+Offset listings that report a total take a CountStrategy (?count=):
+exact runs count(*) but serves repeats of the same filter set from a short
+TTL cache, estimated reads the planner's row estimate from EXPLAIN (which
+is pg_class.reltuples scaled by the filters' selectivity), and none skips
+the count. The total is returned in the X-Total-Count header.
+"""
+
+import base64
+import binascii
+import enum
+import json
+from datetime import datetime
+from typing import Annotated, Any, Callable, List, Optional, Tuple
+from uuid import UUID
+
+from cachetools import TTLCache
+from fastapi import Depends, Query, Response
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from apps.settings import settings
+from avcfastapi.core.exception.request import InvalidRequestException
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+class PageMode(str, enum.Enum):
+    OFFSET = "offset"
+    CURSOR = "cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    payload = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidRequestException("Invalid pagination cursor", error_code="INVALID_CURSOR")
+
+
+class CursorPagination:
+    """
+    Keyset pagination state for one request.
+
+    Services call apply() on the filtered query instead of offset/limit and
+    page() on the fetched rows; page() records next_cursor, which the router
+    exposes with set_header().
+    """
+
+    def __init__(
+        self,
+        page_mode: PageMode = Query(
+            PageMode.OFFSET,
+            description="offset (default) or cursor; cursor mode skips the total count"
+        ),
+        cursor: Optional[str] = Query(
+            None,
+            description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page"
+        ),
+    ):
+        self.enabled = page_mode == PageMode.CURSOR or bool(cursor)
+        self.after = decode_cursor(cursor) if cursor else None
+        self.limit = 0
+        self.next_cursor: Optional[str] = None
+        self._sort_attrs: Tuple[str, str] = ("created_at", "id")
+
+    def apply(self, query, sort_column, id_column, limit: int):
+        """
+        Restrict the query to rows after the cursor, newest first.
+        Fetches one extra row so page() can tell whether another page exists.
+        """
+        self.limit = limit
+        self._sort_attrs = (sort_column.key, id_column.key)
+
+        if self.after is not None:
+            query = query.where(tuple_(sort_column, id_column) < tuple_(*self.after))
+
+        return (
+            query
+            .order_by(None)
+            .order_by(sort_column.desc(), id_column.desc())
+            .limit(limit + 1)
+        )
+
+    def page(self, rows: List[Any], key: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+        """
+        Trim the extra row and remember the cursor for the next page.
+        `key` maps a row to the ORM object carrying the sort columns when
+        rows aren't plain objects (e.g. (User, count) tuples).
+        """
+        rows = list(rows)
+        if len(rows) <= self.limit:
+            self.next_cursor = None
+            return rows
+
+        rows = rows[:self.limit]
+        last = key(rows[-1]) if key else rows[-1]
+        sort_attr, id_attr = self._sort_attrs
+        self.next_cursor = encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+        return rows
+
+    def set_header(self, response: Response) -> None:
+        if self.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+
+
+CursorParams = Annotated[CursorPagination, Depends()]
+
+
+# ===== Counts =====
+
+class CountStrategy(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+CountParam = Annotated[
+    CountStrategy,
+    Query(
+        alias="count",
+        description="Total count: exact (cached briefly), estimated (planner estimate) or none"
+    ),
+]
+
+_count_cache: TTLCache = TTLCache(
+    maxsize=settings.PAGINATION_COUNT_CACHE_SIZE,
+    ttl=max(settings.PAGINATION_COUNT_CACHE_TTL, 0.001)
+)
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def explain(session: AsyncSession, statement) -> dict:
+    """The planner's top plan node for `statement`, without running it"""
+    plan = (await session.execute(Explain(statement))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def walk_plan(plan: dict):
+    """A plan node and all of its descendants"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk_plan(child)
+
+
+def _count_cache_key(query) -> str:
+    """The filter set, i.e. the compiled SQL plus its bound parameters"""
+    compiled = query.compile(dialect=postgresql.dialect())
+    return f"{compiled}|{sorted(compiled.params.items())!r}"
+
+
+async def estimate_rows(session: AsyncSession, query) -> int:
+    """Planner row estimate for the query, without running it"""
+    plan = await explain(session, query.order_by(None))
+    return int(plan["Plan Rows"])
+
+
+async def count_rows(
+    session: AsyncSession,
+    query,
+    strategy: CountStrategy = CountStrategy.EXACT
+) -> Optional[int]:
+    """Total rows `query` would return, according to `strategy`"""
+    if strategy == CountStrategy.NONE:
+        return None
+
+    if strategy == CountStrategy.ESTIMATED:
+        return await estimate_rows(session, query)
+
+    use_cache = settings.PAGINATION_COUNT_CACHE_TTL > 0
+    if use_cache:
+        key = _count_cache_key(query)
+        total = _count_cache.get(key)
+        if total is not None:
+            return total
+
+    total = await session.scalar(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    )
+    if use_cache:
+        _count_cache[key] = total
+    return total
+
+
+def set_total_header(response: Response, total: Optional[int]) -> None:
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
@@ -15,6 +15,54 @@ class AppConfig(BaseSettings):
 
     STORAGE_URL_PREFIX: str
 
+    # Seconds a slot's availability may be served from cache (0 disables)
+    PARKING_AVAILABILITY_CACHE_TTL: float = 5.0
+    PARKING_AVAILABILITY_CACHE_SIZE: int = 10000
+
+    # Seconds an exact listing count is reused for the same filters (0 disables)
+    PAGINATION_COUNT_CACHE_TTL: float = 30.0
+    PAGINATION_COUNT_CACHE_SIZE: int = 2048
+
+    # Seconds a user's slot roles may be reused across requests (0 = per request only)
+    PARKING_ROLE_CACHE_TTL: float = 0.0
+    PARKING_ROLE_CACHE_SIZE: int = 10000
+
+    # Seconds a plate's registered owner may be reused at check-in (0 disables)
+    VEHICLE_OWNER_CACHE_TTL: float = 300.0
+    # Seconds an unregistered plate is remembered as unregistered (0 disables)
+    VEHICLE_OWNER_NEGATIVE_CACHE_TTL: float = 30.0
+    VEHICLE_OWNER_CACHE_SIZE: int = 50000
+
+    # Vehicle search logs are queued and written in batches (False = insert inline)
+    SEARCH_LOG_BUFFERED: bool = True
+    SEARCH_LOG_QUEUE_SIZE: int = 10000
+    SEARCH_LOG_BATCH_SIZE: int = 500
+    SEARCH_LOG_FLUSH_INTERVAL_MS: int = 1000
+    # Seconds a search waits for queue space before its log row is dropped
+    SEARCH_LOG_ENQUEUE_TIMEOUT: float = 0.05
+    # Seconds shutdown waits for queued search logs to be written
+    SEARCH_LOG_SHUTDOWN_TIMEOUT: float = 10.0
+    # Seconds between search log rollup compactions (0 = only via the rebuild script)
+    SEARCH_LOG_ROLLUP_INTERVAL: float = 300.0
+    # Search logs younger than this many seconds are left for the next compaction
+    SEARCH_LOG_ROLLUP_LAG: float = 120.0
+    # Hours of search logs compacted per transaction while catching up
+    SEARCH_LOG_ROLLUP_MAX_WINDOW_HOURS: int = 24
+
+    # Monthly parking_sessions partitions kept created ahead of the current month
+    PARKING_PARTITION_MONTHS_AHEAD: int = 3
+    # Seconds between background partition top-ups (0 = only at startup and via the script)
+    PARKING_PARTITION_ENSURE_INTERVAL: float = 21600.0
+    # Partitions older than this many months may be archived
+    PARKING_PARTITION_RETENTION_MONTHS: int = 24
+    PARKING_ARCHIVE_DIR: str = "archive/parking_sessions"
+
+    # Seconds admin dashboard statistics are reused for the same date range (0 disables)
+    STATISTICS_CACHE_TTL: float = 60.0
+    STATISTICS_CACHE_SIZE: int = 256
+    # Run independent statistics statements in parallel on separate pooled connections
+    STATISTICS_CONCURRENT: bool = True
+
     @property
     def cors_origins(self) -> list[str]:
         if isinstance(self.CORS_ORIGINS, str):
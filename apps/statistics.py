@@ -0,0 +1,94 @@
+# apps/statistics.py
+
+"""
+Consolidated headline statistics for admin dashboards.
+
+Dashboard KPIs used to be one COUNT/SUM round trip each. Here the KPIs of
+a table family are computed by one statement: a CTE per table that
+computes all of that table's aggregates in a single scan (FILTER clauses
+instead of separate WHEREs), cross joined into one row.
+
+Independent families run concurrently, each on its own pooled connection
+(an AsyncSession can't run two statements at once), and the combined
+result is cached per parameter set for STATISTICS_CACHE_TTL seconds.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from cachetools import TTLCache
+from sqlalchemy import select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.settings import settings
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+_stats_cache: TTLCache = TTLCache(
+    maxsize=settings.STATISTICS_CACHE_SIZE,
+    ttl=max(settings.STATISTICS_CACHE_TTL, 0.001)
+)
+
+
+def combine_ctes(*ctes):
+    """
+    One-row SELECT of every column of the given single-row CTEs,
+    e.g. combine_ctes(user_stats, vehicle_stats).
+    """
+    first, *rest = ctes
+    statement = select(*[column for cte in ctes for column in cte.c]).select_from(first)
+    for cte in rest:
+        statement = statement.join(cte, true())
+    return statement
+
+
+async def _fetch_one(statement, session: Optional[AsyncSession]) -> Dict[str, Any]:
+    if session is not None:
+        return dict((await session.execute(statement)).one()._mapping)
+
+    async with AsyncSessionLocal() as own_session:
+        return dict((await own_session.execute(statement)).one()._mapping)
+
+
+async def gather_statistics(
+    families: Dict[str, Any],
+    session: Optional[AsyncSession] = None
+) -> Dict[str, Any]:
+    """
+    Run each family's one-row statement and merge the rows into one dict.
+
+    With STATISTICS_CONCURRENT and more than one family, the families run
+    in parallel, each on a fresh session from the pool; otherwise they run
+    one after another on `session`.
+    """
+    concurrent = settings.STATISTICS_CONCURRENT and len(families) > 1
+    if concurrent or session is None:
+        rows = await asyncio.gather(*[
+            _fetch_one(statement, None) for statement in families.values()
+        ])
+    else:
+        rows = [await _fetch_one(statement, session) for statement in families.values()]
+
+    merged: Dict[str, Any] = {}
+    for row in rows:
+        merged.update(row)
+    return merged
+
+
+async def cached_statistics(
+    key: Hashable,
+    load: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Serve `key` from the statistics cache, loading it on a miss"""
+    if settings.STATISTICS_CACHE_TTL <= 0:
+        return await load()
+
+    stats = _stats_cache.get(key)
+    if stats is None:
+        stats = await load()
+        _stats_cache[key] = stats
+    return dict(stats)
+
+
+def clear_statistics_cache() -> None:
+    _stats_cache.clear()
@@ -0,0 +1,73 @@
+"""add parking hourly rollups
+
+Revision ID: 1c7e5a9d3f26
+Revises: f2b6d0c8a417
+Create Date: 2026-10-18 18:26:44.180932
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c7e5a9d3f26'
+down_revision: Union[str, Sequence[str], None] = 'f2b6d0c8a417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'parking_hourly_rollups',
+        sa.Column('slot_id', sa.UUID(), nullable=False),
+        sa.Column('vehicle_type', sa.String(length=20), nullable=False),
+        sa.Column('hour', sa.DateTime(timezone=True), nullable=False, comment='Start of the UTC hour'),
+        sa.Column('checkouts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('escapes', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0', comment='Fees collected at check-out'),
+        sa.Column('dues_raised', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0', comment='Dues created for sessions closed in this hour'),
+        sa.Column('dues_collected', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0', comment="Due payments collected in this hour, against this slot's sessions"),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['slot_id'], ['parking_slots.id']),
+        sa.PrimaryKeyConstraint('slot_id', 'vehicle_type', 'hour')
+    )
+    op.create_index('ix_parking_hourly_rollups_slot_hour', 'parking_hourly_rollups', ['slot_id', 'hour'])
+
+    # Backfill from closed sessions and collected dues (same as rebuild_rollups)
+    op.execute("""
+        INSERT INTO parking_hourly_rollups
+            (slot_id, vehicle_type, hour, checkouts, escapes, revenue, dues_raised, dues_collected)
+        SELECT slot_id, vehicle_type, hour,
+               sum(checkouts), sum(escapes), sum(revenue), sum(dues_raised), sum(dues_collected)
+        FROM (
+            SELECT s.slot_id, s.vehicle_type,
+                   date_trunc('hour', s.check_out_time AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS hour,
+                   (s.status = 'checked_out')::int AS checkouts,
+                   (s.status = 'escaped')::int AS escapes,
+                   coalesce(s.collected_fee, 0) AS revenue,
+                   coalesce(d.due_amount, 0) AS dues_raised,
+                   0 AS dues_collected
+            FROM parking_sessions s
+            LEFT JOIN vehicle_dues d ON d.session_id = s.id
+            WHERE s.status IN ('checked_out', 'escaped') AND s.check_out_time IS NOT NULL
+            UNION ALL
+            SELECT s.slot_id, s.vehicle_type,
+                   date_trunc('hour', coalesce(d.paid_at, d.updated_at) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                   0, 0, 0, 0, d.paid_amount
+            FROM vehicle_dues d
+            JOIN parking_sessions s ON s.id = d.session_id
+            WHERE d.paid_amount > 0
+        ) AS events
+        GROUP BY slot_id, vehicle_type, hour
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parking_hourly_rollups_slot_hour', table_name='parking_hourly_rollups')
+    op.drop_table('parking_hourly_rollups')
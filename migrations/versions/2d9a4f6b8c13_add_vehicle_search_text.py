@@ -0,0 +1,68 @@
+"""add vehicle search text
+
+Revision ID: 2d9a4f6b8c13
+Revises: 1c7e5a9d3f26
+Create Date: 2026-10-18 19:12:03.664417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9a4f6b8c13'
+down_revision: Union[str, Sequence[str], None] = '1c7e5a9d3f26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_TEXT = (
+    "lower("
+    "regexp_replace(vehicle_number, '[^A-Za-z0-9]', '', 'g') || ' ' || vehicle_number"
+    " || ' ' || coalesce(name, '') || ' ' || coalesce(brand, '')"
+    ")"
+)
+
+# (name, column)
+TRGM_INDEXES = [
+    ('ix_vehicles_search_text_trgm', 'search_text'),
+    ('ix_vehicles_brand_trgm', 'brand'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # A stored generated column rewrites vehicles once, under an exclusive lock
+    op.add_column(
+        'vehicles',
+        sa.Column('search_text', sa.Text(), sa.Computed(SEARCH_TEXT, persisted=True), nullable=True)
+    )
+
+    with op.get_context().autocommit_block():
+        for name, column in TRGM_INDEXES:
+            op.create_index(
+                name,
+                'vehicles',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(TRGM_INDEXES):
+            op.drop_index(
+                name,
+                table_name='vehicles',
+                postgresql_concurrently=True,
+                if_exists=True
+            )
+    op.drop_column('vehicles', 'search_text')
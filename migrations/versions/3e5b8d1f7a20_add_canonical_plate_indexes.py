@@ -0,0 +1,89 @@
+"""add canonical plate indexes
+
+Revision ID: 3e5b8d1f7a20
+Revises: 2d9a4f6b8c13
+Create Date: 2026-10-18 20:04:37.218845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e5b8d1f7a20'
+down_revision: Union[str, Sequence[str], None] = '2d9a4f6b8c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same expression as apps/api/vehicle/plate.canonical_plate_sql(); queries
+# only use these indexes if they match it exactly
+CANONICAL_PLATE = "upper(regexp_replace(vehicle_number, '[^A-Za-z0-9]', '', 'g'))"
+
+# (name, table, columns) built CONCURRENTLY
+CONCURRENT_INDEXES = [
+    ('ix_vehicles_canonical_plate', 'vehicles', [CANONICAL_PLATE]),
+    ('ix_vehicle_locations_canonical_plate', 'vehicle_locations', [CANONICAL_PLATE]),
+    ('ix_vehicle_dues_canonical_plate', 'vehicle_dues', [CANONICAL_PLATE]),
+]
+
+SESSION_INDEX = 'ix_parking_sessions_canonical_plate_check_in'
+SESSION_INDEX_COLUMNS = f'({CANONICAL_PLATE}), check_in_time'
+
+
+def _session_partitions() -> list:
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'parking_sessions'::regclass"
+        )
+    ).scalars().all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Expression indexes, so no table is rewritten. CONCURRENTLY isn't
+    # supported on a partitioned table: the parent index is created ON ONLY
+    # (invalid, no data), each partition is indexed concurrently and
+    # attached; the parent becomes valid once every partition is attached,
+    # and partitions created later are indexed automatically.
+    op.execute(
+        f'CREATE INDEX IF NOT EXISTS {SESSION_INDEX} '
+        f'ON ONLY parking_sessions ({SESSION_INDEX_COLUMNS})'
+    )
+
+    with op.get_context().autocommit_block():
+        for partition in _session_partitions():
+            name = f'{partition}_canonical_plate_check_in_idx'
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+                f'ON "{partition}" ({SESSION_INDEX_COLUMNS})'
+            )
+            op.execute(f'ALTER INDEX {SESSION_INDEX} ATTACH PARTITION "{name}"')
+
+        for name, table, columns in CONCURRENT_INDEXES:
+            op.create_index(
+                name,
+                table,
+                [sa.text(column) for column in columns],
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(CONCURRENT_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True
+            )
+    # Drops the partitions' indexes with it
+    op.drop_index(SESSION_INDEX, table_name='parking_sessions', if_exists=True)
@@ -0,0 +1,102 @@
+"""add vehicle search rollups
+
+Revision ID: 4f7c2a9e1b35
+Revises: 3e5b8d1f7a20
+Create Date: 2026-10-18 21:37:52.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f7c2a9e1b35'
+down_revision: Union[str, Sequence[str], None] = '3e5b8d1f7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'vehicle_search_hourly_rollups',
+        sa.Column('hour', sa.DateTime(timezone=True), nullable=False, comment='Start of the UTC hour'),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('searches', sa.Integer(), nullable=False, server_default='0'),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('hour', 'status')
+    )
+    op.create_table(
+        'vehicle_search_plate_rollups',
+        sa.Column('day', sa.Date(), nullable=False, comment='UTC day'),
+        sa.Column('formatted_search_term', sa.String(length=100), nullable=False),
+        sa.Column('searches', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('not_found', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_searched_at', sa.DateTime(timezone=True), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('day', 'formatted_search_term')
+    )
+    op.create_table(
+        'vehicle_search_geo_rollups',
+        sa.Column('day', sa.Date(), nullable=False, comment='UTC day'),
+        sa.Column('lat_bucket', sa.Numeric(precision=8, scale=4), nullable=False, comment='South edge of the cell'),
+        sa.Column('lng_bucket', sa.Numeric(precision=8, scale=4), nullable=False, comment='West edge of the cell'),
+        sa.Column('searches', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('not_found', sa.Integer(), nullable=False, server_default='0'),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('day', 'lat_bucket', 'lng_bucket')
+    )
+    op.create_table(
+        'vehicle_search_rollup_state',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column(
+            'compacted_until',
+            sa.DateTime(timezone=True),
+            nullable=False,
+            comment='Search logs created before this are counted in the rollups'
+        ),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+    # The compactor starts at the oldest log and catches up one window at a time
+    op.execute(
+        """
+        INSERT INTO vehicle_search_rollup_state (name, compacted_until)
+        SELECT 'vehicle_search_logs', coalesce(min(created_at), now())
+        FROM vehicle_search_logs
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_vehicle_search_logs_created_at',
+            'vehicle_search_logs',
+            ['created_at', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_vehicle_search_logs_created_at',
+            table_name='vehicle_search_logs',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+    op.drop_table('vehicle_search_rollup_state')
+    op.drop_table('vehicle_search_geo_rollups')
+    op.drop_table('vehicle_search_plate_rollups')
+    op.drop_table('vehicle_search_hourly_rollups')
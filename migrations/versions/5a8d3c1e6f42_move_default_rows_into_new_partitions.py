@@ -0,0 +1,117 @@
+"""move default partition rows into new parking_sessions partitions
+
+Revision ID: 5a8d3c1e6f42
+Revises: 4f7c2a9e1b35
+Create Date: 2026-10-18 22:14:36.218470
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8d3c1e6f42'
+down_revision: Union[str, Sequence[str], None] = '4f7c2a9e1b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CREATE TABLE ... PARTITION OF fails while parking_sessions_default holds
+# rows of the new month. Those rows are moved into a standalone table that
+# is then attached as the month's partition, in the caller's transaction.
+# Only a concurrent creator of the same partition is tolerated; any other
+# error is raised.
+CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION parking_sessions_create_partition(month_start date)
+RETURNS boolean LANGUAGE plpgsql AS $$
+DECLARE
+    partition_name text := 'parking_sessions_' || to_char(month_start, 'YYYY_MM');
+    range_start timestamptz := date_trunc('month', month_start::timestamp) AT TIME ZONE 'UTC';
+    range_end timestamptz := (date_trunc('month', month_start::timestamp) + interval '1 month') AT TIME ZONE 'UTC';
+    column_list text;
+    moved_rows bigint;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+
+    IF to_regclass('parking_sessions_default') IS NULL OR NOT EXISTS (
+        SELECT 1 FROM parking_sessions_default
+        WHERE check_in_time >= range_start AND check_in_time < range_end
+    ) THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF parking_sessions FOR VALUES FROM (%L) TO (%L)',
+            partition_name, range_start, range_end
+        );
+        RETURN true;
+    END IF;
+
+    -- Generated columns are recomputed on insert
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = 'parking_sessions'::regclass
+      AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE parking_sessions INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS ('
+        'DELETE FROM parking_sessions_default WHERE check_in_time >= %L AND check_in_time < %L '
+        'RETURNING %s'
+        ') INSERT INTO %I (%s) SELECT %s FROM moved',
+        range_start, range_end, column_list, partition_name, column_list, column_list
+    );
+    GET DIAGNOSTICS moved_rows = ROW_COUNT;
+    EXECUTE format(
+        'ALTER TABLE parking_sessions ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, range_start, range_end
+    );
+    RAISE NOTICE 'moved % rows from parking_sessions_default into %', moved_rows, partition_name;
+    RETURN true;
+EXCEPTION WHEN duplicate_table THEN
+    -- A concurrent creator won
+    RETURN false;
+END;
+$$
+"""
+
+PREVIOUS_CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION parking_sessions_create_partition(month_start date)
+RETURNS boolean LANGUAGE plpgsql AS $$
+DECLARE
+    partition_name text := 'parking_sessions_' || to_char(month_start, 'YYYY_MM');
+    range_start timestamptz := date_trunc('month', month_start::timestamp) AT TIME ZONE 'UTC';
+    range_end timestamptz := (date_trunc('month', month_start::timestamp) + interval '1 month') AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF parking_sessions FOR VALUES FROM (%L) TO (%L)',
+        partition_name, range_start, range_end
+    );
+    RETURN true;
+EXCEPTION WHEN others THEN
+    -- e.g. a concurrent creator won, or the default partition already holds rows of this month
+    RAISE WARNING 'could not create partition %: %', partition_name, SQLERRM;
+    RETURN false;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CREATE_PARTITION_FUNCTION)
+    # Months that were missed while only the default partition caught them
+    op.execute('SELECT parking_sessions_ensure_partitions(3)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(PREVIOUS_CREATE_PARTITION_FUNCTION)
@@ -0,0 +1,36 @@
+"""add parking slot geo index
+
+Revision ID: a3f1c9d2b7e4
+Revises: 4d3aeb1644c0
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2b7e4'
+down_revision: Union[str, Sequence[str], None] = '4d3aeb1644c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves the bounding-box prefilter of nearby search:
+    # status equality first, then latitude range, longitude checked in-index
+    op.create_index(
+        'ix_parking_slots_status_lat_lng',
+        'parking_slots',
+        ['status', 'latitude', 'longitude'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parking_slots_status_lat_lng', table_name='parking_slots')
@@ -0,0 +1,47 @@
+"""add parking slot occupancy
+
+Revision ID: b7d24e91c5a3
+Revises: a3f1c9d2b7e4
+Create Date: 2026-10-18 10:04:17.552930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d24e91c5a3'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9d2b7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'parking_slot_occupancy',
+        sa.Column('slot_id', sa.UUID(), nullable=False),
+        sa.Column('vehicle_type', sa.String(length=20), nullable=False),
+        sa.Column('occupied', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['slot_id'], ['parking_slots.id']),
+        sa.PrimaryKeyConstraint('slot_id', 'vehicle_type')
+    )
+
+    # Backfill from currently checked-in sessions
+    op.execute("""
+        INSERT INTO parking_slot_occupancy (slot_id, vehicle_type, occupied)
+        SELECT slot_id, vehicle_type, count(*)
+        FROM parking_sessions
+        WHERE status = 'checked_in'
+        GROUP BY slot_id, vehicle_type
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('parking_slot_occupancy')
@@ -0,0 +1,37 @@
+"""unique checked in vehicle
+
+Revision ID: c41e8f0a9d62
+Revises: b7d24e91c5a3
+Create Date: 2026-10-18 11:26:03.904716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e8f0a9d62'
+down_revision: Union[str, Sequence[str], None] = 'b7d24e91c5a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fails if a vehicle is currently checked in twice; check out or
+    # escape the duplicate sessions before upgrading.
+    op.create_index(
+        'uq_parking_sessions_checked_in_vehicle',
+        'parking_sessions',
+        ['vehicle_number'],
+        unique=True,
+        postgresql_where=sa.text("status = 'checked_in'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_parking_sessions_checked_in_vehicle', table_name='parking_sessions')
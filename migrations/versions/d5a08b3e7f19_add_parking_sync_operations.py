@@ -0,0 +1,48 @@
+"""add parking sync operations
+
+Revision ID: d5a08b3e7f19
+Revises: c41e8f0a9d62
+Create Date: 2026-10-18 13:41:52.117083
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a08b3e7f19'
+down_revision: Union[str, Sequence[str], None] = 'c41e8f0a9d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'parking_sync_operations',
+        sa.Column('id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=100), nullable=False, comment='Client generated key for the operation'),
+        sa.Column('slot_id', sa.UUID(), nullable=False),
+        sa.Column('operation', sa.String(length=20), nullable=False),
+        sa.Column('vehicle_number', sa.String(length=20), nullable=False),
+        sa.Column('session_id', sa.UUID(), nullable=False, comment='Session created or closed by this operation'),
+        sa.Column('submitted_by', sa.UUID(), nullable=False),
+        sa.Column('client_timestamp', sa.DateTime(timezone=True), nullable=False, comment='When the attendant recorded the operation offline'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['slot_id'], ['parking_slots.id']),
+        sa.ForeignKeyConstraint(['session_id'], ['parking_sessions.id']),
+        sa.ForeignKeyConstraint(['submitted_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('idempotency_key')
+    )
+    op.create_index('ix_parking_sync_operations_slot_id', 'parking_sync_operations', ['slot_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parking_sync_operations_slot_id', table_name='parking_sync_operations')
+    op.drop_table('parking_sync_operations')
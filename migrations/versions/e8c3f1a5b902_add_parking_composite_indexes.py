@@ -0,0 +1,60 @@
+"""add parking composite indexes
+
+Revision ID: e8c3f1a5b902
+Revises: d5a08b3e7f19
+Create Date: 2026-10-18 15:02:37.418220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c3f1a5b902'
+down_revision: Union[str, Sequence[str], None] = 'd5a08b3e7f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    ('ix_parking_sessions_slot_status', 'parking_sessions', ['slot_id', 'status'], None),
+    ('ix_parking_sessions_slot_check_in', 'parking_sessions', ['slot_id', 'check_in_time', 'id'], None),
+    ('ix_parking_sessions_vehicle_status', 'parking_sessions', ['vehicle_number', 'status'], None),
+    ('ix_parking_sessions_vehicle_check_in', 'parking_sessions', ['vehicle_number', 'check_in_time'], None),
+    ('ix_parking_sessions_checked_in_slot', 'parking_sessions', ['slot_id', 'vehicle_type'], "status = 'checked_in'"),
+    ('ix_vehicle_dues_vehicle_owner_status', 'vehicle_dues', ['vehicle_number', 'slot_owner_id', 'status'], None),
+    ('ix_vehicle_dues_pending_vehicle', 'vehicle_dues', ['vehicle_number'], "status = 'pending'"),
+    ('ix_vehicle_dues_owner_created', 'vehicle_dues', ['slot_owner_id', 'created_at', 'id'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so check-ins aren't blocked while the indexes build;
+    # it can't run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True
+            )
@@ -0,0 +1,181 @@
+"""partition parking_sessions by month
+
+Revision ID: f2b6d0c8a417
+Revises: e8c3f1a5b902
+Create Date: 2026-10-18 17:41:09.526301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from avcfastapi.core.database.sqlalchamey import core
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d0c8a417'
+down_revision: Union[str, Sequence[str], None] = 'e8c3f1a5b902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# A partitioned table can't be referenced by id alone, so these go
+# (table, constraint, column)
+REFERENCING_FKS = [
+    ('vehicle_dues', 'vehicle_dues_session_id_fkey', 'session_id'),
+    ('vehicle_dues', 'vehicle_dues_payment_session_id_fkey', 'payment_session_id'),
+    ('parking_sync_operations', 'parking_sync_operations_session_id_fkey', 'session_id'),
+]
+
+# (constraint, column, referenced table)
+SESSION_FKS = [
+    ('parking_sessions_slot_id_fkey', 'slot_id', 'parking_slots'),
+    ('parking_sessions_vehicle_owner_id_fkey', 'vehicle_owner_id', 'users'),
+    ('parking_sessions_checked_in_by_fkey', 'checked_in_by', 'users'),
+    ('parking_sessions_checked_out_by_fkey', 'checked_out_by', 'users'),
+]
+
+# (name, columns, partial index predicate)
+SESSION_INDEXES = [
+    ('ix_parking_sessions_slot_id', ['slot_id'], None),
+    ('ix_parking_sessions_vehicle_number', ['vehicle_number'], None),
+    ('ix_parking_sessions_status', ['status'], None),
+    ('ix_parking_sessions_check_in_time', ['check_in_time'], None),
+    ('ix_parking_sessions_vehicle_owner_id', ['vehicle_owner_id'], None),
+    ('ix_parking_sessions_slot_status', ['slot_id', 'status'], None),
+    ('ix_parking_sessions_slot_check_in', ['slot_id', 'check_in_time', 'id'], None),
+    ('ix_parking_sessions_vehicle_status', ['vehicle_number', 'status'], None),
+    ('ix_parking_sessions_vehicle_check_in', ['vehicle_number', 'check_in_time'], None),
+    ('ix_parking_sessions_checked_in_slot', ['slot_id', 'vehicle_type'], "status = 'checked_in'"),
+]
+
+# Monthly partitions are UTC calendar months named parking_sessions_YYYY_MM
+CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION parking_sessions_create_partition(month_start date)
+RETURNS boolean LANGUAGE plpgsql AS $$
+DECLARE
+    partition_name text := 'parking_sessions_' || to_char(month_start, 'YYYY_MM');
+    range_start timestamptz := date_trunc('month', month_start::timestamp) AT TIME ZONE 'UTC';
+    range_end timestamptz := (date_trunc('month', month_start::timestamp) + interval '1 month') AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF parking_sessions FOR VALUES FROM (%L) TO (%L)',
+        partition_name, range_start, range_end
+    );
+    RETURN true;
+EXCEPTION WHEN others THEN
+    -- e.g. a concurrent creator won, or the default partition already holds rows of this month
+    RAISE WARNING 'could not create partition %: %', partition_name, SQLERRM;
+    RETURN false;
+END;
+$$
+"""
+
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION parking_sessions_ensure_partitions(months_ahead integer)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    this_month date := date_trunc('month', now() AT TIME ZONE 'UTC')::date;
+    created integer := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        IF parking_sessions_create_partition((this_month + make_interval(months => i))::date) THEN
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$
+"""
+
+
+def _create_session_fks() -> None:
+    for name, column, table in SESSION_FKS:
+        op.create_foreign_key(name, 'parking_sessions', table, [column], ['id'])
+
+
+def _create_session_indexes() -> None:
+    for name, columns, where in SESSION_INDEXES:
+        op.create_index(
+            name,
+            'parking_sessions',
+            columns,
+            postgresql_where=sa.text(where) if where else None
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rewrites the table under an exclusive lock; run in a maintenance window
+    for table, name, _ in REFERENCING_FKS:
+        op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}')
+
+    op.execute('ALTER TABLE parking_sessions RENAME TO parking_sessions_legacy')
+    op.execute(
+        'CREATE TABLE parking_sessions ('
+        'LIKE parking_sessions_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS'
+        ') PARTITION BY RANGE (check_in_time)'
+    )
+
+    op.execute(CREATE_PARTITION_FUNCTION)
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+
+    # One partition per month that has sessions, then the months ahead
+    op.execute(
+        """
+        SELECT parking_sessions_create_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', (SELECT min(check_in_time) FROM parking_sessions_legacy) AT TIME ZONE 'UTC'),
+            date_trunc('month', now() AT TIME ZONE 'UTC'),
+            interval '1 month'
+        ) AS month
+        """
+    )
+    op.execute('SELECT parking_sessions_ensure_partitions(3)')
+    # Catches rows outside every monthly range (e.g. replays into an archived month)
+    op.execute('CREATE TABLE parking_sessions_default PARTITION OF parking_sessions DEFAULT')
+
+    op.execute('INSERT INTO parking_sessions SELECT * FROM parking_sessions_legacy')
+    op.execute('DROP TABLE parking_sessions_legacy')
+
+    # The partition key has to be part of every unique constraint
+    op.create_primary_key('parking_sessions_pkey', 'parking_sessions', ['id', 'check_in_time'])
+    _create_session_fks()
+    _create_session_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Partitions detached by scripts/parking_partitions.py are not brought back
+    op.execute('ALTER TABLE parking_sessions RENAME TO parking_sessions_partitioned')
+    op.execute(
+        'CREATE TABLE parking_sessions ('
+        'LIKE parking_sessions_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS'
+        ')'
+    )
+    op.execute('INSERT INTO parking_sessions SELECT * FROM parking_sessions_partitioned')
+    op.execute('DROP TABLE parking_sessions_partitioned')
+
+    op.execute('DROP FUNCTION IF EXISTS parking_sessions_ensure_partitions(integer)')
+    op.execute('DROP FUNCTION IF EXISTS parking_sessions_create_partition(date)')
+
+    op.create_primary_key('parking_sessions_pkey', 'parking_sessions', ['id'])
+    _create_session_fks()
+    _create_session_indexes()
+    op.create_index(
+        'uq_parking_sessions_checked_in_vehicle',
+        'parking_sessions',
+        ['vehicle_number'],
+        unique=True,
+        postgresql_where=sa.text("status = 'checked_in'")
+    )
+
+    # NOT VALID: dues may still point at sessions that were archived
+    for table, name, column in REFERENCING_FKS:
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {name} '
+            f'FOREIGN KEY ({column}) REFERENCES parking_sessions (id) NOT VALID'
+        )
@@ -0,0 +1,101 @@
+"""
+Benchmark for the "my vehicles" parking history
+Registers fleets of growing size for one user and counts the statements
+get_my_vehicles_history issues; the count must not grow with the fleet.
+
+Usage: python -m scripts.benchmark_my_vehicles_history [fleet sizes...]
+"""
+
+import asyncio
+import sys
+import time
+from uuid import uuid4
+
+from sqlalchemy import select, delete, event
+
+from apps.api.parking.service import ParkingService
+from apps.api.user.models import User
+from apps.api.vehicle.models import Vehicle
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+PLATE_PREFIX = "BMH"
+
+
+async def create_fleet(user_id, size: int):
+    """Register `size` vehicles for the user with benchmark plates"""
+    async with AsyncSessionLocal() as session:
+        for i in range(size):
+            session.add(Vehicle(
+                id=uuid4(),
+                vehicle_number=f"{PLATE_PREFIX}{i:06d}",
+                name=f"Benchmark vehicle {i}",
+                vehicle_type="car",
+                user_id=user_id
+            ))
+        await session.commit()
+
+
+async def delete_fleet():
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            delete(Vehicle).where(Vehicle.vehicle_number.like(f"{PLATE_PREFIX}%"))
+        )
+        await session.commit()
+
+
+async def measure(user_id):
+    """Run get_my_vehicles_history once; returns (statements, seconds, vehicles)"""
+    async with AsyncSessionLocal() as session:
+        statements = []
+        event.listen(
+            session.sync_session,
+            "do_orm_execute",
+            lambda state: statements.append(state.statement)
+        )
+
+        service = ParkingService(session=session)
+        started = time.perf_counter()
+        history = await service.get_my_vehicles_history(user_id)
+        elapsed = time.perf_counter() - started
+
+        return len(statements), elapsed, history["total_vehicles"]
+
+
+async def run_benchmark(sizes) -> bool:
+    print("=" * 60)
+    print("🧪 get_my_vehicles_history query count vs fleet size")
+    print("=" * 60)
+
+    async with AsyncSessionLocal() as session:
+        user = await session.scalar(select(User).limit(1))
+    if not user:
+        print("  ⚠️  No users found, skipping benchmark")
+        return False
+
+    await delete_fleet()
+    counts = []
+    try:
+        for size in sizes:
+            await create_fleet(user.id, size)
+            statements, elapsed, vehicles = await measure(user.id)
+            counts.append(statements)
+            print(f"  🚗 fleet={size:>5}  vehicles={vehicles:>5}  statements={statements}  {elapsed * 1000:.1f}ms")
+            await delete_fleet()
+    finally:
+        await delete_fleet()
+
+    constant = len(set(counts)) == 1
+    print(f"\n  {'✅' if constant else '❌'} Query count is constant across fleet sizes")
+    print("=" * 60)
+    return constant
+
+
+async def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 50, 200]
+    passed = await run_benchmark(sizes)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+"""
+Benchmark for vehicle free-text search
+Seeds a large throwaway fleet server-side, runs ANALYZE and checks that
+partial plate / name searches are answered from the pg_trgm index
+ix_vehicles_search_text_trgm instead of a sequential scan, with timings.
+
+Usage: python -m scripts.benchmark_vehicle_search [vehicles]
+"""
+
+import asyncio
+import sys
+import time
+
+from sqlalchemy import select, delete, text
+
+from apps.api.user.models import User
+from apps.api.vehicle.models import Vehicle
+from apps.api.vehicle.search import apply_search
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+from apps.pagination import explain, walk_plan
+
+
+PLATE_PREFIX = "ZZBV"
+SEARCH_INDEX = "ix_vehicles_search_text_trgm"
+BATCH = 250_000
+
+
+async def seed(session, user_id, count: int):
+    """Plates ZZBV<6 hex chars><7 digits>, with a few names and brands"""
+    for start in range(1, count + 1, BATCH):
+        await session.execute(
+            text(
+                "INSERT INTO vehicles (vehicle_number, name, brand, vehicle_type, user_id, is_verified, created_at, updated_at) "
+                "SELECT CAST(:prefix AS text) || upper(substr(md5(i::text), 1, 6)) || lpad(i::text, 7, '0'), "
+                "(ARRAY['City', 'Swift', 'Nexon', 'Creta', 'Activa'])[1 + i % 5] || ' ' || i, "
+                "(ARRAY['Honda', 'Maruti', 'Tata', 'Hyundai', 'TVS'])[1 + i % 5], "
+                "'car', CAST(:user_id AS uuid), false, now(), now() "
+                "FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS i"
+            ),
+            {
+                "prefix": PLATE_PREFIX,
+                "user_id": user_id,
+                "start": start,
+                "stop": min(start + BATCH - 1, count)
+            }
+        )
+        await session.commit()
+    await session.execute(text("ANALYZE vehicles"))
+
+
+async def cleanup(session):
+    await session.rollback()
+    await session.execute(delete(Vehicle).where(Vehicle.vehicle_number.like(f"{PLATE_PREFIX}%")))
+    await session.commit()
+
+
+def search_statement(term: str):
+    query = select(Vehicle).where(Vehicle.deleted_at.is_(None))
+    return apply_search(query, term).limit(20)
+
+
+async def check_search(session, term: str):
+    """(uses index, seq scan, rows, milliseconds) for one search term"""
+    nodes = list(walk_plan(await explain(session, search_statement(term))))
+    uses_index = any(node.get("Index Name") == SEARCH_INDEX for node in nodes)
+    seq_scan = any(
+        node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "vehicles"
+        for node in nodes
+    )
+
+    started = time.perf_counter()
+    rows = (await session.scalars(search_statement(term))).all()
+    elapsed = (time.perf_counter() - started) * 1000
+    return uses_index, seq_scan, len(rows), elapsed
+
+
+async def run_benchmark(count: int) -> bool:
+    print("=" * 60)
+    print(f"🧪 Vehicle search on {count} seeded vehicles")
+    print("=" * 60)
+
+    async with AsyncSessionLocal() as session:
+        user = await session.scalar(select(User).limit(1))
+        if not user:
+            print("  ⚠️  No users found, skipping benchmark")
+            return False
+
+        await cleanup(session)
+        started = time.perf_counter()
+        await seed(session, user.id, count)
+        print(f"  🌱 Seeded in {time.perf_counter() - started:.1f}s")
+
+        sample = await session.scalar(
+            select(Vehicle.vehicle_number)
+            .where(Vehicle.vehicle_number.like(f"{PLATE_PREFIX}%"))
+            .limit(1)
+        )
+        terms = [
+            sample[len(PLATE_PREFIX) + 2:len(PLATE_PREFIX) + 8],  # partial plate
+            sample.lower(),                                       # whole plate
+            "nexon 4242",                                         # name words
+        ]
+
+        results = []
+        try:
+            for term in terms:
+                uses_index, seq_scan, rows, elapsed = await check_search(session, term)
+                passed = uses_index and not seq_scan
+                results.append(passed)
+                print(
+                    f"  {'✅' if passed else '❌'} {term!r}: {rows} rows in {elapsed:.1f}ms"
+                    f"{'' if uses_index else ' (no trigram index)'}{' + Seq Scan' if seq_scan else ''}"
+                )
+        finally:
+            await cleanup(session)
+
+    all_passed = all(results)
+    print("\n  🎉 All searches use the trigram index!" if all_passed else "\n  ⚠️  Some searches fell back to other plans.")
+    print("=" * 60)
+    return all_passed
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    passed = await run_benchmark(count)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+# apps/management/commands/parking_partitions.py
+import os
+
+from apps.api.parking.partitions import (
+    ensure_partitions,
+    list_partitions,
+    archivable_partitions,
+    partition_in_use,
+    lock_partition,
+    detach_partition,
+    export_table,
+    drop_table,
+)
+from apps.settings import settings
+from avcfastapi.core.utils.commands.command import Command
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+class ParkingPartitionsCommand(Command):
+    help = "Create upcoming parking_sessions partitions, or detach/archive old ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "action",
+            choices=["ensure", "list", "detach", "archive"],
+            help=(
+                "ensure: create partitions ahead; list: show partitions; "
+                "detach: detach old months into standalone tables; "
+                "archive: export old months to .csv.gz, then detach and drop them"
+            ),
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.PARKING_PARTITION_MONTHS_AHEAD,
+            help="Months of partitions to keep created ahead (ensure)",
+        )
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=settings.PARKING_PARTITION_RETENTION_MONTHS,
+            help="Only months older than this many months (detach/archive)",
+        )
+        parser.add_argument(
+            "--output-dir",
+            type=str,
+            default=settings.PARKING_ARCHIVE_DIR,
+            help="Where archive writes <partition>.csv.gz",
+        )
+        parser.add_argument(
+            "--keep-table",
+            action="store_true",
+            help="Keep the detached table after archiving it",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print which partitions would be detached/archived",
+        )
+
+    async def handle(self, **options):
+        action = options["action"]
+
+        async with AsyncSessionLocal() as session:
+            if action == "ensure":
+                created = await ensure_partitions(session, options["months_ahead"])
+                await session.commit()
+                print(f"Created {created} parking_sessions partitions.")
+                return
+
+            if action == "list":
+                for partition in await list_partitions(session):
+                    print(f"{partition.name}  {partition.start:%Y-%m-%d} .. {partition.end:%Y-%m-%d}")
+                return
+
+            partitions = await archivable_partitions(session, options["older_than"])
+            if not partitions:
+                print(f"No partitions older than {options['older_than']} months.")
+                return
+
+            for partition in partitions:
+                if await partition_in_use(session, partition):
+                    print(f"Skipping {partition.name}: it has checked-in sessions or pending dues.")
+                    continue
+
+                if options["dry_run"]:
+                    print(f"Would {action} {partition.name}.")
+                    continue
+
+                if action == "detach":
+                    await detach_partition(session, partition)
+                    await session.commit()
+                    print(f"Detached {partition.name}.")
+                    continue
+
+                # Exported while still attached and locked against writes,
+                # then detached and dropped in the same transaction: if any
+                # step fails, the month stays attached and a rerun retries it
+                path = os.path.join(options["output_dir"], f"{partition.name}.csv.gz")
+                await lock_partition(session, partition)
+                await export_table(session, partition.name, path)
+                await detach_partition(session, partition)
+                if not options["keep_table"]:
+                    await drop_table(session, partition.name)
+                await session.commit()
+                print(f"Archived {partition.name} to {path}.")
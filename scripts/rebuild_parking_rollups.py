@@ -0,0 +1,39 @@
+# apps/management/commands/rebuild_parking_rollups.py
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from apps.api.parking.rollups import rebuild_rollups
+from avcfastapi.core.utils.commands.command import Command
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+class RebuildParkingRollupsCommand(Command):
+    help = "Recompute hourly parking rollups from sessions and dues"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Only rebuild the last N days (default: all time)",
+        )
+        parser.add_argument(
+            "--slot-id",
+            type=str,
+            default=None,
+            help="Only rebuild rollups for this parking slot (default: all slots)",
+        )
+
+    async def handle(self, **options):
+        slot_id = options.get("slot_id")
+        slot_id = UUID(slot_id) if slot_id else None
+        days = options.get("days")
+        since = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+
+        async with AsyncSessionLocal() as session:
+            rows = await rebuild_rollups(session, since=since, slot_id=slot_id)
+            await session.commit()
+
+        scope = f"slot {slot_id}" if slot_id else "all slots"
+        window = f"the last {days} days" if days else "all time"
+        print(f"Rebuilt {rows} hourly rollups for {scope} over {window}.")
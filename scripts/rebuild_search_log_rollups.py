@@ -0,0 +1,36 @@
+# apps/management/commands/rebuild_search_log_rollups.py
+from datetime import datetime, timedelta, timezone
+
+from apps.api.vehicle.search_rollups import compact_search_logs, rebuild_search_rollups
+from avcfastapi.core.utils.commands.command import Command
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+class RebuildSearchLogRollupsCommand(Command):
+    help = "Compact new vehicle search logs into the rollups, or recompute them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Recompute the last N days (UTC) of rollups",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute the rollups from all search logs",
+        )
+
+    async def handle(self, **options):
+        days = options.get("days")
+        if days or options.get("all"):
+            since = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+            async with AsyncSessionLocal() as session:
+                until = await rebuild_search_rollups(session, since=since)
+                await session.commit()
+            window = f"the last {days} days" if days else "all time"
+            print(f"Rebuilt search log rollups over {window}, up to {until:%Y-%m-%d %H:%M:%S} UTC.")
+
+        windows = await compact_search_logs()
+        print(f"Compacted {windows} new windows of search logs.")
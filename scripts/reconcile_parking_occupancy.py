@@ -0,0 +1,29 @@
+# apps/management/commands/reconcile_parking_occupancy.py
+from uuid import UUID
+
+from apps.api.parking.occupancy import rebuild_occupancy
+from avcfastapi.core.utils.commands.command import Command
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+class ReconcileParkingOccupancyCommand(Command):
+    help = "Rebuild live parking occupancy counters from checked-in sessions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--slot-id",
+            type=str,
+            default=None,
+            help="Only rebuild counters for this parking slot (default: all slots)",
+        )
+
+    async def handle(self, **options):
+        slot_id = options.get("slot_id")
+        slot_id = UUID(slot_id) if slot_id else None
+
+        async with AsyncSessionLocal() as session:
+            rows = await rebuild_occupancy(session, slot_id=slot_id)
+            await session.commit()
+
+        scope = f"slot {slot_id}" if slot_id else "all slots"
+        print(f"Rebuilt {rows} occupancy counters for {scope}.")
@@ -0,0 +1,163 @@
+"""
+Load test for concurrent parking check-ins
+Fires many check-ins at one slot in parallel (each on its own DB session)
+and verifies capacity is never oversubscribed and no plate is checked in twice.
+
+Usage: python -m scripts.test_checkin_concurrency [parallel_requests] [capacity]
+"""
+
+import asyncio
+import sys
+import time
+from collections import Counter
+
+from sqlalchemy import select, func, delete
+
+from apps.api.parking.models import (
+    ParkingSlot,
+    ParkingSlotStaff,
+    ParkingSlotOccupancy,
+    ParkingSession,
+    ParkingVehicleType,
+    PricingModel,
+    PaymentTiming,
+    SlotStatus,
+    StaffRole,
+    SessionStatus
+)
+from apps.api.parking.schema import SessionCheckIn
+from apps.api.parking.service import ParkingService
+from apps.api.user.models import User
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+from avcfastapi.core.exception.request import InvalidRequestException
+
+
+async def create_test_slot(capacity: int):
+    """Create an active slot with the first user as owner/staff"""
+    async with AsyncSessionLocal() as session:
+        user = await session.scalar(select(User).limit(1))
+        if not user:
+            return None, None
+
+        slot = ParkingSlot(
+            owner_id=user.id,
+            name="Concurrency Test Lot",
+            location="Load test",
+            latitude=8.5241,
+            longitude=76.9366,
+            capacity={"car": capacity},
+            pricing_model=PricingModel.FREE,
+            pricing_config={},
+            payment_timing=PaymentTiming.ON_EXIT,
+            status=SlotStatus.ACTIVE
+        )
+        session.add(slot)
+        await session.flush()
+        session.add(ParkingSlotStaff(slot_id=slot.id, user_id=user.id, role=StaffRole.OWNER))
+        await session.commit()
+
+        return slot.id, user.id
+
+
+async def check_in(slot_id, staff_id, vehicle_number: str) -> str:
+    """One check-in on a dedicated session; returns the outcome code"""
+    async with AsyncSessionLocal() as session:
+        service = ParkingService(session=session)
+        try:
+            await service.check_in_vehicle(
+                slot_id,
+                staff_id,
+                SessionCheckIn(vehicle_number=vehicle_number, vehicle_type=ParkingVehicleType.CAR)
+            )
+            return "OK"
+        except InvalidRequestException as e:
+            return getattr(e, "error_code", None) or "REJECTED"
+        except Exception as e:
+            return f"ERROR:{type(e).__name__}"
+
+
+async def run_load_test(parallel: int, capacity: int) -> bool:
+    print("=" * 60)
+    print(f"🧪 Concurrent check-in: {parallel} requests, capacity {capacity}")
+    print("=" * 60)
+
+    slot_id, staff_id = await create_test_slot(capacity)
+    if not slot_id:
+        print("  ⚠️  No users found, skipping load test")
+        return False
+
+    # Half the requests reuse plates to race duplicate check-ins too
+    plates = [f"LT{i % max(parallel // 2, 1):05d}" for i in range(parallel)]
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(check_in(slot_id, staff_id, plate) for plate in plates)
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"\n  ⏱️  {parallel} check-ins in {elapsed:.2f}s")
+    for outcome, count in Counter(outcomes).most_common():
+        print(f"     {outcome}: {count}")
+
+    async with AsyncSessionLocal() as session:
+        checked_in = await session.scalar(
+            select(func.count(ParkingSession.id)).where(
+                ParkingSession.slot_id == slot_id,
+                ParkingSession.status == SessionStatus.CHECKED_IN
+            )
+        )
+        duplicate_plates = await session.scalar(
+            select(func.count()).select_from(
+                select(ParkingSession.vehicle_number)
+                .where(
+                    ParkingSession.slot_id == slot_id,
+                    ParkingSession.status == SessionStatus.CHECKED_IN
+                )
+                .group_by(ParkingSession.vehicle_number)
+                .having(func.count() > 1)
+                .subquery()
+            )
+        )
+        counter = await session.scalar(
+            select(ParkingSlotOccupancy.occupied).where(
+                ParkingSlotOccupancy.slot_id == slot_id,
+                ParkingSlotOccupancy.vehicle_type == ParkingVehicleType.CAR.value
+            )
+        ) or 0
+
+        # Cleanup
+        await session.execute(delete(ParkingSession).where(ParkingSession.slot_id == slot_id))
+        await session.execute(delete(ParkingSlotOccupancy).where(ParkingSlotOccupancy.slot_id == slot_id))
+        await session.execute(delete(ParkingSlotStaff).where(ParkingSlotStaff.slot_id == slot_id))
+        await session.execute(delete(ParkingSlot).where(ParkingSlot.id == slot_id))
+        await session.commit()
+
+    expected = min(capacity, len(set(plates)))
+    checks = [
+        (f"Checked-in sessions == {expected}", checked_in == expected),
+        ("No capacity oversubscription", checked_in <= capacity),
+        ("No plate checked in twice", duplicate_plates == 0),
+        ("Occupancy counter matches sessions", counter == checked_in),
+        ("No unexpected errors", not any(o.startswith("ERROR") for o in outcomes)),
+    ]
+
+    print()
+    for name, passed in checks:
+        print(f"  {'✅' if passed else '❌'} {name}")
+    print(f"     sessions={checked_in} counter={counter} duplicates={duplicate_plates}")
+
+    all_passed = all(passed for _, passed in checks)
+    print("\n  🎉 Check-in is race free!" if all_passed else "\n  ⚠️  Concurrency check failed.")
+    print("=" * 60)
+    return all_passed
+
+
+async def main():
+    parallel = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    passed = await run_load_test(parallel, capacity)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,253 @@
+"""
+Query-plan regression test for the parking hot paths
+Seeds a throwaway dataset, runs ANALYZE and asserts the hot queries are
+answered from the composite/partial indexes instead of sequential scans.
+
+Usage: python -m scripts.test_parking_query_plans [sessions]
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import select, func, delete, insert, text
+
+from apps.api.parking.models import (
+    ParkingSlot,
+    ParkingSession,
+    VehicleDue,
+    PricingModel,
+    PaymentTiming,
+    SlotStatus,
+    SessionStatus,
+    PaymentStatus,
+    DueStatus
+)
+from apps.api.user.models import User
+from apps.pagination import explain, walk_plan
+from avcfastapi.core.database.sqlalchamey.core import AsyncSessionLocal
+
+
+PLATE_PREFIX = "QP"
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+async def seed(session, owner_id, sessions_count: int):
+    """Two slots, `sessions_count` sessions and dues for the escaped ones"""
+    slot_ids = []
+    for name in ("Query Plan Lot A", "Query Plan Lot B"):
+        slot = ParkingSlot(
+            owner_id=owner_id,
+            name=name,
+            location="Query plan test",
+            latitude=8.5241,
+            longitude=76.9366,
+            capacity={"car": 1000},
+            pricing_model=PricingModel.FREE,
+            pricing_config={},
+            payment_timing=PaymentTiming.ON_EXIT,
+            status=SlotStatus.ACTIVE
+        )
+        session.add(slot)
+        await session.flush()
+        slot_ids.append(slot.id)
+
+    now = datetime.now(timezone.utc)
+    plates = max(sessions_count // 20, 1)
+    rows, dues = [], []
+    for i in range(sessions_count):
+        check_in = now - timedelta(minutes=i)
+        if i < 200:
+            # Currently parked: one open session per plate
+            status, plate = SessionStatus.CHECKED_IN.value, f"{PLATE_PREFIX}CI{i:05d}"
+        elif i % 10 == 0:
+            status, plate = SessionStatus.ESCAPED.value, f"{PLATE_PREFIX}{i % plates:06d}"
+        else:
+            status, plate = SessionStatus.CHECKED_OUT.value, f"{PLATE_PREFIX}{i % plates:06d}"
+
+        session_id = uuid4()
+        rows.append({
+            "id": session_id,
+            "slot_id": slot_ids[i % 2],
+            "vehicle_number": plate,
+            "vehicle_type": "car",
+            "checked_in_by": owner_id,
+            "check_in_time": check_in,
+            "check_out_time": None if status == SessionStatus.CHECKED_IN.value else check_in + timedelta(hours=1),
+            "status": status,
+            "calculated_fee": Decimal("20.00"),
+            "payment_status": PaymentStatus.PENDING.value,
+            "created_at": check_in,
+            "updated_at": check_in
+        })
+        if status == SessionStatus.ESCAPED.value:
+            dues.append({
+                "id": uuid4(),
+                "vehicle_number": plate,
+                "slot_owner_id": owner_id,
+                "session_id": session_id,
+                "due_amount": Decimal("20.00"),
+                "paid_amount": Decimal("0.00"),
+                "status": DueStatus.PENDING.value if i % 20 == 0 else DueStatus.PAID.value,
+                "created_at": check_in,
+                "updated_at": check_in
+            })
+
+    for start in range(0, len(rows), 5000):
+        await session.execute(insert(ParkingSession), rows[start:start + 5000])
+    for start in range(0, len(dues), 5000):
+        await session.execute(insert(VehicleDue), dues[start:start + 5000])
+    await session.commit()
+
+    await session.execute(text("ANALYZE parking_sessions"))
+    await session.execute(text("ANALYZE vehicle_dues"))
+    return slot_ids
+
+
+def hot_queries(slot_id, owner_id):
+    """(name, statement, table, acceptable indexes), mirroring the service queries"""
+    plate = f"{PLATE_PREFIX}{7:06d}"
+    return [
+        (
+            "list_sessions (slot, status, newest first)",
+            select(ParkingSession)
+            .where(ParkingSession.slot_id == slot_id, ParkingSession.status == SessionStatus.CHECKED_OUT)
+            .order_by(ParkingSession.check_in_time.desc(), ParkingSession.id.desc())
+            .limit(20),
+            "parking_sessions",
+            {"ix_parking_sessions_slot_check_in", "ix_parking_sessions_slot_status"}
+        ),
+        (
+            "checked-in vehicles of a slot",
+            select(ParkingSession.vehicle_type, ParkingSession.check_in_time)
+            .where(ParkingSession.slot_id == slot_id, ParkingSession.status == SessionStatus.CHECKED_IN),
+            "parking_sessions",
+            {"ix_parking_sessions_checked_in_slot", "ix_parking_sessions_slot_status"}
+        ),
+        (
+            "vehicle history page (canonical plate)",
+            select(ParkingSession)
+            .where(ParkingSession.canonical_plate == plate)
+            .order_by(ParkingSession.check_in_time.desc())
+            .limit(5),
+            "parking_sessions",
+            {"ix_parking_sessions_canonical_plate_check_in"}
+        ),
+        (
+            "vehicle sessions by status",
+            select(func.count(ParkingSession.id))
+            .where(ParkingSession.vehicle_number == plate, ParkingSession.status == SessionStatus.ESCAPED),
+            "parking_sessions",
+            {"ix_parking_sessions_vehicle_status"}
+        ),
+        (
+            "pending due at check-in",
+            select(VehicleDue.id)
+            .where(
+                VehicleDue.vehicle_number == plate,
+                VehicleDue.slot_owner_id == owner_id,
+                VehicleDue.status == DueStatus.PENDING
+            )
+            .limit(1),
+            "vehicle_dues",
+            {"ix_vehicle_dues_vehicle_owner_status", "ix_vehicle_dues_pending_vehicle"}
+        ),
+        (
+            "outstanding dues of a plate (canonical plate)",
+            select(func.sum(VehicleDue.due_amount - VehicleDue.paid_amount))
+            .where(VehicleDue.canonical_plate == plate, VehicleDue.status == DueStatus.PENDING),
+            "vehicle_dues",
+            {"ix_vehicle_dues_canonical_plate", "ix_vehicle_dues_pending_vehicle"}
+        ),
+        (
+            "list_dues (owner, newest first)",
+            select(VehicleDue)
+            .where(VehicleDue.slot_owner_id == owner_id)
+            .order_by(VehicleDue.created_at.desc(), VehicleDue.id.desc())
+            .limit(20),
+            "vehicle_dues",
+            {"ix_vehicle_dues_owner_created"}
+        ),
+    ]
+
+
+async def parent_names(session, names: set) -> set:
+    """Map partitions (and their indexes) to the partitioned table (index) they belong to"""
+    if not names:
+        return set()
+    result = await session.execute(
+        text(
+            "SELECT child.relname, parent.relname FROM pg_class child "
+            "JOIN pg_inherits i ON i.inhrelid = child.oid "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "WHERE child.relname = ANY(:names)"
+        ),
+        {"names": list(names)}
+    )
+    parents = dict(result.all())
+    return {parents.get(name, name) for name in names}
+
+
+async def check_plan(session, statement, table: str, expected: set):
+    nodes = list(walk_plan(await explain(session, statement)))
+    used = await parent_names(
+        session,
+        {node["Index Name"] for node in nodes if node["Node Type"] in INDEX_SCANS}
+    )
+    scanned = await parent_names(
+        session,
+        {node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"}
+    )
+    seq_scan = table in scanned
+    return (not seq_scan and bool(used & expected)), used, seq_scan
+
+
+async def cleanup(session, slot_ids):
+    await session.rollback()
+    session_ids = select(ParkingSession.id).where(ParkingSession.slot_id.in_(slot_ids))
+    await session.execute(delete(VehicleDue).where(VehicleDue.session_id.in_(session_ids)))
+    await session.execute(delete(ParkingSession).where(ParkingSession.slot_id.in_(slot_ids)))
+    await session.execute(delete(ParkingSlot).where(ParkingSlot.id.in_(slot_ids)))
+    await session.commit()
+
+
+async def run_plan_checks(sessions_count: int) -> bool:
+    print("=" * 60)
+    print(f"🧪 Parking query plans on {sessions_count} seeded sessions")
+    print("=" * 60)
+
+    async with AsyncSessionLocal() as session:
+        owner = await session.scalar(select(User).limit(1))
+        if not owner:
+            print("  ⚠️  No users found, skipping query plan checks")
+            return False
+
+        slot_ids = await seed(session, owner.id, sessions_count)
+        results = []
+        try:
+            for name, statement, table, expected in hot_queries(slot_ids[0], owner.id):
+                passed, used, seq_scan = await check_plan(session, statement, table, expected)
+                results.append(passed)
+                detail = ", ".join(sorted(used)) or "no index"
+                if seq_scan:
+                    detail += " + Seq Scan"
+                print(f"  {'✅' if passed else '❌'} {name}: {detail}")
+        finally:
+            await cleanup(session, slot_ids)
+
+    all_passed = all(results)
+    print("\n  🎉 All hot paths use index scans!" if all_passed else "\n  ⚠️  Some hot paths fell back to other plans.")
+    print("=" * 60)
+    return all_passed
+
+
+async def main():
+    sessions_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    passed = await run_plan_checks(sessions_count)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())